@@ -0,0 +1,33 @@
+import os
+import pytest
+from django.conf import settings
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    from hotel.querylog import report
+    report.current_test = item.nodeid
+    try:
+        return (yield)
+    finally:
+        report.current_test = None
+
+
+def pytest_sessionfinish(session, exitstatus):
+    """Write the N+1 report; findings outside QUERY_INSPECTION_ALLOW fail an otherwise green run"""
+    from hotel.querylog import report
+    if not settings.QUERY_INSPECTION:
+        return
+    report.write(os.environ.get('QUERY_REPORT_PATH', settings.BASE_DIR / 'query_report.json'))
+    if report.unexpected() and session.exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter):
+    from hotel.querylog import report
+    unexpected = report.unexpected() if settings.QUERY_INSPECTION else []
+    if not unexpected:
+        return
+    terminalreporter.section("N+1 queries", red=True)
+    for finding in unexpected:
+        terminalreporter.line(f"{finding.test}: {finding.describe()}")
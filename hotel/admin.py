@@ -2,7 +2,7 @@ from django.contrib import admin
 from .models import (
     Article, Client, RoomCategory, Room, RoomImage, Reservation, CompanyInfo, FAQ, Staff, 
     Vacancy, Review, PromoCode, Amenity, Service, Tag, ServiceBooking, ChartImage,
-    Banner, Partner, Cart, CartItem, Order, OrderItem, CompanyHistory
+    Banner, Partner, Cart, CartItem, Order, OrderItem, CompanyHistory, ReservationDailyStats
 )
 
 def make_active(modeladmin, request, queryset):
@@ -184,4 +184,11 @@ class OrderItemAdmin(admin.ModelAdmin):
 class CompanyHistoryAdmin(admin.ModelAdmin):
     list_display = ['company', 'year', 'event']
     list_filter = ['year']
-    search_fields = ['event']
\ No newline at end of file
+    search_fields = ['event']
+
+@admin.register(ReservationDailyStats)
+class ReservationDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'category', 'bookings', 'revenue', 'nights', 'occupied_rooms')
+    list_filter = ('category',)
+    date_hierarchy = 'date'
+    readonly_fields = ('date', 'category', 'bookings', 'revenue', 'nights', 'occupied_rooms')
\ No newline at end of file
@@ -0,0 +1,155 @@
+from datetime import date, timedelta
+from django.db import connections
+from django.db.models import Aggregate, Avg, Count, DecimalField, Exists, F, Func, IntegerField, OuterRef, Q, Sum
+from django.db.models.functions import TruncMonth
+from .availability import overlapping_reservations
+from .models import Room, RoomCategory, Reservation, ReservationDailyStats
+from .rollups import EXCLUDED_STATUSES
+
+# Set by staff for rooms taken outside the booking system; booked rooms are
+# found through their reservations instead
+OCCUPIED_ROOM_STATUSES = ('occupied',)
+
+
+class StayNights(Func):
+    """Number of nights between check_in_date and check_out_date, computed in SQL"""
+    output_field = IntegerField()
+
+    def __init__(self, check_in='check_in_date', check_out='check_out_date', **extra):
+        super().__init__(F(check_in), F(check_out), **extra)
+
+    def _compile_dates(self, compiler):
+        check_in, check_in_params = compiler.compile(self.source_expressions[0])
+        check_out, check_out_params = compiler.compile(self.source_expressions[1])
+        return check_in, check_out, (*check_out_params, *check_in_params)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        # PostgreSQL and Oracle return a whole number of days for date - date
+        check_in, check_out, params = self._compile_dates(compiler)
+        return f'({check_out} - {check_in})', params
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        check_in, check_out, params = self._compile_dates(compiler)
+        return f'CAST(julianday({check_out}) - julianday({check_in}) AS INTEGER)', params
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        check_in, check_out, params = self._compile_dates(compiler)
+        return f'DATEDIFF({check_out}, {check_in})', params
+
+
+class Percentile(Aggregate):
+    """PostgreSQL ordered-set aggregate: PERCENTILE_CONT(fraction) WITHIN GROUP (ORDER BY expr)"""
+    function = 'PERCENTILE_CONT'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, fraction=0.5, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+class Mode(Aggregate):
+    """PostgreSQL ordered-set aggregate: MODE() WITHIN GROUP (ORDER BY expr)"""
+    function = 'MODE'
+    template = '%(function)s() WITHIN GROUP (ORDER BY %(expressions)s)'
+
+
+def _median_by_offset(queryset, field, count):
+    """Median via ORDER BY ... LIMIT 2 OFFSET n/2 for backends without PERCENTILE_CONT.
+
+    Only the one or two middle rows ever leave the database.
+    """
+    if not count:
+        return 0
+    middle = list(
+        queryset.order_by(field).values_list(field, flat=True)[(count - 1) // 2:count // 2 + 1]
+    )
+    return sum(middle) / len(middle)
+
+
+def _mode_by_grouping(queryset, field):
+    """Most frequent value via GROUP BY; ties go to the smallest value"""
+    row = queryset.values(field).annotate(frequency=Count('pk')).order_by('-frequency', field).first()
+    return row[field] if row else 0
+
+
+def reservation_summary(queryset=None):
+    """Revenue and stay statistics over reservations in a constant number of queries.
+
+    One aggregate query on PostgreSQL; on other backends the medians and the
+    mode take one extra query each. Cancelled reservations are left out, as
+    they are from the daily rollup behind the category and monthly figures.
+    """
+    if queryset is None:
+        queryset = Reservation.objects.all()
+    queryset = queryset.exclude(status__in=EXCLUDED_STATUSES).annotate(nights=StayNights()).order_by()
+
+    aggregates = {
+        'count': Count('pk'),
+        'total_revenue': Sum('total_price'),
+        'avg_sale': Avg('total_price'),
+        'avg_stay': Avg('nights'),
+    }
+    on_postgres = connections[queryset.db].vendor == 'postgresql'
+    if on_postgres:
+        aggregates.update({
+            'median_sale': Percentile('total_price', output_field=DecimalField()),
+            'mode_sale': Mode('total_price', output_field=DecimalField()),
+            'median_stay': Percentile('nights', output_field=DecimalField()),
+        })
+
+    summary = queryset.aggregate(**aggregates)
+    count = summary.pop('count')
+    if not on_postgres:
+        summary['median_sale'] = _median_by_offset(queryset, 'total_price', count)
+        summary['mode_sale'] = _mode_by_grouping(queryset, 'total_price')
+        summary['median_stay'] = _median_by_offset(queryset, 'nights', count)
+
+    return {key: value or 0 for key, value in summary.items()}
+
+
+def daily_stats(start=None, end=None):
+    """Rollup rows for the period, both ends inclusive"""
+    stats = ReservationDailyStats.objects.all()
+    if start:
+        stats = stats.filter(date__gte=start)
+    if end:
+        stats = stats.filter(date__lte=end)
+    return stats
+
+
+def category_summary(start=None, end=None):
+    """Room count plus booking and revenue totals per category"""
+    totals = {
+        row['category']: row
+        for row in daily_stats(start, end).values('category').annotate(
+            bookings=Sum('bookings'),
+            revenue=Sum('revenue'),
+        ).order_by()
+    }
+
+    categories = list(RoomCategory.objects.annotate(room_count=Count('rooms')).order_by('name'))
+    for category in categories:
+        row = totals.get(category.pk, {})
+        category.reservation_count = row.get('bookings') or 0
+        category.revenue = row.get('revenue') or 0
+    return categories
+
+
+def monthly_revenue(start=None, end=None):
+    return daily_stats(start, end).filter(bookings__gt=0).annotate(
+        month=TruncMonth('date')
+    ).values('month').annotate(
+        revenue=Sum('revenue')
+    ).order_by('month')
+
+
+def occupancy_rate(day=None):
+    """Share of rooms taken on day (default today), as a percentage"""
+    day = day or date.today()
+    booked = overlapping_reservations(day, day + timedelta(days=1)).filter(room=OuterRef('pk'))
+    rooms = Room.objects.aggregate(
+        total=Count('pk'),
+        occupied=Count('pk', filter=Q(status__in=OCCUPIED_ROOM_STATUSES) | Q(Exists(booked))),
+    )
+    if not rooms['total']:
+        return 0
+    return rooms['occupied'] / rooms['total'] * 100
@@ -0,0 +1,42 @@
+from django.db.models import Exists, OuterRef
+from .models import Room, Reservation
+
+# Reservations in these states hold the room for their date range.
+# Cancelled and checked-out stays release it.
+BLOCKING_STATUSES = ('pending', 'confirmed', 'checked_in')
+
+# Rooms in these states can't be booked for any dates.
+UNBOOKABLE_ROOM_STATUSES = ('maintenance',)
+
+
+def overlapping_reservations(check_in, check_out):
+    """Reservations whose stay intersects the half-open range [check_in, check_out)"""
+    return Reservation.objects.filter(
+        status__in=BLOCKING_STATUSES,
+        check_in_date__lt=check_out,
+        check_out_date__gt=check_in,
+    )
+
+
+def available_rooms(check_in, check_out, queryset=None):
+    """Filter rooms down to the ones free for the whole check_in..check_out stay.
+
+    Runs as a single NOT EXISTS subquery per room, which is served by the
+    (room, check_in_date, check_out_date) index on Reservation.
+    """
+    if queryset is None:
+        queryset = Room.objects.all()
+
+    clashes = overlapping_reservations(check_in, check_out).filter(room=OuterRef('pk'))
+    return queryset.exclude(status__in=UNBOOKABLE_ROOM_STATUSES).filter(~Exists(clashes))
+
+
+def is_room_available(room, check_in, check_out, exclude=None):
+    """Check whether a single room is free for the given dates"""
+    if room.status in UNBOOKABLE_ROOM_STATUSES:
+        return False
+
+    clashes = overlapping_reservations(check_in, check_out).filter(room=room)
+    if exclude is not None:
+        clashes = clashes.exclude(pk=exclude.pk)
+    return not clashes.exists()
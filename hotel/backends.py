@@ -0,0 +1,54 @@
+import time
+from django.core.cache.backends import locmem, redis
+from django.core.cache.backends.base import BaseCache
+from django.template.backends import django as django_templates
+from .metrics import record_cache, record_template
+
+_MISSING = object()
+
+
+class InstrumentedCacheMixin:
+    """Counts cache hits and misses against the current request (see hotel.metrics)"""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if value is _MISSING:
+            record_cache(0, 1)
+            return default
+        record_cache(1, 0)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = super().get_many(keys, version=version)
+        # The generic get_many goes through get(), which already counted
+        if super().get_many.__func__ is not BaseCache.get_many:
+            record_cache(len(values), len(keys) - len(values))
+        return values
+
+
+class LocMemCache(InstrumentedCacheMixin, locmem.LocMemCache):
+    pass
+
+
+class RedisCache(InstrumentedCacheMixin, redis.RedisCache):
+    pass
+
+
+class TimedTemplate(django_templates.Template):
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            record_template(time.perf_counter() - started)
+
+
+class DjangoTemplates(django_templates.DjangoTemplates):
+    """The stock Django engine, timing every top-level render (includes are part of it)"""
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
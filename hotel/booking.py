@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from .availability import is_room_available, UNBOOKABLE_ROOM_STATUSES
+from .models import Room, Reservation
+
+# Conflict reasons reported by reserve_room
+ROOM_NOT_FOUND = 'room_not_found'
+ROOM_UNAVAILABLE = 'room_unavailable'
+DATES_TAKEN = 'dates_taken'
+
+CONFLICT_MESSAGES = {
+    ROOM_NOT_FOUND: "This room does not exist.",
+    ROOM_UNAVAILABLE: "This room is not available for booking.",
+    DATES_TAKEN: "This room is already booked for the selected dates.",
+}
+
+
+@dataclass(frozen=True)
+class BookingResult:
+    """Outcome of a booking attempt: either a reservation or a conflict reason"""
+    reservation: Reservation = None
+    conflict: str = None
+
+    @property
+    def ok(self):
+        return self.reservation is not None
+
+    @property
+    def message(self):
+        return CONFLICT_MESSAGES.get(self.conflict, "")
+
+
+def _lock_room(room_id):
+    """Take a write lock on the room row for the rest of the transaction.
+
+    Backends without SELECT ... FOR UPDATE (SQLite) lock the whole database
+    on the first write, so a no-op UPDATE serializes bookings there instead.
+    """
+    if not connection.features.has_select_for_update:
+        Room.objects.filter(pk=room_id).update(status=F('status'))
+    return Room.objects.select_for_update().select_related('category').get(pk=room_id)
+
+
+def reserve_room(client, room_id, check_in_date, check_out_date,
+                 special_requests='', has_children=False, status='confirmed'):
+    """Atomically book a room for the given stay.
+
+    The room row is locked before the overlap check so concurrent bookings
+    of the same room run one after another; the overlap constraint added in
+    migration 0011 is the last line of defence if anything slips past.
+    Room.status is left alone: bookings hold dates, not the room itself.
+    """
+    try:
+        with transaction.atomic():
+            try:
+                room = _lock_room(room_id)
+            except Room.DoesNotExist:
+                return BookingResult(conflict=ROOM_NOT_FOUND)
+
+            if room.status in UNBOOKABLE_ROOM_STATUSES:
+                return BookingResult(conflict=ROOM_UNAVAILABLE)
+
+            if not is_room_available(room, check_in_date, check_out_date):
+                return BookingResult(conflict=DATES_TAKEN)
+
+            days = (check_out_date - check_in_date).days
+            reservation = Reservation.objects.create(
+                client=client,
+                room=room,
+                check_in_date=check_in_date,
+                check_out_date=check_out_date,
+                status=status,
+                total_price=room.category.base_price * days,
+                special_requests=special_requests,
+                has_children=has_children
+            )
+    except IntegrityError:
+        return BookingResult(conflict=DATES_TAKEN)
+
+    return BookingResult(reservation=reservation)
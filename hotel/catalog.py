@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Min
+from .models import RoomCategory
+
+ROOM_CATEGORIES_CACHE_KEY = 'hotel:room_categories'
+
+
+def room_categories():
+    """All room categories ordered by name, cached until a category changes.
+
+    The timeout bounds staleness in processes that didn't make the change.
+    """
+    categories = cache.get(ROOM_CATEGORIES_CACHE_KEY)
+    if categories is None:
+        categories = list(RoomCategory.objects.order_by('name'))
+        cache.set(ROOM_CATEGORIES_CACHE_KEY, categories, settings.ROOM_CATEGORIES_CACHE_TIMEOUT)
+    return categories
+
+
+async def aroom_categories():
+    categories = await cache.aget(ROOM_CATEGORIES_CACHE_KEY)
+    if categories is None:
+        categories = [category async for category in RoomCategory.objects.order_by('name')]
+        await cache.aset(ROOM_CATEGORIES_CACHE_KEY, categories, settings.ROOM_CATEGORIES_CACHE_TIMEOUT)
+    return categories
+
+
+def invalidate_room_categories():
+    cache.delete(ROOM_CATEGORIES_CACHE_KEY)
+
+
+def category_price_range():
+    """Lowest and highest base price across categories in a single query"""
+    prices = RoomCategory.objects.aggregate(low=Min('base_price'), high=Max('base_price'))
+    return prices['low'] or 0, prices['high'] or 1000
+
+
+async def acategory_price_range():
+    prices = await RoomCategory.objects.aaggregate(low=Min('base_price'), high=Max('base_price'))
+    return prices['low'] or 0, prices['high'] or 1000
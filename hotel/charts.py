@@ -0,0 +1,98 @@
+import hashlib
+import json
+from datetime import timedelta
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from .models import ChartImage
+
+# Bump when the chart styling changes so cached images get re-rendered
+RENDER_VERSION = 1
+
+
+def chart_data_hash(**spec):
+    """Stable hash of everything that affects how a chart looks"""
+    payload = json.dumps({'version': RENDER_VERSION, **spec}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render_bar_chart(title, labels, values, xlabel='', ylabel='', color='skyblue'):
+    """Render a bar chart to PNG bytes.
+
+    Uses a standalone Figure with its own Agg canvas instead of pyplot, so
+    there is no global state shared between threads.
+    """
+    figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(figure)
+    axes = figure.subplots()
+    axes.bar(labels, values, color=color)
+    axes.set_title(title)
+    axes.set_xlabel(xlabel)
+    axes.set_ylabel(ylabel)
+    axes.tick_params(axis='x', labelrotation=45)
+    for label in axes.get_xticklabels():
+        label.set_horizontalalignment('right')
+    figure.tight_layout()
+
+    buffer = BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+def bar_chart_spec(title, labels, values, xlabel='', ylabel=''):
+    """Keyword arguments for render_bar_chart plus the hash identifying them"""
+    spec = {
+        'title': title,
+        'labels': list(labels),
+        'values': list(values),
+        'xlabel': xlabel,
+        'ylabel': ylabel,
+    }
+    return spec, chart_data_hash(kind='bar', **spec)
+
+
+def find_chart(data_hash):
+    """Return the stored chart for this hash if its file still exists, marking it as used"""
+    chart = ChartImage.objects.filter(data_hash=data_hash).first()
+    if chart is None:
+        return None
+    if not (chart.image and chart.image.storage.exists(chart.image.name)):
+        # The file is gone; drop the row so the chart gets rendered again
+        chart.delete()
+        return None
+
+    ChartImage.objects.filter(pk=chart.pk).update(last_used_at=timezone.now())
+    return chart
+
+
+def store_chart(title, data_hash, png):
+    """Save rendered PNG bytes as the ChartImage for this hash"""
+    chart = ChartImage(title=title, data_hash=data_hash)
+    try:
+        with transaction.atomic():
+            chart.image.save(f'{slugify(title)}_{data_hash[:12]}.png', ContentFile(png), save=True)
+    except IntegrityError:
+        # Another worker rendered the same chart first
+        chart.image.delete(save=False)
+        chart = ChartImage.objects.get(data_hash=data_hash)
+    return chart
+
+
+def prune_charts(retention_days=None):
+    """Delete charts (rows and files) that haven't been used for retention_days"""
+    if retention_days is None:
+        retention_days = settings.CHART_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=retention_days)
+
+    deleted = 0
+    for chart in ChartImage.objects.filter(last_used_at__lt=cutoff).iterator():
+        if chart.image:
+            chart.image.delete(save=False)
+        chart.delete()
+        deleted += 1
+    return deleted
@@ -1,39 +1,80 @@
-from datetime import datetime
 import calendar
-import pytz
+import re
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.conf import settings
+from django.core.cache import cache
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from .models import Cart
+
+UTC = ZoneInfo('UTC')
+
+@lru_cache(maxsize=512)
+def resolve_timezone(name):
+    """(name, ZoneInfo) for a timezone cookie value, falling back to UTC for unknown names"""
+    try:
+        return name, ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return 'UTC', UTC
+
+@lru_cache(maxsize=64)
+def highlighted_calendar(year, month, day):
+    """Month as a Monday-first text calendar with the given day in brackets"""
+    text = calendar.TextCalendar(calendar.MONDAY).formatmonth(year, month)
+    return re.sub(rf'(?<!\d){day:2}(?!\d)', f'[{day:2}]', text, count=1).rstrip('\n')
 
 def date_timezone_info(request):
     """Add timezone and date information to context."""
-    user_timezone_name = request.COOKIES.get('user_timezone', 'UTC')
-    
-    try:
-        user_timezone = pytz.timezone(user_timezone_name)
-    except pytz.exceptions.UnknownTimeZoneError:
-        user_timezone = pytz.UTC
-        user_timezone_name = 'UTC'
+    user_timezone_name, user_timezone = resolve_timezone(request.COOKIES.get('user_timezone', 'UTC'))
     
     now_utc = timezone.now()
     now_user_tz = now_utc.astimezone(user_timezone)
     
-    current_day = now_user_tz.day
-    current_month = now_user_tz.month
-    current_year = now_user_tz.year
-    
-    cal = calendar.TextCalendar(calendar.MONDAY)
-    text_calendar = cal.formatmonth(current_year, current_month).splitlines()
-    
-    highlighted_calendar = []
-    for line in text_calendar:
-        if f"{current_day:2}" in line:
-            line = line.replace(f"{current_day:2}", f"[{current_day:2}]")
-        highlighted_calendar.append(line)
-    
-    highlighted_calendar = "\n".join(highlighted_calendar)
-    
     return {
         'user_timezone': user_timezone_name,
         'user_current_date': now_user_tz,
         'utc_current_date': now_utc,
-        'text_calendar': highlighted_calendar,
-    }
\ No newline at end of file
+        # Only rendered when a template asks for it, then shared by everyone on the same day
+        'text_calendar': SimpleLazyObject(
+            lambda: highlighted_calendar(now_user_tz.year, now_user_tz.month, now_user_tz.day)
+        ),
+    }
+
+def cart_summary_cache_key(request):
+    """Cache key for the visitor's cart count, or None if they can't have a cart yet"""
+    if request.user.is_authenticated:
+        return f'hotel:cart_count:user:{request.user.pk}'
+    if request.session.session_key:
+        return f'hotel:cart_count:session:{request.session.session_key}'
+    return None
+
+def invalidate_cart_summary(request):
+    key = cart_summary_cache_key(request)
+    if key:
+        cache.delete(key)
+
+def _cart_items_count(request):
+    key = cart_summary_cache_key(request)
+    if key is None:
+        return 0
+
+    count = cache.get(key)
+    if count is None:
+        if request.user.is_authenticated:
+            carts = Cart.objects.filter(user=request.user)
+        else:
+            carts = Cart.objects.filter(session_key=request.session.session_key)
+        count = carts.values_list('cached_count', flat=True).first() or 0
+        cache.set(key, count, settings.CART_SUMMARY_CACHE_TIMEOUT)
+    return count
+
+def cart_summary(request):
+    """Number of items in the visitor's cart for the header badge.
+
+    Lazy, so templates that never show the badge cost nothing; otherwise it
+    is served from the cache and only falls back to Cart.cached_count.
+    """
+    return {
+        'cart_items_count': SimpleLazyObject(lambda: _cart_items_count(request)),
+    }
@@ -0,0 +1,207 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from django.conf import settings
+from django.core.cache import cache
+from .outbound import http_client
+
+logger = logging.getLogger(__name__)
+
+# Background refreshes share a small pool so a slow upstream can tie up at
+# most a couple of threads, never a request worker.
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='widget-refresh')
+
+
+class CircuitBreaker:
+    """Stop calling an upstream after repeated failures, then probe it again later.
+
+    closed -> open after `failure_threshold` consecutive failures; once
+    `reset_timeout` seconds have passed a single trial call is let through
+    (half-open) and its outcome decides whether the circuit closes again.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half-open: let this caller through, keep everyone else out
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def reset(self):
+        self.record_success()
+
+
+class ExternalWidget:
+    """Cached value from a third-party API with stale-while-revalidate refresh.
+
+    get() only ever reads the cache: a fresh entry is returned as is, a
+    stale one is returned while a background refresh runs, and a missing
+    one returns None and schedules a refresh. The network is only touched
+    from the refresh executor, with a per-call timeout and a circuit breaker;
+    timeout=None leaves it to the per-host settings of hotel.outbound.
+    """
+
+    def __init__(self, name, fetch, ttl, stale_ttl, timeout=None, breaker=None):
+        self.name = name
+        self.fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.pending = None
+
+    @property
+    def cache_key(self):
+        return f'external_widget:{self.name}'
+
+    @property
+    def lock_key(self):
+        return f'external_widget:{self.name}:refreshing'
+
+    @property
+    def lock_timeout(self):
+        # Long enough for every retry; the lock is released as soon as the refresh ends
+        timeout = self.timeout or settings.EXTERNAL_API_TIMEOUT
+        return timeout * (settings.OUTBOUND_HTTP_RETRIES + 1) * 2
+
+    def is_fresh(self, entry):
+        return entry is not None and time.time() - entry['fetched_at'] <= self.ttl
+
+    def get(self):
+        entry = cache.get(self.cache_key)
+        if not self.is_fresh(entry):
+            self.refresh_async()
+        return entry['value'] if entry else None
+
+    async def aget(self):
+        """get() for async views; still never waits on the upstream"""
+        entry = await cache.aget(self.cache_key)
+        if not self.is_fresh(entry) and await cache.aadd(self.lock_key, True, self.lock_timeout):
+            self.pending = _refresh_executor.submit(self._refresh_and_unlock)
+        return entry['value'] if entry else None
+
+    def refresh(self):
+        """Fetch synchronously and store the result; returns the new value or None"""
+        if not self.breaker.allow():
+            return None
+
+        try:
+            value = self.fetch(timeout=self.timeout)
+        except Exception as e:
+            self.breaker.record_failure()
+            logger.warning("Error refreshing %s widget: %s", self.name, e)
+            return None
+
+        self.breaker.record_success()
+        cache.set(
+            self.cache_key,
+            {'value': value, 'fetched_at': time.time()},
+            self.ttl + self.stale_ttl
+        )
+        return value
+
+    def refresh_async(self):
+        """Schedule a background refresh unless one is already in flight"""
+        if not cache.add(self.lock_key, True, self.lock_timeout):
+            return None
+
+        self.pending = _refresh_executor.submit(self._refresh_and_unlock)
+        return self.pending
+
+    def _refresh_and_unlock(self):
+        try:
+            return self.refresh()
+        finally:
+            cache.delete(self.lock_key)
+
+
+def fetch_daily_quote(timeout=None):
+    """Get a daily quote from FavQs API"""
+    response = http_client.get(settings.FAVQS_QOTD_URL, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+
+    return {
+        'quote': data['quote']['body'],
+        'author': data['quote']['author']
+    }
+
+
+def fetch_exchange_rates(timeout=None, base_currency="USD"):
+    """Get current exchange rates"""
+    url = settings.EXCHANGE_RATE_API_URL.format(
+        api_key=settings.EXCHANGE_RATE_API_KEY,
+        base_currency=base_currency
+    )
+    response = http_client.get(url, timeout=timeout)
+    response.raise_for_status()
+    data = response.json()
+
+    if data['result'] != 'success':
+        raise ValueError(f"exchange rate API returned {data['result']!r}")
+
+    return {
+        'EUR': data['conversion_rates'].get('EUR'),
+        'GBP': data['conversion_rates'].get('GBP'),
+        'BYN': data['conversion_rates'].get('BYN'),
+        'RUB': data['conversion_rates'].get('RUB'),
+        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+daily_quote_widget = ExternalWidget(
+    'daily_quote',
+    fetch_daily_quote,
+    ttl=60 * 60,
+    stale_ttl=24 * 60 * 60,
+)
+
+exchange_rates_widget = ExternalWidget(
+    'exchange_rates',
+    fetch_exchange_rates,
+    ttl=15 * 60,
+    stale_ttl=6 * 60 * 60,
+)
+
+
+def get_daily_quote():
+    return daily_quote_widget.get()
+
+
+def get_exchange_rates():
+    return exchange_rates_widget.get()
+
+
+async def aget_daily_quote():
+    return await daily_quote_widget.aget()
+
+
+async def aget_exchange_rates():
+    return await exchange_rates_widget.aget()
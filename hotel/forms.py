@@ -42,7 +42,17 @@ class RoomFilterForm(forms.Form):
         initial=True,
         label="Show only available rooms"
     )
-    
+    check_in = forms.DateField(
+        required=False,
+        label="Check-in",
+        widget=forms.DateInput(attrs={'type': 'date'})
+    )
+    check_out = forms.DateField(
+        required=False,
+        label="Check-out",
+        widget=forms.DateInput(attrs={'type': 'date'})
+    )
+
     search = forms.CharField(
         required=False,
         label="Search",
@@ -65,6 +75,26 @@ class RoomFilterForm(forms.Form):
         label="Sort by"
     )
 
+    def __init__(self, *args, categories=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if categories is not None:
+            # Render the dropdown from an already loaded list instead of querying again
+            field = self.fields['category']
+            field.choices = [('', field.empty_label)] + [(c.pk, c.name) for c in categories]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        check_in = cleaned_data.get('check_in')
+        check_out = cleaned_data.get('check_out')
+
+        if bool(check_in) != bool(check_out):
+            raise forms.ValidationError("Please provide both check-in and check-out dates")
+
+        if check_in and check_out and check_out <= check_in:
+            raise forms.ValidationError("Check-out date must be after check-in date")
+
+        return cleaned_data
+
 class ReviewForm(forms.ModelForm):
     class Meta:
         model = Review
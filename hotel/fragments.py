@@ -0,0 +1,87 @@
+import hashlib
+from dataclasses import dataclass
+from django.core.cache import cache
+from .models import Article, Banner, Partner, Service
+from .page_cache import model_versions, watch_models
+
+
+@dataclass(frozen=True)
+class Fragment:
+    """A template block cached until timeout or until one of models changes"""
+    name: str
+    models: tuple
+    timeout: int
+
+
+# Banners and partners are edited rarely; services and news move more often.
+# Any save/delete of a listed model invalidates its block at once, so the
+# timeouts only bound how long a block survives changes made behind the ORM.
+FRAGMENTS = {
+    fragment.name: fragment for fragment in [
+        Fragment('home_banners', (Banner,), 60 * 60),
+        Fragment('home_services', (Service,), 30 * 60),
+        Fragment('home_latest_article', (Article,), 10 * 60),
+        Fragment('home_partners', (Partner,), 24 * 60 * 60),
+    ]
+}
+
+for fragment in FRAGMENTS.values():
+    watch_models(fragment.models)
+
+
+def fragment_cache_key(fragment):
+    versions = '|'.join(map(str, model_versions(fragment.models)))
+    digest = hashlib.sha256(versions.encode()).hexdigest()
+    return f'hotel:fragment:{fragment.name}:{digest}'
+
+
+def stats_key(name, outcome):
+    return f'hotel:fragment_stats:{name}:{outcome}'
+
+
+def record(name, outcome):
+    key = stats_key(name, outcome)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr; losing one sample is fine
+        pass
+
+
+def render_fragment(name, render):
+    """Cached output of the named fragment, calling render() to build it on a miss"""
+    fragment = FRAGMENTS[name]
+    key = fragment_cache_key(fragment)
+
+    content = cache.get(key)
+    if content is not None:
+        record(name, 'hits')
+        return content
+
+    record(name, 'misses')
+    content = render()
+    cache.set(key, content, fragment.timeout)
+    return content
+
+
+def fragment_stats():
+    """{name: {'hits', 'misses', 'hit_ratio'}} for every fragment, hit_ratio None before any render"""
+    keys = [stats_key(name, outcome) for name in FRAGMENTS for outcome in ('hits', 'misses')]
+    counts = cache.get_many(keys)
+
+    stats = {}
+    for name in FRAGMENTS:
+        hits = counts.get(stats_key(name, 'hits'), 0)
+        misses = counts.get(stats_key(name, 'misses'), 0)
+        total = hits + misses
+        stats[name] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else None,
+        }
+    return stats
+
+
+def reset_fragment_stats():
+    cache.delete_many([stats_key(name, outcome) for name in FRAGMENTS for outcome in ('hits', 'misses')])
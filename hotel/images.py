@@ -0,0 +1,116 @@
+import json
+import posixpath
+from io import BytesIO
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+from .models import Article, Banner, Partner, RoomImage, Staff
+
+# Image fields that get resized variants, by model
+IMAGE_FIELDS = {
+    RoomImage: 'image',
+    Banner: 'image',
+    Partner: 'logo',
+    Staff: 'photo',
+    Article: 'image',
+}
+
+# Bump when the resizing changes so existing variants get regenerated
+VARIANT_VERSION = 1
+
+
+def variant_base(name):
+    """room_images/pool.jpg -> room_images/pool; variants are stored next to the original"""
+    return posixpath.splitext(name)[0]
+
+
+def manifest_name(name):
+    return f'{variant_base(name)}.variants.json'
+
+
+def manifest_cache_key(name):
+    return f'hotel:image_variants:{name}'
+
+
+def _replace(storage, name, content):
+    # storage.save() picks a fresh name when the file exists; variants must keep theirs
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(content))
+
+
+def _encode(image, format, quality):
+    buffer = BytesIO()
+    if format == 'JPEG':
+        image.convert('RGB').save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
+    elif format == 'PNG':
+        image.save(buffer, format='PNG', optimize=True)
+    else:
+        image.save(buffer, format='WEBP', quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def render_image_variants(name, widths):
+    """Write WebP and JPEG (PNG for transparent images) variants of a stored image.
+
+    Only widths smaller than the original are produced. The manifest is
+    written last, so once it exists every variant it lists does too.
+    Returns the manifest.
+    """
+    storage = default_storage
+    quality = settings.IMAGE_VARIANT_QUALITY
+    with storage.open(name) as original:
+        image = Image.open(original)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    fallback = 'png' if has_alpha else 'jpeg'
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    base = variant_base(name)
+    variants = []
+    for width in sorted(set(widths)):
+        if width >= image.width:
+            continue
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        webp = _replace(storage, f'{base}.{width}w.webp', _encode(resized, 'WEBP', quality))
+        other = _replace(storage, f'{base}.{width}w.{fallback}', _encode(resized, fallback.upper(), quality))
+        variants.append({'width': width, 'webp': webp, 'fallback': other})
+
+    manifest = {
+        'version': VARIANT_VERSION,
+        'width': image.width,
+        'height': image.height,
+        'fallback': fallback,
+        'variants': variants,
+    }
+    _replace(storage, manifest_name(name), json.dumps(manifest).encode())
+    return manifest
+
+
+def load_manifest(name):
+    """Variants recorded for a stored image, or None if they haven't been generated yet"""
+    key = manifest_cache_key(name)
+    manifest = cache.get(key)
+    if manifest is None:
+        try:
+            with default_storage.open(manifest_name(name)) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        if manifest.get('version') != VARIANT_VERSION:
+            manifest = {}
+        # Remember misses briefly so pages don't hit storage on every render
+        timeout = settings.IMAGE_VARIANT_CACHE_TIMEOUT if manifest else settings.IMAGE_VARIANT_RETRY
+        cache.set(key, manifest, timeout)
+    return manifest or None
+
+
+def forget_manifest(name):
+    cache.delete(manifest_cache_key(name))
+
@@ -0,0 +1,180 @@
+import hashlib
+import logging
+import multiprocessing
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from functools import partial
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from .charts import render_bar_chart, store_chart
+from .images import VARIANT_VERSION, forget_manifest, load_manifest, render_image_variants
+from .models import RenderJob
+
+logger = logging.getLogger(__name__)
+
+# execute runs in a worker process and must be a picklable, module-level
+# callable taking the job params; finish runs back in Django with its output.
+JobKind = namedtuple('JobKind', ['execute', 'finish'])
+
+
+def finish_chart_job(job, png):
+    job.chart = store_chart(job.params['title'], job.data_hash, png)
+
+
+def finish_image_variants_job(job, manifest):
+    # Let pages pick up the new variants instead of a cached "not ready yet"
+    forget_manifest(job.params['name'])
+
+
+JOB_KINDS = {
+    'bar_chart': JobKind(render_bar_chart, finish_chart_job),
+    'image_variants': JobKind(render_image_variants, finish_image_variants_job),
+}
+
+
+def submit_job(kind, data_hash, params):
+    """Queue a render job, reusing one already in flight for the same data"""
+    recent = timezone.now() - timedelta(seconds=settings.RENDER_JOB_TIMEOUT)
+    job = RenderJob.objects.filter(
+        kind=kind,
+        data_hash=data_hash,
+        status__in=['queued', 'running'],
+        created_at__gte=recent
+    ).first()
+    if job is not None:
+        return job
+
+    job = RenderJob.objects.create(kind=kind, data_hash=data_hash, params=params)
+    transaction.on_commit(partial(get_backend().enqueue, job.pk))
+    return job
+
+
+def request_image_variants(name):
+    """Queue resized variants of a stored image unless they exist or were asked for recently"""
+    if not name or load_manifest(name) is not None:
+        return None
+    if not cache.add(f'hotel:image_variants_requested:{name}', True, settings.RENDER_JOB_TIMEOUT):
+        return None
+
+    widths = sorted(settings.IMAGE_VARIANT_WIDTHS)
+    data_hash = hashlib.sha256(f'{VARIANT_VERSION}:{name}:{widths}'.encode()).hexdigest()
+    return submit_job('image_variants', data_hash, {'name': name, 'widths': widths})
+
+
+def claim_job(job_id):
+    """Move a queued job to running; returns None if someone else got it first"""
+    claimed = RenderJob.objects.filter(pk=job_id, status='queued').update(
+        status='running',
+        started_at=timezone.now()
+    )
+    return RenderJob.objects.get(pk=job_id) if claimed else None
+
+
+def complete_job(job_id, output):
+    job = RenderJob.objects.get(pk=job_id)
+    try:
+        JOB_KINDS[job.kind].finish(job, output)
+    except Exception as e:
+        return fail_job(job_id, e)
+
+    job.status = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['chart', 'status', 'finished_at'])
+    return job
+
+
+def fail_job(job_id, error):
+    logger.error("Render job %s failed: %s", job_id, error)
+    RenderJob.objects.filter(pk=job_id).update(
+        status='failed',
+        error=str(error),
+        finished_at=timezone.now()
+    )
+
+
+def run_job(job_id):
+    """Claim and run a job in the current process"""
+    job = claim_job(job_id)
+    if job is None:
+        return
+    try:
+        output = JOB_KINDS[job.kind].execute(**job.params)
+    except Exception as e:
+        fail_job(job_id, e)
+    else:
+        complete_job(job_id, output)
+
+
+def make_process_pool(workers):
+    # Spawned workers start from a fresh interpreter, so load Django there
+    # before any job function (and the models it imports) is unpickled
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=django.setup
+    )
+
+
+class ImmediateBackend:
+    """Runs jobs synchronously when they are submitted (tests and debugging)"""
+
+    def enqueue(self, job_id):
+        run_job(job_id)
+
+
+class ProcessPoolBackend:
+    """Renders jobs on a process pool owned by the web process.
+
+    Only execute() runs in the pool; claiming and saving results happen on
+    the pool's callback thread, so workers never touch the database.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or settings.RENDER_JOB_WORKERS
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = make_process_pool(self.workers)
+            return self._executor
+
+    def enqueue(self, job_id):
+        job = claim_job(job_id)
+        if job is None:
+            return
+        future = self.executor.submit(JOB_KINDS[job.kind].execute, **job.params)
+        future.add_done_callback(partial(self._finished, job_id))
+
+    def _finished(self, job_id, future):
+        try:
+            complete_job(job_id, future.result())
+        except Exception as e:
+            fail_job(job_id, e)
+        finally:
+            connections.close_all()
+
+
+class DatabaseBackend:
+    """Leaves jobs in the RenderJob table for `manage.py run_render_jobs` to pick up"""
+
+    def enqueue(self, job_id):
+        pass
+
+
+_backends = {}
+
+
+def get_backend():
+    path = settings.RENDER_JOB_BACKEND
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
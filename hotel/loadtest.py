@@ -0,0 +1,123 @@
+import importlib.util
+import math
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+import requests
+
+# How each server is started; {port} and {workers} are filled in by server_command
+SERVERS = {
+    'asgi': {
+        'module': 'uvicorn',
+        'argv': ['uvicorn', 'hotel_reservation.asgi:application', '--port', '{port}',
+                 '--workers', '{workers}', '--no-access-log', '--log-level', 'warning'],
+    },
+    'wsgi': {
+        'module': 'gunicorn',
+        'argv': ['gunicorn', 'hotel_reservation.wsgi:application', '--bind', '127.0.0.1:{port}',
+                 '--workers', '{workers}', '--threads', '4', '--log-level', 'warning'],
+    },
+    # Single-process WSGI fallback for machines without gunicorn
+    'runserver': {
+        'module': 'django',
+        'argv': ['django', 'runserver', '127.0.0.1:{port}', '--noreload', '--skip-checks'],
+    },
+}
+
+
+@dataclass
+class LoadResult:
+    """Latencies in seconds of every completed request, plus failures"""
+    url: str
+    duration: float
+    latencies: list = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def requests(self):
+        return len(self.latencies)
+
+    @property
+    def rps(self):
+        return self.requests / self.duration if self.duration else 0
+
+    def percentile(self, p):
+        """Nearest-rank percentile latency in seconds, or None without samples"""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def run_load(url, concurrency=10, duration=10, timeout=10):
+    """Closed-loop load: `concurrency` clients each send requests back to back for `duration` seconds.
+
+    Every client keeps its own keep-alive session. Responses with a status
+    of 400 or above and failed requests count as errors, not latencies.
+    """
+    result = LoadResult(url=url, duration=duration)
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client():
+        latencies, errors = [], 0
+        with requests.Session() as session:
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = session.get(url, timeout=timeout)
+                except requests.RequestException:
+                    errors += 1
+                    continue
+                if response.status_code >= 400:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - started)
+        with lock:
+            result.latencies.extend(latencies)
+            result.errors += errors
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.duration = time.monotonic() - started
+    return result
+
+
+def server_available(kind):
+    return importlib.util.find_spec(SERVERS[kind]['module']) is not None
+
+
+def server_command(kind, port, workers):
+    argv = [arg.format(port=port, workers=workers) for arg in SERVERS[kind]['argv']]
+    return [sys.executable, '-m', *argv]
+
+
+def start_server(argv, url, ready_timeout=30):
+    """Start a server process and wait until url answers; raises RuntimeError if it never does"""
+    process = subprocess.Popen(argv, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.monotonic() + ready_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{argv[2]} exited: {process.stderr.read().decode(errors='replace').strip()}")
+        try:
+            requests.get(url, timeout=1)
+            return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"{argv[2]} did not answer {url} within {ready_timeout}s")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
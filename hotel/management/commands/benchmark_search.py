@@ -0,0 +1,72 @@
+import random
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from hotel.models import Room, RoomCategory
+from hotel.search import matching_ids
+
+COMMON_WORDS = [
+    'ocean', 'view', 'balcony', 'quiet', 'spacious', 'modern', 'classic', 'garden', 'king', 'twin',
+    'suite', 'family', 'deluxe', 'city', 'terrace', 'bathtub', 'shower', 'minibar', 'desk', 'sofa',
+]
+# Rarer filler vocabulary so that most searches are selective, as on a real site
+RARE_WORDS = [f'{prefix}{suffix}' for prefix in ('amber', 'birch', 'cedar', 'dune', 'ember') for suffix in range(400)]
+
+
+class Command(BaseCommand):
+    help = "Compare room search through the full-text index with the old icontains filter"
+
+    def add_arguments(self, parser):
+        parser.add_argument('terms', nargs='*', default=['cedar17', 'ocean', 'balc', 'deluxe suite', '10'])
+        parser.add_argument('--seed', type=int, default=0, help="Add this many synthetic rooms first (rolled back afterwards)")
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                self.seed_rooms(options['seed'])
+            self.stdout.write(f"{Room.objects.count()} rooms, {options['repeat']} runs per term")
+            for term in options['terms']:
+                baseline, baseline_count = self.time(options['repeat'], lambda: self.icontains(term))
+                indexed, indexed_count = self.time(options['repeat'], lambda: self.full_text(term))
+                self.stdout.write(
+                    f"{term!r}: icontains {baseline * 1000:.2f} ms ({baseline_count} rooms), "
+                    f"full-text {indexed * 1000:.2f} ms ({indexed_count} rooms), "
+                    f"{baseline / indexed if indexed else float('inf'):.1f}x"
+                )
+            # Leave the database exactly as it was
+            transaction.set_rollback(True)
+
+    def icontains(self, term):
+        """The filter RoomListView used before the search index existed"""
+        return list(Room.objects.filter(
+            Q(room_number__icontains=term) |
+            Q(description__icontains=term) |
+            Q(category__name__icontains=term)
+        ).values_list('pk', flat=True))
+
+    def full_text(self, term):
+        """The filter RoomListView uses now"""
+        return list(Room.objects.filter(pk__in=matching_ids(term, 'room')).values_list('pk', flat=True))
+
+    def time(self, repeat, run):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = run()
+        return (time.perf_counter() - started) / repeat, len(result)
+
+    def seed_rooms(self, count):
+        categories = list(RoomCategory.objects.all()) or [
+            RoomCategory.objects.create(name=name, description=name, base_price=price)
+            for name, price in [('Standard', 100), ('Deluxe', 200), ('Suite', 400)]
+        ]
+        start = Room.objects.count()
+        rng = random.Random(0)
+        # Saved one by one so the search index is filled by the same signals as in production
+        for i in range(count):
+            Room.objects.create(
+                room_number=str(1000 + start + i),
+                category=rng.choice(categories),
+                description=' '.join(rng.choices(COMMON_WORDS, k=2) + rng.choices(RARE_WORDS, k=10))
+            )
@@ -0,0 +1,165 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+from django.test import Client as TestClient, override_settings
+from django.urls import reverse
+from hotel.loadtest import LoadResult
+from hotel.models import Client, Reservation, Room, RoomCategory, Service
+
+# Environment for each database profile, on top of a fresh SQLite file
+PROFILES = {
+    'baseline': {'SQLITE_TUNING': '0', 'DATABASE_CONN_MAX_AGE': '0'},
+    'tuned': {'SQLITE_TUNING': '1', 'DATABASE_CONN_MAX_AGE': '60'},
+}
+WORKLOADS = ('booking', 'cart')
+
+
+class Command(BaseCommand):
+    help = "Compare booking and cart write throughput with SQLite defaults and the tuned database profile"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES))
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--operations', type=int, default=400, help="Requests per workload")
+        parser.add_argument(
+            '--worker', action='store_true',
+            help="Run the workloads against the configured database and print JSON (used by the comparison)"
+        )
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            self.stdout.write(json.dumps(self.run_workloads(options['threads'], options['operations'])))
+            return
+
+        for profile in options['profiles']:
+            with tempfile.TemporaryDirectory() as directory:
+                results = self.run_profile(profile, os.path.join(directory, 'bench.sqlite3'), options)
+            for workload in WORKLOADS:
+                result = results[workload]
+                self.stdout.write(
+                    f"{profile:<9} {workload:<8} {result['rps']:8.1f} req/s  "
+                    f"p50 {result['p50'] * 1000:7.1f} ms  p95 {result['p95'] * 1000:7.1f} ms  "
+                    f"{result['errors']} errors"
+                )
+            self.stdout.write(
+                f"{profile:<9} journal_mode={results['journal_mode']}, {results['reservations']} reservations written"
+            )
+
+    def run_profile(self, profile, path, options):
+        """Migrate a fresh database and run the workloads on it in a child process"""
+        env = {**os.environ, **PROFILES[profile], 'SQLITE_PATH': path}
+        env.pop('DATABASE_ENGINE', None)
+        env.pop('DATABASE_REPLICAS', None)
+        base = [sys.executable, '-m', 'django']
+        run = dict(env=env, cwd=settings.BASE_DIR, capture_output=True, text=True)
+
+        migrated = subprocess.run([*base, 'migrate', '-v0'], **run)
+        if migrated.returncode:
+            raise CommandError(f"{profile}: migrate failed\n{migrated.stderr}")
+        worker = subprocess.run([
+            *base, 'benchmark_writes', '--worker',
+            '--threads', str(options['threads']), '--operations', str(options['operations']),
+        ], **run)
+        if worker.returncode:
+            raise CommandError(f"{profile}: benchmark failed\n{worker.stderr}")
+        return json.loads(worker.stdout.strip().splitlines()[-1])
+
+    def run_workloads(self, threads, operations):
+        category = RoomCategory.objects.create(name='Benchmark', description='Benchmark', base_price=100)
+        rooms = Room.objects.bulk_create([
+            Room(room_number=f'B{i}', category=category) for i in range(threads * 4)
+        ])
+        services = Service.objects.bulk_create([
+            Service(name=f'Benchmark {i}', description='Benchmark', price=10) for i in range(5)
+        ])
+        users = []
+        for i in range(threads):
+            user = User.objects.create_user(f'benchmark{i}', password='benchmark')
+            Client.objects.create(user=user, first_name='Bench', last_name=str(i),
+                                  email=f'benchmark{i}@example.com', phone='+375291234567')
+            users.append(user)
+        connections.close_all()
+
+        first_night = date.today() + timedelta(days=1)
+
+        def book(client, op):
+            # Stays never overlap, so every booking writes
+            check_in = first_night + timedelta(days=2 * (op // len(rooms)))
+            return client.post(reverse('hotel:book_room', args=[rooms[op % len(rooms)].pk]), {
+                'check_in_date': check_in,
+                'check_out_date': check_in + timedelta(days=1),
+            })
+
+        def add_to_cart(client, op):
+            return client.get(reverse('hotel:add_to_cart', args=[services[op % len(services)].pk]))
+
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            results = {
+                'booking': self.measure(book, users, operations),
+                'cart': self.measure(add_to_cart, users, operations),
+            }
+        results['reservations'] = Reservation.objects.count()
+        results['journal_mode'] = connection.vendor
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                results['journal_mode'] = cursor.fetchone()[0]
+        return results
+
+    def measure(self, send, users, operations):
+        """Spread operations over one logged-in client per thread, as concurrent requests"""
+        result = LoadResult(url=send.__name__, duration=0)
+        lock = threading.Lock()
+
+        def run(user, ops):
+            client = TestClient()
+            client.force_login(user)
+            latencies, errors = [], 0
+            try:
+                for op in ops:
+                    started = time.perf_counter()
+                    try:
+                        response = send(client, op)
+                    except Exception:
+                        errors += 1
+                        continue
+                    finally:
+                        # The test client skips the end-of-request hook that closes
+                        # connections older than CONN_MAX_AGE
+                        close_old_connections()
+                    if response.status_code >= 400:
+                        errors += 1
+                    else:
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                connections.close_all()
+            with lock:
+                result.latencies.extend(latencies)
+                result.errors += errors
+
+        workers = [
+            threading.Thread(target=run, args=(user, range(i, operations, len(users))))
+            for i, user in enumerate(users)
+        ]
+        started = time.monotonic()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        result.duration = time.monotonic() - started
+        return {
+            'requests': result.requests,
+            'errors': result.errors,
+            'rps': result.rps,
+            'p50': result.percentile(50) or 0,
+            'p95': result.percentile(95) or 0,
+        }
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from hotel.uploads import expire_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete chunked uploads that were abandoned before completion"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=settings.CHUNKED_UPLOAD_EXPIRY_HOURS,
+            help="Drop uploads not resumed within this many hours (default: CHUNKED_UPLOAD_EXPIRY_HOURS)"
+        )
+
+    def handle(self, *args, **options):
+        deleted = expire_uploads(options['hours'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} upload(s)"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from hotel.fragments import fragment_stats, reset_fragment_stats
+
+
+class Command(BaseCommand):
+    help = "Show the hit ratio of each cached template fragment"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Zero the counters after printing them")
+
+    def handle(self, *args, **options):
+        for name, stats in fragment_stats().items():
+            ratio = 'n/a' if stats['hit_ratio'] is None else f"{stats['hit_ratio']:.1%}"
+            self.stdout.write(f"{name}: {ratio} ({stats['hits']} hits, {stats['misses']} misses)")
+        if options['reset']:
+            reset_fragment_stats()
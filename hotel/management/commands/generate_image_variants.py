@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from hotel.images import IMAGE_FIELDS, forget_manifest, load_manifest, render_image_variants
+
+
+class Command(BaseCommand):
+    help = "Generate missing resized variants for every uploaded image (runs inline, not on the job pool)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Regenerate variants that already exist")
+
+    def handle(self, *args, **options):
+        generated = failed = 0
+        for model, field in IMAGE_FIELDS.items():
+            names = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            for name in names.values_list(field, flat=True).distinct():
+                if not options['force'] and load_manifest(name) is not None:
+                    continue
+                try:
+                    render_image_variants(name, settings.IMAGE_VARIANT_WIDTHS)
+                except (OSError, ValueError) as e:
+                    failed += 1
+                    self.stderr.write(f"{name}: {e}")
+                    continue
+                forget_manifest(name)
+                generated += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Generated variants for {generated} image(s), {failed} failed"))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+from hotel.loadtest import SERVERS, run_load, server_available, server_command, start_server, stop_server
+
+
+class Command(BaseCommand):
+    help = "Measure requests/second and latency of the async pages under ASGI and WSGI servers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=['/', '/news/', '/services/', '/rooms/'])
+        parser.add_argument('--servers', nargs='+', choices=list(SERVERS), default=['asgi', 'wsgi'])
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--duration', type=float, default=10, help="Seconds of load per path")
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--target', help="Load an already running server at this base URL instead")
+
+    def handle(self, *args, **options):
+        if options['target']:
+            self.load('target', options['target'].rstrip('/'), options)
+            return
+
+        for kind in options['servers']:
+            if not server_available(kind):
+                self.stdout.write(self.style.WARNING(f"{kind}: skipped, {SERVERS[kind]['module']} is not installed"))
+                continue
+            base_url = f"http://127.0.0.1:{options['port']}"
+            try:
+                process = start_server(server_command(kind, options['port'], options['workers']), base_url + '/')
+            except RuntimeError as e:
+                raise CommandError(f"{kind}: {e}")
+            try:
+                self.load(kind, base_url, options)
+            finally:
+                stop_server(process)
+
+    def load(self, label, base_url, options):
+        for path in options['paths']:
+            url = base_url + path
+            # One warm-up pass so every server starts with the same caches filled
+            run_load(url, concurrency=1, duration=0.5)
+            result = run_load(url, concurrency=options['concurrency'], duration=options['duration'])
+            if not result.requests:
+                self.stdout.write(f"{label:<9} {path:<12} no successful requests ({result.errors} errors)")
+                continue
+            self.stdout.write(
+                f"{label:<9} {path:<12} {result.rps:8.1f} req/s  "
+                f"p50 {result.percentile(50) * 1000:7.1f} ms  "
+                f"p95 {result.percentile(95) * 1000:7.1f} ms  "
+                f"p99 {result.percentile(99) * 1000:7.1f} ms  "
+                f"{result.errors} errors"
+            )
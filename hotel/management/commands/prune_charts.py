@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from hotel.charts import prune_charts
+
+
+class Command(BaseCommand):
+    help = "Delete generated chart images (rows and files) that haven't been viewed recently"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.CHART_RETENTION_DAYS,
+            help="Keep charts used within this many days (default: CHART_RETENTION_DAYS)"
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_charts(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} chart(s)"))
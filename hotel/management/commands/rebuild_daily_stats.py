@@ -0,0 +1,29 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from hotel.rollups import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ReservationDailyStats rollup from reservations, optionally for a date range only"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="First date to rebuild (YYYY-MM-DD)")
+        parser.add_argument('--end', help="Last date to rebuild (YYYY-MM-DD)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start = self.parse_date(options['start'])
+        end = self.parse_date(options['end'])
+        if start and end and end < start:
+            raise CommandError("--end must not be before --start")
+
+        rows = rebuild_daily_stats(start=start, end=end, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} daily stats rows"))
+
+    def parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f"Invalid date: {value}")
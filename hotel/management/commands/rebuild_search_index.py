@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from hotel.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the full-text search documents for rooms, articles, FAQs, services and vacancies; "
+        "run once after migration 0019 to index existing content"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        indexed = rebuild_search_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} search documents"))
@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import as_completed
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from hotel.jobs import JOB_KINDS, claim_job, complete_job, fail_job, make_process_pool
+from hotel.models import RenderJob
+
+
+class Command(BaseCommand):
+    help = "Run queued render jobs from the RenderJob table on a local process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.RENDER_JOB_WORKERS)
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.RENDER_JOB_POLL_INTERVAL,
+            help="Seconds to wait before polling again when no job could be claimed"
+        )
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is empty")
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        processed = 0
+
+        with make_process_pool(workers) as pool:
+            while True:
+                job_ids = list(
+                    RenderJob.objects.filter(status='queued').values_list('pk', flat=True)[:workers * 2]
+                )
+                in_flight = {}
+                for job_id in job_ids:
+                    job = claim_job(job_id)
+                    if job is not None:
+                        future = pool.submit(JOB_KINDS[job.kind].execute, **job.params)
+                        in_flight[future] = job_id
+
+                for future in as_completed(in_flight):
+                    job_id = in_flight[future]
+                    try:
+                        complete_job(job_id, future.result())
+                    except Exception as e:
+                        fail_job(job_id, e)
+                processed += len(in_flight)
+
+                if not in_flight:
+                    if options['once'] and not job_ids:
+                        break
+                    # Empty queue, or other workers claimed every job first
+                    time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} job(s)"))
@@ -0,0 +1,119 @@
+import os
+import re
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class FileRange:
+    """Read-only view of `length` bytes of an open file starting at `start`.
+
+    The underlying file is positioned at `start` and fileno() is exposed, so
+    a WSGI server's file_wrapper (e.g. gunicorn's sendfile) can send the
+    range straight from the page cache, bounded by Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single "bytes=" range, or None to send the whole file.
+
+    Malformed and multi-range headers are ignored, as RFC 9110 allows;
+    ranges starting past the end raise RangeNotSatisfiable.
+    """
+    match = RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the final N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    """False when If-Range names an older version of the file, so the whole file must be sent"""
+    validator = request.headers.get('If-Range')
+    if not validator:
+        return True
+    if validator.startswith(('"', 'W/')):
+        return validator == etag
+    return parse_http_date_safe(validator) == last_modified
+
+
+def ranged_file_response(request, path):
+    """Serve a file from disk, honouring Range, If-Range and the usual conditional headers"""
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404
+    if not os.path.isfile(path):
+        raise Http404
+
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        byte_range = None
+        header = request.headers.get('Range')
+        if header and request.method in ('GET', 'HEAD') and if_range_matches(request, etag, last_modified):
+            try:
+                byte_range = parse_range(header, size)
+            except RangeNotSatisfiable:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+
+        if response is None:
+            file = open(path, 'rb')
+            if byte_range is None:
+                response = FileResponse(file)
+            else:
+                start, end = byte_range
+                response = FileResponse(FileRange(file, start, end - start + 1), status=206)
+                response['Content-Length'] = end - start + 1
+                response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -0,0 +1,211 @@
+import logging
+import math
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, roughly doubling from 5 ms to 10 s
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+@dataclass
+class RequestStats:
+    """What one request spent its time on.
+
+    Kept as a mutable object in a ContextVar so work done in sync_to_async
+    threads (async views, template rendering) is added to the same request.
+    """
+    db_queries: int = 0
+    db_time: float = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    http_time: float = 0
+    template_time: float = 0
+
+
+_current = ContextVar('hotel_request_stats', default=None)
+
+
+def begin_request():
+    """Start collecting for a request; returns (stats, token) for end_request"""
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def record_cache(hits, misses):
+    stats = _current.get()
+    if stats is not None:
+        stats.cache_hits += hits
+        stats.cache_misses += misses
+
+
+def record_http(seconds):
+    stats = _current.get()
+    if stats is not None:
+        stats.http_time += seconds
+
+
+def record_template(seconds):
+    stats = _current.get()
+    if stats is not None:
+        stats.template_time += seconds
+
+
+def time_queries(execute, sql, params, many, context):
+    """Execute wrapper adding each query's count and duration to the current request"""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_queries += 1
+        stats.db_time += time.perf_counter() - started
+
+
+def watch_queries(sender, connection, **kwargs):
+    """connection_created receiver installing time_queries on every connection"""
+    # The signal fires again whenever the same connection object reconnects
+    if time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_queries)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        # The last slot is +Inf
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip((*self.buckets, math.inf), self.counts):
+            total += count
+            yield bound, total
+
+
+# name: (help, buckets, RequestStats attribute or None for wall time)
+HISTOGRAMS = {
+    'hotel_request_duration_seconds': ("Wall time per request", TIME_BUCKETS, None),
+    'hotel_request_db_queries': ("Database queries per request", QUERY_BUCKETS, 'db_queries'),
+    'hotel_request_db_seconds': ("Time spent in database queries per request", TIME_BUCKETS, 'db_time'),
+    'hotel_request_template_seconds': ("Time spent rendering templates per request", TIME_BUCKETS, 'template_time'),
+    'hotel_request_http_seconds': ("Time spent on outbound HTTP per request", TIME_BUCKETS, 'http_time'),
+}
+COUNTERS = {
+    'hotel_requests_total': "Requests by view and status code class",
+    'hotel_cache_hits_total': "Cache reads that found a value",
+    'hotel_cache_misses_total': "Cache reads that found nothing",
+}
+
+
+class MetricsRegistry:
+    """In-process aggregates per view; each server process exposes its own"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {name: {} for name in HISTOGRAMS}
+            self.counters = {name: {} for name in COUNTERS}
+
+    def _count(self, name, key, amount=1):
+        counter = self.counters[name]
+        counter[key] = counter.get(key, 0) + amount
+
+    def observe_request(self, view, status, duration, stats):
+        with self._lock:
+            for name, (_, buckets, attribute) in HISTOGRAMS.items():
+                histogram = self.histograms[name].get(view)
+                if histogram is None:
+                    histogram = self.histograms[name][view] = Histogram(buckets)
+                histogram.observe(duration if attribute is None else getattr(stats, attribute))
+            self._count('hotel_requests_total', (view, f'{status // 100}xx'))
+            self._count('hotel_cache_hits_total', (view,), stats.cache_hits)
+            self._count('hotel_cache_misses_total', (view,), stats.cache_misses)
+
+    def exposition(self, upstreams=None):
+        """Everything in the Prometheus text format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name, (help_text, _, _) in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for view, histogram in sorted(self.histograms[name].items()):
+                    for bound, total in histogram.cumulative():
+                        le = '+Inf' if bound == math.inf else format_value(bound)
+                        lines.append(f'{name}_bucket{labels(view=view, le=le)} {total}')
+                    lines.append(f'{name}_sum{labels(view=view)} {format_value(histogram.sum)}')
+                    lines.append(f'{name}_count{labels(view=view)} {histogram.count}')
+            for name, help_text in COUNTERS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for key, value in sorted(self.counters[name].items()):
+                    names = ('view', 'status') if name == 'hotel_requests_total' else ('view',)
+                    lines.append(f'{name}{labels(**dict(zip(names, key)))} {value}')
+
+        for name, field, help_text in UPSTREAM_METRICS:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+            for host, stats in sorted((upstreams or {}).items()):
+                lines.append(f'{name}{labels(host=host)} {format_value(stats[field])}')
+        return '\n'.join(lines) + '\n'
+
+
+# Counters kept by hotel.outbound.HTTPClient, republished per upstream host
+UPSTREAM_METRICS = [
+    ('hotel_upstream_requests_total', 'requests', "Outbound requests, retries included in one"),
+    ('hotel_upstream_errors_total', 'errors', "Outbound requests that failed"),
+    ('hotel_upstream_retries_total', 'retries', "Outbound retry attempts"),
+    ('hotel_upstream_rejected_total', 'rejected', "Outbound requests refused by the per-host concurrency limit"),
+    ('hotel_upstream_seconds_total', 'latency_total', "Seconds spent on outbound requests"),
+]
+
+
+def slow_threshold(view):
+    return settings.METRICS_SLOW_REQUEST_THRESHOLDS.get(view, settings.METRICS_SLOW_REQUEST_SECONDS)
+
+
+def log_if_slow(request, view, duration, stats):
+    if duration < slow_threshold(view):
+        return
+    logger.warning(
+        "Slow request %s %s (%s): %.0f ms, %d queries in %.0f ms, templates %.0f ms, "
+        "outbound HTTP %.0f ms, cache %d hits / %d misses",
+        request.method, request.path, view, duration * 1000,
+        stats.db_queries, stats.db_time * 1000, stats.template_time * 1000,
+        stats.http_time * 1000, stats.cache_hits, stats.cache_misses,
+    )
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def labels(**values):
+    return '{' + ','.join(f'{key}="{escape_label(value)}"' for key, value in values.items()) + '}'
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,147 @@
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from . import querylog
+from .metrics import begin_request, end_request, log_if_slow, registry
+from .routers import begin_read_pin, end_read_pin
+
+PIN_SESSION_KEY = '_read_primary_until'
+
+
+class ReplicaPinningMiddleware:
+    """Read-your-writes on top of hotel.routers.PrimaryReplicaRouter.
+
+    Once a visitor writes, the rest of that request and all of their requests
+    for the next REPLICA_PIN_SECONDS read from the primary, giving replicas
+    time to catch up. The deadline is kept in the session, so this must come
+    after SessionMiddleware. Works for both sync and async views.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+
+        pin, token = begin_read_pin(request.session.get(PIN_SESSION_KEY, 0) > time.time())
+        try:
+            response = self.get_response(request)
+        finally:
+            end_read_pin(token)
+
+        if pin.wrote:
+            request.session[PIN_SESSION_KEY] = time.time() + settings.REPLICA_PIN_SECONDS
+        return response
+
+    async def __acall__(self, request):
+        if not settings.REPLICA_DATABASES:
+            return await self.get_response(request)
+
+        pin, token = begin_read_pin(await request.session.aget(PIN_SESSION_KEY, 0) > time.time())
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_read_pin(token)
+
+        if pin.wrote:
+            await request.session.aset(PIN_SESSION_KEY, time.time() + settings.REPLICA_PIN_SECONDS)
+        return response
+
+
+def view_name(request):
+    match = request.resolver_match
+    return match.view_name if match else 'unresolved'
+
+
+class MetricsMiddleware:
+    """Record wall time, queries, cache use, outbound HTTP and template time per URL name.
+
+    Aggregated in hotel.metrics.registry and served to staff at /metrics.
+    Requests slower than their view's METRICS_SLOW_REQUEST_THRESHOLDS entry
+    (default METRICS_SLOW_REQUEST_SECONDS) are logged. Goes first, so the
+    other middleware is measured too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        stats, token = begin_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        self.observe(request, response, time.perf_counter() - started, stats)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        stats, token = begin_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        self.observe(request, response, time.perf_counter() - started, stats)
+        return response
+
+    def observe(self, request, response, duration, stats):
+        view = view_name(request)
+        registry.observe_request(view, response.status_code, duration, stats)
+        log_if_slow(request, view, duration, stats)
+
+
+class QueryInspectionMiddleware:
+    """Report query shapes a request repeats (N+1 queries) when QUERY_INSPECTION is on.
+
+    Findings are logged, or raised as they happen in QUERY_INSPECTION_MODE
+    'raise', and collected in hotel.querylog.report for the test run report.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.QUERY_INSPECTION:
+            return self.get_response(request)
+
+        queries, token = querylog.begin_request()
+        try:
+            return self.get_response(request)
+        finally:
+            querylog.end_request(queries, token, view_name(request))
+
+    async def __acall__(self, request):
+        if not settings.QUERY_INSPECTION:
+            return await self.get_response(request)
+
+        queries, token = querylog.begin_request()
+        try:
+            return await self.get_response(request)
+        finally:
+            querylog.end_request(queries, token, view_name(request))
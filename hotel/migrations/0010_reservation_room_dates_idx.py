@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0009_remove_companyinfo_video_url_companyinfo_video_file'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['room', 'check_in_date', 'check_out_date'], name='reservation_room_dates_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+from django.db import migrations
+
+BLOCKING_STATUSES = "('pending', 'confirmed', 'checked_in')"
+
+OVERLAP_CHECK = f"""
+    SELECT RAISE(ABORT, 'reservation overlaps an existing reservation for this room')
+    WHERE EXISTS (
+        SELECT 1 FROM hotel_reservation r
+        WHERE r.room_id = NEW.room_id
+          AND r.id != COALESCE(NEW.id, -1)
+          AND r.status IN {BLOCKING_STATUSES}
+          AND r.check_in_date < NEW.check_out_date
+          AND r.check_out_date > NEW.check_in_date
+    );
+"""
+
+SQLITE_FORWARD = [
+    f"""
+    CREATE TRIGGER hotel_reservation_no_overlap_insert
+    BEFORE INSERT ON hotel_reservation
+    WHEN NEW.status IN {BLOCKING_STATUSES}
+    BEGIN {OVERLAP_CHECK} END;
+    """,
+    f"""
+    CREATE TRIGGER hotel_reservation_no_overlap_update
+    BEFORE UPDATE OF room_id, check_in_date, check_out_date, status ON hotel_reservation
+    WHEN NEW.status IN {BLOCKING_STATUSES}
+    BEGIN {OVERLAP_CHECK} END;
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS hotel_reservation_no_overlap_insert;",
+    "DROP TRIGGER IF EXISTS hotel_reservation_no_overlap_update;",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS btree_gist;",
+    f"""
+    ALTER TABLE hotel_reservation
+    ADD CONSTRAINT hotel_reservation_no_overlap
+    EXCLUDE USING gist (
+        room_id WITH =,
+        daterange(check_in_date, check_out_date, '[)') WITH &&
+    ) WHERE (status IN {BLOCKING_STATUSES});
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "ALTER TABLE hotel_reservation DROP CONSTRAINT IF EXISTS hotel_reservation_no_overlap;",
+]
+
+
+def run_for_vendor(forward):
+    def operation(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == 'sqlite':
+            statements = SQLITE_FORWARD if forward else SQLITE_BACKWARD
+        elif vendor == 'postgresql':
+            statements = POSTGRES_FORWARD if forward else POSTGRES_BACKWARD
+        else:
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+    """Reject overlapping active reservations of the same room in the database itself"""
+
+    dependencies = [
+        ('hotel', '0010_reservation_room_dates_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_for_vendor(True), run_for_vendor(False)),
+    ]
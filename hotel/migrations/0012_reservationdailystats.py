@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:29
+
+import django.db.models.deletion
+from collections import defaultdict
+from datetime import timedelta
+from django.db import migrations, models
+
+
+def backfill_daily_stats(apps, schema_editor):
+    Reservation = apps.get_model('hotel', 'Reservation')
+    ReservationDailyStats = apps.get_model('hotel', 'ReservationDailyStats')
+
+    totals = defaultdict(lambda: [0, 0, 0, 0])
+    rows = Reservation.objects.exclude(status='cancelled').values_list(
+        'room__category_id', 'check_in_date', 'check_out_date', 'total_price'
+    )
+    for category_id, check_in_date, check_out_date, total_price in rows.iterator():
+        nights = (check_out_date - check_in_date).days
+        entry = totals[(check_in_date, category_id)]
+        entry[0] += 1
+        entry[1] += total_price
+        entry[2] += nights
+        for i in range(nights):
+            totals[(check_in_date + timedelta(days=i), category_id)][3] += 1
+
+    ReservationDailyStats.objects.bulk_create([
+        ReservationDailyStats(
+            date=day,
+            category_id=category_id,
+            bookings=bookings,
+            revenue=revenue,
+            nights=nights,
+            occupied_rooms=occupied_rooms
+        )
+        for (day, category_id), (bookings, revenue, nights, occupied_rooms) in totals.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0011_reservation_no_overlap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservationDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bookings', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('nights', models.IntegerField(default=0)),
+                ('occupied_rooms', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='hotel.roomcategory')),
+            ],
+            options={
+                'verbose_name_plural': 'Reservation daily stats',
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'category'), name='unique_daily_stats_per_category')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:31
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0012_reservationdailystats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chartimage',
+            name='data_hash',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='chartimage',
+            name='last_used_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
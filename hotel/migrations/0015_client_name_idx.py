@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0014_renderjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='client_name_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0015_client_name_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_date'], name='article_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='banner',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order'], name='banner_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promocode',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['valid_to'], name='promocode_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promocode',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['-valid_to'], name='promocode_expired_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['-created_at'], name='reservation_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-date_posted'], name='review_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['name'], name='service_available_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-date_posted'], name='vacancy_active_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:42
+
+from django.db import migrations, models
+
+
+def backfill_cart_totals(apps, schema_editor):
+    Cart = apps.get_model('hotel', 'Cart')
+    CartItem = apps.get_model('hotel', 'CartItem')
+
+    totals = {}
+    for cart_id, quantity, price in CartItem.objects.values_list('cart_id', 'quantity', 'service__price').iterator():
+        total, count = totals.get(cart_id, (0, 0))
+        totals[cart_id] = (total + quantity * (price or 0), count + quantity)
+    for cart_id, (total, count) in totals.items():
+        Cart.objects.filter(pk=cart_id).update(cached_total=total, cached_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0016_query_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='cached_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='cached_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_cart_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:49
+
+from django.db import migrations, models
+
+# Schema only: the documents are built by hotel.search, so existing rows are
+# indexed with `manage.py rebuild_search_index` after migrating rather than
+# from a frozen copy of the builders and URLconf here.
+
+# External-content FTS5 index over hotel_searchdocument; the triggers keep it
+# in step with every insert, update and delete made through the ORM
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE hotel_search_fts USING fts5(
+        title, body,
+        content='hotel_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    );
+    """,
+    """
+    CREATE TRIGGER hotel_search_fts_insert AFTER INSERT ON hotel_searchdocument BEGIN
+        INSERT INTO hotel_search_fts(rowid, title, body) VALUES (NEW.id, NEW.title, NEW.body);
+    END;
+    """,
+    """
+    CREATE TRIGGER hotel_search_fts_delete AFTER DELETE ON hotel_searchdocument BEGIN
+        INSERT INTO hotel_search_fts(hotel_search_fts, rowid, title, body)
+        VALUES ('delete', OLD.id, OLD.title, OLD.body);
+    END;
+    """,
+    """
+    CREATE TRIGGER hotel_search_fts_update AFTER UPDATE ON hotel_searchdocument BEGIN
+        INSERT INTO hotel_search_fts(hotel_search_fts, rowid, title, body)
+        VALUES ('delete', OLD.id, OLD.title, OLD.body);
+        INSERT INTO hotel_search_fts(rowid, title, body) VALUES (NEW.id, NEW.title, NEW.body);
+    END;
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS hotel_search_fts_insert;",
+    "DROP TRIGGER IF EXISTS hotel_search_fts_delete;",
+    "DROP TRIGGER IF EXISTS hotel_search_fts_update;",
+    "DROP TABLE IF EXISTS hotel_search_fts;",
+]
+
+# Must match hotel.search.POSTGRES_VECTOR for the planner to use the index
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX hotel_search_tsv_idx ON hotel_searchdocument
+    USING gin (to_tsvector('simple', title || ' ' || body));
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS hotel_search_tsv_idx;",
+]
+
+
+def run_for_vendor(forward):
+    def operation(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == 'sqlite':
+            statements = SQLITE_FORWARD if forward else SQLITE_BACKWARD
+        elif vendor == 'postgresql':
+            statements = POSTGRES_FORWARD if forward else POSTGRES_BACKWARD
+        else:
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0018_order_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('title', models.CharField(max_length=300)),
+                ('body', models.TextField(blank=True, default='')),
+                ('url', models.CharField(max_length=255)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document')],
+            },
+        ),
+        migrations.RunPython(run_for_vendor(True), run_for_vendor(False)),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:06
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hotel', '0020_chunkedupload'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.text.Lower('last_name'), name='client_last_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='client_email_lower_idx'),
+        ),
+    ]
@@ -1,4 +1,8 @@
+import uuid
+from decimal import Decimal
 from django.db import models
+from django.db.models import ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Lower
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import date
@@ -14,6 +18,15 @@ class Client(models.Model):
     address = models.TextField(blank=True, null=True)
     date_of_birth = models.DateField(null=True)
     
+    class Meta:
+        indexes = [
+            # Matches the staff dashboard ordering so keyset pages and name prefix searches are index scans
+            models.Index(fields=['last_name', 'first_name', 'id'], name='client_name_idx'),
+            # Case-insensitive prefix search on the staff dashboard
+            models.Index(Lower('last_name'), name='client_last_name_lower_idx'),
+            models.Index(Lower('email'), name='client_email_lower_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
     
@@ -87,7 +100,15 @@ class Reservation(models.Model):
     has_children = models.BooleanField(default=False, verbose_name="Staying with children")  # Новое поле
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    
+
+    class Meta:
+        indexes = [
+            # Serves the date-overlap lookups in hotel.availability
+            models.Index(fields=['room', 'check_in_date', 'check_out_date'], name='reservation_room_dates_idx'),
+            # Recent reservations on the staff dashboard
+            models.Index(fields=['-created_at'], name='reservation_created_idx'),
+        ]
+
     def __str__(self):
         return f"Reservation for {self.client} - Room {self.room.room_number}"
     
@@ -109,6 +130,13 @@ class Article(models.Model):
     
     class Meta:
         ordering = ['-published_date']
+        indexes = [
+            models.Index(
+                fields=['-published_date'],
+                condition=models.Q(is_published=True),
+                name='article_published_idx'
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -188,6 +216,9 @@ class Vacancy(models.Model):
     
     class Meta:
         verbose_name_plural = "Vacancies"
+        indexes = [
+            models.Index(fields=['-date_posted'], condition=models.Q(is_active=True), name='vacancy_active_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -210,6 +241,9 @@ class Review(models.Model):
     
     class Meta:
         ordering = ['-date_posted']
+        indexes = [
+            models.Index(fields=['-date_posted'], condition=models.Q(is_published=True), name='review_published_idx'),
+        ]
     
     def __str__(self):
         return f"Review by {self.client} - {self.rating} stars"
@@ -224,6 +258,13 @@ class PromoCode(models.Model):
     valid_to = models.DateField()
     is_active = models.BooleanField(default=True)
     
+    class Meta:
+        indexes = [
+            # Partial rather than (is_active, valid_to): SQLite can't seek on a bare boolean column
+            models.Index(fields=['valid_to'], condition=models.Q(is_active=True), name='promocode_active_idx'),
+            models.Index(fields=['-valid_to'], condition=models.Q(is_active=False), name='promocode_expired_idx'),
+        ]
+    
     def __str__(self):
         return self.code
     
@@ -251,6 +292,11 @@ class Service(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     is_available = models.BooleanField(default=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['name'], condition=models.Q(is_available=True), name='service_available_idx'),
+        ]
+    
     def __str__(self):
         return self.name
 
@@ -278,11 +324,39 @@ class ChartImage(models.Model):
     """Model for storing chart images"""
     title = models.CharField(max_length=100)
     image = models.ImageField(upload_to='charts/')
+    # Hash of the chart's input data, so identical charts are rendered once
+    data_hash = models.CharField(max_length=64, unique=True, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
     
     def __str__(self):
         return self.title
 
+class RenderJob(models.Model):
+    """Background rendering job (charts, image variants) run by the worker pool in hotel.jobs"""
+    JOB_STATUS = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict)
+    data_hash = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=JOB_STATUS, default='queued')
+    chart = models.ForeignKey(ChartImage, on_delete=models.SET_NULL, null=True, blank=True, related_name='render_jobs')
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"{self.kind} job #{self.pk} ({self.status})"
+
 class Banner(models.Model):
     """Model for promotional banners on the home page"""
     title = models.CharField(max_length=200)
@@ -293,6 +367,9 @@ class Banner(models.Model):
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['order'], condition=models.Q(is_active=True), name='banner_active_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -307,24 +384,64 @@ class Partner(models.Model):
     def __str__(self):
         return self.name
 
+def cart_line_total(prefix=''):
+    """quantity * service price for a cart item, as a database expression"""
+    return ExpressionWrapper(
+        F(f'{prefix}quantity') * Coalesce(F(f'{prefix}service__price'), Value(Decimal('0'))),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2)
+    )
+
+class CartQuerySet(models.QuerySet):
+    def refresh_totals(self):
+        """Recompute cached_total and cached_count for these carts in a single UPDATE"""
+        items = CartItem.objects.filter(cart=OuterRef('pk')).order_by().values('cart')
+        totals = items.annotate(total=Sum(cart_line_total())).values('total')
+        counts = items.annotate(count=Sum('quantity')).values('count')
+        return self.update(
+            cached_total=Coalesce(
+                Subquery(totals, output_field=models.DecimalField(max_digits=12, decimal_places=2)),
+                Value(Decimal('0'))
+            ),
+            cached_count=Coalesce(Subquery(counts, output_field=models.PositiveIntegerField()), 0)
+        )
+
 class Cart(models.Model):
     """Shopping cart model"""
     user = models.OneToOneField(User, on_delete=models.CASCADE, null=True, blank=True)
     session_key = models.CharField(max_length=40, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Denormalized from the items (see hotel.signals) so the header badge needs no queries
+    cached_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    cached_count = models.PositiveIntegerField(default=0)
+
+    objects = CartQuerySet.as_manager()
 
     def __str__(self):
         if self.user:
             return f"Cart for {self.user.username}"
         return f"Cart for session {self.session_key}"
 
+    def totals(self):
+        """Total price and item count in one aggregate query"""
+        totals = self.items.aggregate(
+            total=Coalesce(Sum(cart_line_total()), Value(Decimal('0'))),
+            count=Coalesce(Sum('quantity'), 0)
+        )
+        return totals['total'], totals['count']
+
     @property
     def total_price(self):
-        return sum(item.total_price for item in self.items.all())
+        return self.totals()[0]
 
     @property
     def items_count(self):
-        return sum(item.quantity for item in self.items.all())
+        return self.totals()[1]
+
+    def refresh_totals(self):
+        Cart.objects.filter(pk=self.pk).refresh_totals()
+        self.cached_total, self.cached_count = Cart.objects.values_list(
+            'cached_total', 'cached_count'
+        ).get(pk=self.pk)
 
 class CartItem(models.Model):
     """Item in a shopping cart"""
@@ -338,7 +455,7 @@ class CartItem(models.Model):
 
     @property
     def total_price(self):
-        return self.service.price * self.quantity
+        return (self.service.price or 0) * self.quantity
 
 class Order(models.Model):
     """Order model for completed purchases"""
@@ -356,6 +473,8 @@ class Order(models.Model):
     status = models.CharField(max_length=20, choices=ORDER_STATUS, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Sent with the payment form so a double submit maps back to the same order
+    idempotency_key = models.CharField(max_length=64, unique=True, null=True, blank=True)
     
     def __str__(self):
         return f"Order #{self.id} - {self.email}"
@@ -372,4 +491,68 @@ class OrderItem(models.Model):
 
     @property
     def total_price(self):
-        return self.price * self.quantity
\ No newline at end of file
+        return self.price * self.quantity
+
+class ReservationDailyStats(models.Model):
+    """Per-day, per-category reservation totals kept current by Reservation and Room signals.
+
+    Bookings, revenue and nights are counted on the check-in date; occupied_rooms
+    counts every night a room of the category is taken. Bulk writes bypass the
+    signals and need the rebuild_daily_stats command afterwards.
+    """
+    date = models.DateField()
+    category = models.ForeignKey(RoomCategory, on_delete=models.CASCADE, related_name='daily_stats')
+    bookings = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    nights = models.IntegerField(default=0)
+    occupied_rooms = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['date']
+        verbose_name_plural = "Reservation daily stats"
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'category'], name='unique_daily_stats_per_category'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.category.name}"
+
+class SearchDocument(models.Model):
+    """Searchable text of a room, article, FAQ, service or vacancy, kept in sync by hotel.signals.
+
+    Full-text indexed per database backend (see migration 0019 and hotel.search).
+    """
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    title = models.CharField(max_length=300)
+    body = models.TextField(blank=True, default='')
+    url = models.CharField(max_length=255)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}: {self.title}"
+
+
+class ChunkedUpload(models.Model):
+    """Company video being uploaded in pieces, resumable from `offset`; see hotel.uploads"""
+    UPLOAD_STATUS = [
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+    ]
+
+    upload_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chunked_uploads')
+    company = models.ForeignKey(CompanyInfo, on_delete=models.CASCADE, related_name='video_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=UPLOAD_STATUS, default='uploading')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size} bytes)"
@@ -0,0 +1,97 @@
+import uuid
+from dataclasses import dataclass
+from decimal import Decimal
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from .models import Cart, CartItem, Order, OrderItem
+
+# Conflict reasons reported by place_order
+EMPTY_CART = 'empty_cart'
+
+CONFLICT_MESSAGES = {
+    EMPTY_CART: "Ваша корзина пуста.",
+}
+
+
+@dataclass(frozen=True)
+class OrderResult:
+    """Outcome of placing an order; replayed is True when the idempotency key matched an earlier order"""
+    order: Order = None
+    conflict: str = None
+    replayed: bool = False
+
+    @property
+    def ok(self):
+        return self.order is not None
+
+    @property
+    def message(self):
+        return CONFLICT_MESSAGES.get(self.conflict, "")
+
+
+def new_idempotency_key():
+    return uuid.uuid4().hex
+
+
+def _lock_cart(cart_id):
+    """Serialize checkouts of the same cart; see booking._lock_room for the SQLite case"""
+    if not connection.features.has_select_for_update:
+        Cart.objects.filter(pk=cart_id).update(cached_count=F('cached_count'))
+    Cart.objects.select_for_update().filter(pk=cart_id).exists()
+
+
+def _replayed(idempotency_key):
+    if not idempotency_key:
+        return None
+    order = Order.objects.filter(idempotency_key=idempotency_key).first()
+    return OrderResult(order=order, replayed=True) if order else None
+
+
+def place_order(cart, email, user=None, idempotency_key=None, status='paid'):
+    """Turn the cart into an order and empty it, all in one transaction.
+
+    Prices are read once, in the same joined query as the cart lines, so the
+    order total and its items always agree. Placing an order again with an
+    idempotency key that was already used returns the existing order.
+    """
+    replayed = _replayed(idempotency_key)
+    if replayed:
+        return replayed
+
+    try:
+        with transaction.atomic():
+            _lock_cart(cart.pk)
+            # A concurrent submit with the same key may have finished while we waited
+            replayed = _replayed(idempotency_key)
+            if replayed:
+                return replayed
+
+            lines = [
+                (service_id, quantity, price or Decimal('0'))
+                for service_id, quantity, price in CartItem.objects.filter(cart=cart).values_list(
+                    'service_id', 'quantity', 'service__price'
+                )
+            ]
+            if not lines:
+                return OrderResult(conflict=EMPTY_CART)
+
+            order = Order.objects.create(
+                user=user,
+                email=email,
+                total_amount=sum(quantity * price for _, quantity, price in lines),
+                status=status,
+                idempotency_key=idempotency_key or None
+            )
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, service_id=service_id, quantity=quantity, price=price)
+                for service_id, quantity, price in lines
+            ])
+            CartItem.objects.filter(cart=cart).delete()
+    except IntegrityError:
+        # Lost the race on the unique key to a request on another cart
+        replayed = _replayed(idempotency_key)
+        if replayed:
+            return replayed
+        raise
+
+    return OrderResult(order=order)
@@ -0,0 +1,147 @@
+import random
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from .metrics import record_http
+
+# Responses worth another attempt: the upstream is overloaded or a proxy lost it
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class HostBusy(requests.RequestException):
+    """Raised instead of queueing when a host already has its limit of requests in flight"""
+
+
+@dataclass
+class UpstreamStats:
+    """Counters for one upstream host; latency covers retries and backoff"""
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    rejected: int = 0
+    latency_total: float = 0
+    latency_max: float = 0
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'rejected': self.rejected,
+            'latency_total': self.latency_total,
+            'latency_avg': self.latency_total / self.requests if self.requests else 0,
+            'latency_max': self.latency_max,
+        }
+
+
+def backoff_delay(attempt, backoff):
+    """Full jitter: anywhere up to backoff * 2**attempt, so retrying clients spread out"""
+    return random.uniform(0, backoff * 2 ** attempt)
+
+
+class HTTPClient:
+    """Shared outbound HTTP client.
+
+    One keep-alive connection pool per host is reused across calls, so only
+    the first request to an upstream pays for DNS, TCP and TLS. Timeout,
+    retry count, backoff and the number of requests in flight are
+    configured per host in OUTBOUND_HTTP_HOSTS, falling back to the
+    OUTBOUND_HTTP_* defaults. Safe to share between threads.
+    """
+
+    def __init__(self, pool_size=None):
+        pool_size = pool_size or settings.OUTBOUND_HTTP_POOL_SIZE
+        self.session = requests.Session()
+        # Retries are ours (with jitter and accounting), not urllib3's
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._lock = threading.Lock()
+        self._limits = {}
+        self._stats = {}
+
+    def options(self, host):
+        """Effective timeout, retries, backoff and max_concurrency for host"""
+        options = {
+            'timeout': settings.EXTERNAL_API_TIMEOUT,
+            'retries': settings.OUTBOUND_HTTP_RETRIES,
+            'backoff': settings.OUTBOUND_HTTP_BACKOFF,
+            'max_concurrency': settings.OUTBOUND_HTTP_MAX_CONCURRENCY,
+        }
+        options.update(settings.OUTBOUND_HTTP_HOSTS.get(host, {}))
+        return options
+
+    def _limit(self, host, max_concurrency):
+        with self._lock:
+            if host not in self._limits:
+                self._limits[host] = threading.BoundedSemaphore(max_concurrency)
+            return self._limits[host]
+
+    def _record(self, host, latency, error=False, retries=0, rejected=False):
+        record_http(latency)
+        with self._lock:
+            stats = self._stats.setdefault(host, UpstreamStats())
+            stats.requests += 1
+            stats.errors += error
+            stats.retries += retries
+            stats.rejected += rejected
+            stats.latency_total += latency
+            stats.latency_max = max(stats.latency_max, latency)
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """Send a request, retrying idempotent ones on connection errors, timeouts and RETRY_STATUSES.
+
+        Returns the last response, whatever its status; raises the last
+        requests exception, or HostBusy straight away when the host is at
+        its limit, so a slow upstream never ties up the calling worker.
+        """
+        host = urlsplit(url).hostname
+        options = self.options(host)
+        timeout = timeout if timeout is not None else options['timeout']
+        retries = options['retries'] if method.upper() in IDEMPOTENT_METHODS else 0
+
+        started = time.perf_counter()
+        limit = self._limit(host, options['max_concurrency'])
+        if not limit.acquire(blocking=False):
+            self._record(host, time.perf_counter() - started, error=True, rejected=True)
+            raise HostBusy(f"too many requests in flight to {host}")
+
+        attempt = 0
+        try:
+            while True:
+                try:
+                    response = self.session.request(method, url, timeout=timeout, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt >= retries:
+                        self._record(host, time.perf_counter() - started, error=True, retries=attempt)
+                        raise
+                else:
+                    if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                        error = response.status_code >= 400
+                        self._record(host, time.perf_counter() - started, error=error, retries=attempt)
+                        return response
+                    response.close()
+                time.sleep(backoff_delay(attempt, options['backoff']))
+                attempt += 1
+        finally:
+            limit.release()
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def stats(self):
+        """{host: counters} for every upstream called by this process"""
+        with self._lock:
+            return {host: stats.as_dict() for host, stats in self._stats.items()}
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+
+http_client = HTTPClient()
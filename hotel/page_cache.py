@@ -0,0 +1,159 @@
+import hashlib
+import time
+from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from .context_processors import resolve_timezone
+
+# Cookies that change what an anonymous visitor sees in the page chrome
+VARY_ON_COOKIES = ('user_timezone',)
+
+
+def model_version_key(model):
+    return f'hotel:page_version:{model._meta.label_lower}'
+
+
+def bump_model_version(sender, **kwargs):
+    """Record that sender's table changed; cached pages built from it stop matching"""
+    cache.set(model_version_key(sender), time.time(), None)
+
+
+def watch_models(models):
+    for model in models:
+        uid = f'page_cache:{model._meta.label_lower}'
+        post_save.connect(bump_model_version, sender=model, dispatch_uid=uid)
+        post_delete.connect(bump_model_version, sender=model, dispatch_uid=uid)
+
+
+def model_versions(models):
+    """Last-change timestamp of each model, starting the clock for models never seen before"""
+    keys = [model_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+async def amodel_versions(models):
+    keys = [model_version_key(model) for model in models]
+    versions = await cache.aget_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        await cache.aset_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def _shared_request(request):
+    # Checked before request.user, so anonymous visitors never load a session
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and 'messages' not in request.COOKIES
+    )
+
+
+def is_cacheable(request):
+    """Only anonymous visitors without a session or pending messages see the same page"""
+    return _shared_request(request) and not request.user.is_authenticated
+
+
+async def ais_cacheable(request):
+    return _shared_request(request) and not (await request.auser()).is_authenticated
+
+
+def page_cache_key(request, view_name, versions):
+    _, zone = resolve_timezone(request.COOKIES.get('user_timezone', 'UTC'))
+    # The header shows today's date in the visitor's timezone
+    local_date = timezone.now().astimezone(zone).date()
+    parts = [view_name, request.get_full_path(), local_date, *versions]
+    parts += [request.COOKIES.get(name, '') for name in VARY_ON_COOKIES]
+    digest = hashlib.sha256('|'.join(map(str, parts)).encode()).hexdigest()
+    return f'hotel:page:{digest}'
+
+
+def page_entry(response):
+    """What gets cached for a freshly rendered response, or None if it must not be shared"""
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return None
+    return {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'etag': quote_etag(hashlib.md5(response.content, usedforsecurity=False).hexdigest()),
+    }
+
+
+def cached_response(request, entry, versions, response=None):
+    """Response for a cache entry, or a 304 when the browser's copy is still current"""
+    last_modified = int(max(versions))
+    if response is None:
+        response = HttpResponse(entry['content'], content_type=entry['content_type'])
+
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(last_modified)
+    # Let browsers keep the page but always check back with us first
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ['Cookie'])
+    return get_conditional_response(
+        request,
+        etag=entry['etag'],
+        last_modified=last_modified,
+        response=response
+    )
+
+
+def cached_page(*models, timeout=None):
+    """Cache a view's full response for anonymous visitors until one of models changes.
+
+    Responses carry an ETag and a Last-Modified taken from the latest change
+    to any of the models, so browsers can revalidate with a cheap 304.
+    Works on both sync and async views.
+    """
+    watch_models(models)
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if not await ais_cacheable(request):
+                    return await view(request, *args, **kwargs)
+
+                versions = await amodel_versions(models)
+                key = page_cache_key(request, view.__name__, versions)
+                entry = await cache.aget(key)
+                response = None
+                if entry is None:
+                    response = await view(request, *args, **kwargs)
+                    entry = page_entry(response)
+                    if entry is None:
+                        return response
+                    await cache.aset(key, entry, timeout if timeout is not None else settings.PAGE_CACHE_TIMEOUT)
+                return cached_response(request, entry, versions, response)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not is_cacheable(request):
+                return view(request, *args, **kwargs)
+
+            versions = model_versions(models)
+            key = page_cache_key(request, view.__name__, versions)
+            entry = cache.get(key)
+            response = None
+            if entry is None:
+                response = view(request, *args, **kwargs)
+                entry = page_entry(response)
+                if entry is None:
+                    return response
+                cache.set(key, entry, timeout if timeout is not None else settings.PAGE_CACHE_TIMEOUT)
+            return cached_response(request, entry, versions, response)
+        return wrapper
+    return decorator
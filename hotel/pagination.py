@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from django.core import signing
+from django.db.models import Q
+
+CURSOR_SALT = 'hotel.pagination'
+
+
+@dataclass(frozen=True)
+class KeysetPage:
+    items: list
+    next_cursor: str = None
+    previous_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def encode_cursor(obj, fields):
+    return signing.dumps([getattr(obj, field) for field in fields], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor, fields):
+    """Key values stored in a cursor, or None if it is missing or has been tampered with"""
+    if not cursor:
+        return None
+    try:
+        values = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+    if not isinstance(values, list) or len(values) != len(fields):
+        return None
+    return values
+
+
+def seek(fields, values, forward=True):
+    """Rows strictly after (or before) values in the ordering given by fields.
+
+    Expands (a, b, c) > (x, y, z) into
+    a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z),
+    which databases can answer from an index on the same columns.
+    """
+    lookup = 'gt' if forward else 'lt'
+    condition = Q()
+    for position, field in enumerate(fields):
+        equal = {name: value for name, value in zip(fields[:position], values[:position])}
+        condition |= Q(**equal, **{f'{field}__{lookup}': values[position]})
+    return condition
+
+
+def keyset_page(queryset, fields, after=None, before=None, size=50):
+    """One page of queryset ordered by fields, seeking past a cursor instead of using OFFSET.
+
+    fields must end with a unique column (usually 'id') so every row has a
+    distinct position. Pass the next_cursor of a page as after to move
+    forward, or its previous_cursor as before to move back.
+    """
+    after_values = decode_cursor(after, fields)
+    before_values = None if after_values else decode_cursor(before, fields)
+
+    if before_values:
+        queryset = queryset.filter(seek(fields, before_values, forward=False))
+        queryset = queryset.order_by(*[f'-{field}' for field in fields])
+    else:
+        if after_values:
+            queryset = queryset.filter(seek(fields, after_values))
+        queryset = queryset.order_by(*fields)
+
+    rows = list(queryset[:size + 1])
+    more = len(rows) > size
+    rows = rows[:size]
+    if before_values:
+        rows.reverse()
+
+    if not rows:
+        return KeysetPage(items=[])
+
+    has_next = more if not before_values else True
+    has_previous = bool(after_values) or (before_values and more)
+    return KeysetPage(
+        items=rows,
+        next_cursor=encode_cursor(rows[-1], fields) if has_next else None,
+        previous_cursor=encode_cursor(rows[0], fields) if has_previous else None,
+    )
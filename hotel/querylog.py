@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from django.conf import settings
+from django.template.base import Node
+
+logger = logging.getLogger(__name__)
+
+# Transaction bookkeeping repeats by design and is never an N+1
+IGNORED_STATEMENTS = ('SAVEPOINT', 'RELEASE', 'ROLLBACK', 'BEGIN', 'COMMIT', 'PRAGMA')
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+SPACE_RE = re.compile(r'\s+')
+
+HOTEL_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+PROJECT_DIR = os.path.dirname(os.path.dirname(HOTEL_DIR))
+EXECUTE_WRAPPER_ARGS = ('execute', 'sql', 'params', 'many', 'context')
+
+
+class NPlusOneQuery(Exception):
+    """Raised in QUERY_INSPECTION_MODE 'raise' when a request repeats one query shape too often"""
+
+
+def fingerprint(sql):
+    """The shape of a statement: literals and placeholders become ?, IN lists collapse to (?+)"""
+    shape = STRING_RE.sub('?', sql)
+    shape = NUMBER_RE.sub('?', shape.replace('%s', '?'))
+    shape = PLACEHOLDER_LIST_RE.sub('(?+)', shape)
+    return SPACE_RE.sub(' ', shape).strip()
+
+
+def fingerprint_id(shape):
+    return hashlib.sha1(shape.encode()).hexdigest()[:12]
+
+
+def _is_project_code(code):
+    # Skips this module, tests and the execute wrappers (metrics, routers) between the caller and the database
+    return (
+        code.co_filename.startswith(HOTEL_DIR)
+        and code.co_filename != __file__
+        and os.sep + 'tests' + os.sep not in code.co_filename
+        and code.co_varnames[:5] != EXECUTE_WRAPPER_ARGS
+    )
+
+
+def query_origin():
+    """(template:line, file:line) of the innermost template node and project code running a query"""
+    template = code = None
+    frame = sys._getframe(1)
+    while frame is not None and (template is None or code is None):
+        node = frame.f_locals.get('self')
+        # type(), not isinstance(): the latter would evaluate a SimpleLazyObject mid-setup
+        if template is None and issubclass(type(node), Node) and getattr(node, 'origin', None) and getattr(node, 'token', None):
+            template = f'{node.origin.template_name}:{node.token.lineno}'
+        if code is None and _is_project_code(frame.f_code):
+            code = f'{os.path.relpath(frame.f_code.co_filename, PROJECT_DIR)}:{frame.f_lineno}'
+        frame = frame.f_back
+    return template, code
+
+
+@dataclass
+class Finding:
+    """One query shape repeated within a request"""
+    fingerprint: str
+    sql: str
+    count: int
+    view: str = None
+    template: str = None
+    code: str = None
+    test: str = None
+
+    @property
+    def key(self):
+        return fingerprint_id(self.fingerprint), self.template, self.code
+
+    def describe(self):
+        where = ', '.join(filter(None, [self.template and f'template {self.template}', self.code and f'code {self.code}']))
+        return f"{self.count}x in {self.view or 'no view'} ({where or 'unknown origin'}): {self.fingerprint}"
+
+
+@dataclass
+class RequestQueries:
+    """Query shapes seen during one request, shared with its sync_to_async threads"""
+    counts: dict = field(default_factory=dict)
+    findings: dict = field(default_factory=dict)
+    view: str = None
+
+
+_current = ContextVar('hotel_request_queries', default=None)
+
+
+def begin_request():
+    queries = RequestQueries()
+    return queries, _current.set(queries)
+
+
+def end_request(queries, token, view):
+    """Finish a request; returns its findings and adds them to the session report"""
+    _current.reset(token)
+    findings = list(queries.findings.values())
+    for finding in findings:
+        finding.view = view
+        finding.count = queries.counts[finding.fingerprint]
+        if settings.QUERY_INSPECTION_MODE != 'raise':
+            logger.warning("N+1 queries: %s", finding.describe())
+        report.add(finding)
+    return findings
+
+
+def inspect_queries(execute, sql, params, many, context):
+    """Execute wrapper: log slow queries and spot a request repeating the same query shape"""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        if elapsed >= settings.QUERY_SLOW_SECONDS:
+            template, code = query_origin()
+            logger.warning(
+                "Slow query (%.0f ms) from %s: %s",
+                elapsed * 1000, template or code or 'unknown origin', SPACE_RE.sub(' ', sql)
+            )
+        queries = _current.get()
+        if queries is not None and not sql.lstrip().upper().startswith(IGNORED_STATEMENTS):
+            _count_query(queries, sql)
+
+
+def _count_query(queries, sql):
+    shape = fingerprint(sql)
+    count = queries.counts[shape] = queries.counts.get(shape, 0) + 1
+    if count != settings.QUERY_REPEAT_THRESHOLD:
+        return
+    # Only locate the query once it turns into a repeat; stack walks are costly
+    template, code = query_origin()
+    finding = Finding(fingerprint=shape, sql=sql, count=count, template=template, code=code)
+    queries.findings[shape] = finding
+    if settings.QUERY_INSPECTION_MODE == 'raise':
+        raise NPlusOneQuery(finding.describe())
+
+
+def watch_queries(sender, connection, **kwargs):
+    """connection_created receiver installing inspect_queries when QUERY_INSPECTION is on"""
+    if settings.QUERY_INSPECTION and inspect_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(inspect_queries)
+
+
+class QueryReport:
+    """Findings across a whole process, e.g. a test run, de-duplicated by shape and origin"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.findings = {}
+        self.current_test = None
+
+    def add(self, finding):
+        finding.test = finding.test or self.current_test
+        with self._lock:
+            known = self.findings.get(finding.key)
+            if known is None or finding.count > known.count:
+                self.findings[finding.key] = finding
+
+    def unexpected(self):
+        """Findings not excused by QUERY_INSPECTION_ALLOW (view names or template names)"""
+        allowed = set(settings.QUERY_INSPECTION_ALLOW)
+        return [
+            finding for finding in self.findings.values()
+            if finding.view not in allowed and (finding.template or '').rsplit(':', 1)[0] not in allowed
+        ]
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump([asdict(finding) for finding in self.findings.values()], f, indent=2)
+
+    def clear(self):
+        with self._lock:
+            self.findings.clear()
+
+
+report = QueryReport()
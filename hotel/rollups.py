@@ -0,0 +1,140 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F
+from .models import Reservation, ReservationDailyStats
+
+# The rollup follows Reservation and Room saves and deletes through signals
+# (see hotel.signals). QuerySet.update(), bulk_create(), bulk_update() and raw
+# SQL skip those, so run the rebuild_daily_stats command after using them.
+
+# Cancelled reservations are left out of the rollup entirely
+EXCLUDED_STATUSES = ('cancelled',)
+
+CONTRIBUTION_FIELDS = ('room__category_id', 'check_in_date', 'check_out_date', 'total_price', 'status')
+
+
+def contribution(category_id, check_in_date, check_out_date, total_price, status):
+    """What a reservation adds to the rollup, or None if it isn't counted"""
+    if status in EXCLUDED_STATUSES:
+        return None
+    return (category_id, check_in_date, check_out_date, total_price)
+
+
+def contribution_for(reservation):
+    return contribution(
+        reservation.room.category_id,
+        reservation.check_in_date,
+        reservation.check_out_date,
+        reservation.total_price,
+        reservation.status
+    )
+
+
+def stored_contribution(pk):
+    """Contribution of the reservation as currently saved in the database"""
+    row = Reservation.objects.filter(pk=pk).values_list(*CONTRIBUTION_FIELDS).first()
+    return contribution(*row) if row else None
+
+
+def move_room_contributions(room_id, previous_category_id):
+    """Move a room's reservations from previous_category_id to the room's saved category"""
+    rows = Reservation.objects.filter(room_id=room_id).values_list(*CONTRIBUTION_FIELDS)
+    with transaction.atomic():
+        for row in rows:
+            item = contribution(*row)
+            if item is not None:
+                apply_contribution((previous_category_id, *item[1:]), -1)
+                apply_contribution(item, 1)
+
+
+def apply_contribution(item, sign):
+    """Add (sign=1) or remove (sign=-1) one reservation's totals with in-place updates"""
+    if item is None:
+        return
+
+    category_id, check_in_date, check_out_date, total_price = item
+    nights = (check_out_date - check_in_date).days
+
+    if sign > 0:
+        # Rows only need creating when adding; removal touches rows that exist
+        ReservationDailyStats.objects.bulk_create([
+            ReservationDailyStats(date=check_in_date + timedelta(days=i), category_id=category_id)
+            for i in range(max(nights, 1))
+        ], ignore_conflicts=True)
+
+    ReservationDailyStats.objects.filter(category_id=category_id, date=check_in_date).update(
+        bookings=F('bookings') + sign,
+        revenue=F('revenue') + sign * total_price,
+        nights=F('nights') + sign * nights,
+    )
+    if nights > 0:
+        ReservationDailyStats.objects.filter(
+            category_id=category_id,
+            date__gte=check_in_date,
+            date__lt=check_out_date
+        ).update(occupied_rooms=F('occupied_rooms') + sign)
+
+
+def accumulate_daily_stats(rows, start=None, end=None):
+    """Fold (category_id, check_in, check_out, total_price, status) rows into
+    {(date, category_id): [bookings, revenue, nights, occupied_rooms]},
+    keeping only dates within start..end when given.
+    """
+    totals = defaultdict(lambda: [0, 0, 0, 0])
+
+    def in_range(day):
+        return (start is None or day >= start) and (end is None or day <= end)
+
+    for row in rows:
+        item = contribution(*row)
+        if item is None:
+            continue
+        category_id, check_in_date, check_out_date, total_price = item
+        nights = (check_out_date - check_in_date).days
+
+        if in_range(check_in_date):
+            entry = totals[(check_in_date, category_id)]
+            entry[0] += 1
+            entry[1] += total_price
+            entry[2] += nights
+
+        for i in range(nights):
+            day = check_in_date + timedelta(days=i)
+            if in_range(day):
+                totals[(day, category_id)][3] += 1
+
+    return totals
+
+
+def rebuild_daily_stats(start=None, end=None, batch_size=1000):
+    """Recompute the rollup from scratch, optionally only for dates in start..end"""
+    with transaction.atomic():
+        stats = ReservationDailyStats.objects.all()
+        reservations = Reservation.objects.all()
+        if start:
+            stats = stats.filter(date__gte=start)
+            reservations = reservations.filter(check_out_date__gt=start)
+        if end:
+            stats = stats.filter(date__lte=end)
+            reservations = reservations.filter(check_in_date__lte=end)
+        stats.delete()
+
+        totals = accumulate_daily_stats(
+            reservations.values_list(*CONTRIBUTION_FIELDS).iterator(chunk_size=batch_size),
+            start=start,
+            end=end
+        )
+        ReservationDailyStats.objects.bulk_create([
+            ReservationDailyStats(
+                date=day,
+                category_id=category_id,
+                bookings=bookings,
+                revenue=revenue,
+                nights=nights,
+                occupied_rooms=occupied_rooms
+            )
+            for (day, category_id), (bookings, revenue, nights, occupied_rooms) in totals.items()
+        ], batch_size=batch_size)
+
+    return len(totals)
@@ -0,0 +1,108 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Apps whose reads must never lag behind a write, e.g. a fresh login's session
+PRIMARY_ONLY_APPS = {'sessions'}
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+class ReadPin:
+    """Whether the current request must read from the primary.
+
+    A mutable object rather than a bare flag in the ContextVar, so a write
+    made in a sync_to_async thread (async views) pins the whole request.
+    """
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_pin = ContextVar('hotel_read_pin', default=None)
+
+
+def is_pinned():
+    pin = _pin.get()
+    return pin is not None and pin.pinned
+
+
+def begin_read_pin(pinned):
+    """Start tracking a request; returns (pin, token) for end_read_pin"""
+    pin = ReadPin(pinned)
+    return pin, _pin.set(pin)
+
+
+def end_read_pin(token):
+    # Worker threads are reused, so the pin must not outlive its request
+    _pin.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside the block, e.g. just after writing outside a request"""
+    pin = _pin.get()
+    if pin is None:
+        token = _pin.set(ReadPin(pinned=True))
+        try:
+            yield
+        finally:
+            _pin.reset(token)
+    elif pin.pinned:
+        yield
+    else:
+        pin.pinned = True
+        try:
+            yield
+        finally:
+            pin.pinned = pin.wrote
+
+
+def pin_after_write(execute, sql, params, many, context):
+    """Execute wrapper on the primary: after a request's first write, its reads stay there"""
+    pin = _pin.get()
+    if pin is not None and not pin.wrote and sql.lstrip().upper().startswith(WRITE_STATEMENTS):
+        pin.wrote = pin.pinned = True
+    return execute(sql, params, many, context)
+
+
+def watch_primary_writes(sender, connection, **kwargs):
+    """connection_created receiver installing pin_after_write on every primary connection"""
+    if connection.alias == DEFAULT_DB_ALIAS and pin_after_write not in connection.execute_wrappers:
+        connection.execute_wrappers.append(pin_after_write)
+
+
+class PrimaryReplicaRouter:
+    """Writes go to the default database, reads to a random REPLICA_DATABASES alias.
+
+    Reads stay on the primary when pinned (see hotel.middleware) and inside
+    a transaction on the primary, where a replica would miss the
+    transaction's own writes and its row locks.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.REPLICA_DATABASES
+        if (
+            not replicas
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+            or is_pinned()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data, so objects may be related across them
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary through replication
+        return db not in settings.REPLICA_DATABASES
@@ -0,0 +1,253 @@
+import logging
+import re
+from dataclasses import dataclass
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from .models import Article, FAQ, Room, SearchDocument, Service, Vacancy
+
+logger = logging.getLogger(__name__)
+
+# Placeholders for match boundaries in snippets; swapped for <mark> after escaping
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+SNIPPET_WORDS = 16
+# bm25 column weights on SQLite: a hit in the title outranks one in the body
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+
+# Must match the expression indexed by migration 0019
+POSTGRES_VECTOR = "to_tsvector('simple', d.title || ' ' || d.body)"
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    """How one model is turned into a SearchDocument.
+
+    document(instance) returns (title, body, url), or None when the object
+    should not be searchable (e.g. an unpublished article).
+    """
+    model: type
+    label: str
+    document: object
+    related: tuple = ()
+
+
+def room_document(room):
+    body = ' '.join(filter(None, [room.category.name, room.description]))
+    return f"Room {room.room_number}", body, reverse('hotel:room_detail', args=[room.pk])
+
+
+def article_document(article):
+    if not article.is_published:
+        return None
+    body = f"{article.summary} {article.content}"
+    return article.title, body, reverse('hotel:article_detail', args=[article.slug])
+
+
+def faq_document(faq):
+    return faq.question, faq.answer, f"{reverse('hotel:glossary')}#faq-{faq.pk}"
+
+
+def service_document(service):
+    if not service.is_available:
+        return None
+    return service.name, service.description, reverse('hotel:service_detail', args=[service.pk])
+
+
+def vacancy_document(vacancy):
+    if not vacancy.is_active:
+        return None
+    body = f"{vacancy.description} {vacancy.requirements}"
+    return vacancy.title, body, reverse('hotel:vacancies')
+
+
+SEARCH_SOURCES = {
+    'room': SearchSource(Room, 'Room', room_document, related=('category',)),
+    'article': SearchSource(Article, 'News', article_document),
+    'faq': SearchSource(FAQ, 'FAQ', faq_document),
+    'service': SearchSource(Service, 'Service', service_document),
+    'vacancy': SearchSource(Vacancy, 'Vacancy', vacancy_document),
+}
+
+KIND_BY_MODEL = {source.model: kind for kind, source in SEARCH_SOURCES.items()}
+
+
+def index_object(instance):
+    """Add, refresh or drop the search document for a model instance"""
+    kind = KIND_BY_MODEL[type(instance)]
+    document = SEARCH_SOURCES[kind].document(instance)
+    if document is None:
+        return remove_object(instance)
+
+    title, body, url = document
+    SearchDocument.objects.update_or_create(
+        kind=kind,
+        object_id=instance.pk,
+        defaults={'title': title, 'body': body, 'url': url}
+    )
+
+
+def remove_object(instance):
+    SearchDocument.objects.filter(kind=KIND_BY_MODEL[type(instance)], object_id=instance.pk).delete()
+
+
+def rebuild_search_index(batch_size=500):
+    """Recreate every search document from the source tables; returns how many were indexed"""
+    SearchDocument.objects.all().delete()
+    indexed = 0
+    for kind, source in SEARCH_SOURCES.items():
+        documents = []
+        for instance in source.model.objects.select_related(*source.related).iterator():
+            document = source.document(instance)
+            if document is not None:
+                title, body, url = document
+                documents.append(SearchDocument(kind=kind, object_id=instance.pk, title=title, body=body, url=url))
+        SearchDocument.objects.bulk_create(documents, batch_size=batch_size)
+        indexed += len(documents)
+    return indexed
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    kind: str
+    object_id: int
+    title: str
+    url: str
+    snippet: str
+    rank: float
+
+    @property
+    def label(self):
+        return SEARCH_SOURCES[self.kind].label
+
+
+def search_terms(query):
+    """Lowercased words of a user query; punctuation and operators are dropped"""
+    return TOKEN_RE.findall(query.lower())
+
+
+def highlight(text):
+    """Escape a snippet and turn the match placeholders into <mark> tags"""
+    text = escape(text)
+    return mark_safe(text.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>'))
+
+
+def _kind_filter(kinds, params):
+    if not kinds:
+        return ''
+    params.extend(kinds)
+    return f" AND d.kind IN ({', '.join(['%s'] * len(kinds))})"
+
+
+def _limit(limit, params):
+    if limit is None:
+        return ''
+    params.append(limit)
+    return ' LIMIT %s'
+
+
+def _match_clause(terms):
+    """FROM/WHERE selecting documents (aliased d) that contain every term as a prefix"""
+    if connection.vendor == 'sqlite':
+        # "spa"* "mass"*: each word must match, as a prefix. CROSS JOIN pins the
+        # join order so the MATCH runs once up front rather than once per document.
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return (
+            "FROM hotel_search_fts CROSS JOIN hotel_searchdocument d ON d.id = hotel_search_fts.rowid "
+            "WHERE hotel_search_fts MATCH %s"
+        ), [match]
+    tsquery = ' & '.join(f'{term}:*' for term in terms)
+    return f"FROM hotel_searchdocument d, to_tsquery('simple', %s) q WHERE {POSTGRES_VECTOR} @@ q", [tsquery]
+
+
+def _ranked_columns():
+    """Snippet and rank select expressions (plus their params) for the current backend"""
+    if connection.vendor == 'sqlite':
+        snippet = f"snippet(hotel_search_fts, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', {SNIPPET_WORDS})"
+        # bm25 is lower-is-better; negate it so rank always means higher is better
+        return snippet, f"-bm25(hotel_search_fts, {TITLE_WEIGHT}, {BODY_WEIGHT})", []
+    options = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords={SNIPPET_WORDS}, MinWords=5"
+    return "ts_headline('simple', d.title || ' ' || d.body, q, %s)", f"ts_rank({POSTGRES_VECTOR}, q)", [options]
+
+
+def _fallback_documents(terms, kinds):
+    """Unindexed substring match for backends without a full-text engine set up"""
+    documents = SearchDocument.objects.all()
+    for term in terms:
+        documents = documents.filter(Q(title__icontains=term) | Q(body__icontains=term))
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+    return documents
+
+
+def _fallback_rows(terms, kinds, limit):
+    documents = _fallback_documents(terms, kinds)
+    if limit is not None:
+        documents = documents[:limit]
+
+    pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+    rows = []
+    for document in documents:
+        words = ' '.join(document.body.split()[:SNIPPET_WORDS])
+        snippet = pattern.sub(lambda m: f'{HIGHLIGHT_START}{m.group(0)}{HIGHLIGHT_END}', words)
+        rows.append((document.kind, document.object_id, document.title, document.url, snippet, 0.0))
+    return rows
+
+
+def has_full_text_index():
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+async def ais_indexed(kind):
+    """Whether any documents of kind have been indexed yet"""
+    if await SearchDocument.objects.filter(kind=kind).aexists():
+        return True
+    logger.warning("No %s search documents; run `manage.py rebuild_search_index`", kind)
+    return False
+
+
+def search(query, kinds=None, limit=20):
+    """Best matches for query across all (or the given) kinds, with highlighted snippets"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    if has_full_text_index():
+        clause, params = _match_clause(terms)
+        snippet, rank, select_params = _ranked_columns()
+        params = select_params + params
+        sql = f"SELECT d.kind, d.object_id, d.title, d.url, {snippet}, {rank} AS rank {clause}"
+        sql += _kind_filter(kinds, params) + " ORDER BY rank DESC" + _limit(limit, params)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+    else:
+        rows = _fallback_rows(terms, kinds, limit)
+
+    return [
+        SearchResult(kind, object_id, title, url, highlight(snippet), rank)
+        for kind, object_id, title, url, snippet, rank in rows
+    ]
+
+
+def matching_ids(query, kind):
+    """Subquery of the primary keys of every object of kind matching query, for use with pk__in.
+
+    Unranked and unlimited, so the database can stream it straight into the
+    outer query instead of sending a list of ids back and forth.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return SearchDocument.objects.none().values('object_id')
+    if not has_full_text_index():
+        return _fallback_documents(terms, [kind]).values('object_id')
+
+    clause, params = _match_clause(terms)
+    params.append(kind)
+    return RawSQL(f"SELECT d.object_id {clause} AND d.kind = %s", params)
@@ -0,0 +1,120 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from .catalog import invalidate_room_categories
+from .database import configure_sqlite
+from .images import IMAGE_FIELDS
+from .jobs import request_image_variants
+from .metrics import watch_queries
+from .models import Cart, CartItem, Reservation, Room, RoomCategory, Service
+from .querylog import watch_queries as inspect_queries_on
+from .rollups import apply_contribution, contribution_for, move_room_contributions, stored_contribution
+from .routers import watch_primary_writes
+from .search import SEARCH_SOURCES, index_object, remove_object
+
+
+@receiver(pre_save, sender=Reservation)
+def remember_reservation_totals(sender, instance, raw, **kwargs):
+    """Keep what the saved row contributed so post_save can swap it for the new values"""
+    if raw or instance._state.adding:
+        instance._previous_contribution = None
+    else:
+        instance._previous_contribution = stored_contribution(instance.pk)
+
+
+@receiver(post_save, sender=Reservation)
+def update_daily_stats_on_save(sender, instance, raw, **kwargs):
+    if raw:
+        return
+
+    previous = getattr(instance, '_previous_contribution', None)
+    current = contribution_for(instance)
+    if previous != current:
+        apply_contribution(previous, -1)
+        apply_contribution(current, 1)
+
+
+@receiver(pre_delete, sender=Reservation)
+def remember_deleted_reservation_totals(sender, instance, **kwargs):
+    # The room may be deleted in the same cascade, so look it up while it exists
+    instance._previous_contribution = stored_contribution(instance.pk)
+
+
+@receiver(post_delete, sender=Reservation)
+def update_daily_stats_on_delete(sender, instance, **kwargs):
+    apply_contribution(getattr(instance, '_previous_contribution', None), -1)
+
+
+@receiver(pre_save, sender=Room)
+def remember_room_category(sender, instance, raw, update_fields=None, **kwargs):
+    """The rollup is keyed by category, so a room changing category takes its reservations along"""
+    if raw or instance._state.adding or (update_fields is not None and 'category' not in update_fields):
+        instance._previous_category_id = None
+    else:
+        instance._previous_category_id = (
+            Room.objects.filter(pk=instance.pk).values_list('category_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Room)
+def move_daily_stats_with_room(sender, instance, raw, **kwargs):
+    previous = getattr(instance, '_previous_category_id', None)
+    if not raw and previous is not None and previous != instance.category_id:
+        move_room_contributions(instance.pk, previous)
+
+
+@receiver(post_save, sender=RoomCategory)
+@receiver(post_delete, sender=RoomCategory)
+def invalidate_category_cache(sender, **kwargs):
+    invalidate_room_categories()
+
+
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def update_cart_totals(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Cart.objects.filter(pk=instance.cart_id).refresh_totals()
+
+
+@receiver(post_save, sender=Service)
+def update_cart_totals_for_service(sender, instance, raw, **kwargs):
+    # A price change moves the total of every cart holding this service
+    if not raw:
+        Cart.objects.filter(items__service=instance).refresh_totals()
+
+
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_object(instance)
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    remove_object(instance)
+
+
+for source in SEARCH_SOURCES.values():
+    post_save.connect(update_search_index, sender=source.model)
+    post_delete.connect(remove_from_search_index, sender=source.model)
+
+
+@receiver(post_save, sender=RoomCategory)
+def reindex_category_rooms(sender, instance, raw, **kwargs):
+    # Room documents include the category name
+    if not raw:
+        for room in instance.rooms.select_related('category'):
+            index_object(room)
+
+
+def generate_image_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        request_image_variants(getattr(instance, IMAGE_FIELDS[sender]).name)
+
+
+for model in IMAGE_FIELDS:
+    post_save.connect(generate_image_variants, sender=model)
+
+
+connection_created.connect(configure_sqlite, dispatch_uid='hotel:configure_sqlite')
+connection_created.connect(watch_queries, dispatch_uid='hotel:watch_queries')
+connection_created.connect(inspect_queries_on, dispatch_uid='hotel:inspect_queries')
+connection_created.connect(watch_primary_writes, dispatch_uid='hotel:watch_primary_writes')
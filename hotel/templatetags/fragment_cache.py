@@ -0,0 +1,29 @@
+from django import template
+from hotel.fragments import FRAGMENTS, render_fragment
+
+register = template.Library()
+
+
+class CachedFragmentNode(template.Node):
+    def __init__(self, name, nodelist):
+        self.name = name
+        self.nodelist = nodelist
+
+    def render(self, context):
+        return render_fragment(self.name, lambda: self.nodelist.render(context))
+
+
+@register.tag
+def cached_fragment(parser, token):
+    """{% cached_fragment "name" %}...{% endcached_fragment %} for a fragment declared in hotel.fragments"""
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes exactly one argument, the fragment name")
+
+    name = bits[1].strip('"\'')
+    if name not in FRAGMENTS:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' got unknown fragment {name!r}")
+
+    nodelist = parser.parse(('endcached_fragment',))
+    parser.delete_first_token()
+    return CachedFragmentNode(name, nodelist)
@@ -0,0 +1,47 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+from hotel.images import load_manifest
+
+register = template.Library()
+
+
+def srcset(storage, variants, key, original=None):
+    candidates = [f"{storage.url(variant[key])} {variant['width']}w" for variant in variants]
+    if original is not None:
+        candidates.append(original)
+    return ', '.join(candidates)
+
+
+@register.simple_tag
+def responsive_image(image, alt='', sizes='100vw', **attrs):
+    """<img> for an ImageField value, wrapped in a <picture> with WebP/JPEG srcsets once variants exist.
+
+    Extra keyword arguments become attributes of the <img>, e.g.
+    {% responsive_image member.photo alt=member.name sizes="200px" class="staff-photo" %}.
+    Rendering only reads: variants are queued by the post_save handler and
+    the generate_image_variants command, and the original is served until
+    they exist.
+    """
+    if not image:
+        return ''
+
+    img_attrs = {'src': image.url, 'alt': alt, 'loading': 'lazy', **attrs}
+    manifest = load_manifest(image.name)
+    variants = manifest['variants'] if manifest else None
+    if not variants:
+        # Not generated yet, or the original is already smaller than the narrowest variant
+        return format_html('<img{}>', flatatt(img_attrs))
+
+    storage = image.storage
+    img_attrs.update(
+        srcset=srcset(storage, variants, 'fallback', f"{image.url} {manifest['width']}w"),
+        sizes=sizes,
+        width=manifest['width'],
+        height=manifest['height'],
+    )
+    return format_html(
+        '<picture><source type="image/webp"{}><img{}></picture>',
+        flatatt({'srcset': srcset(storage, variants, 'webp'), 'sizes': sizes}),
+        flatatt(img_attrs)
+    )
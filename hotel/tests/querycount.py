@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """TestCase mixin for asserting that code stays within a query budget"""
+
+    @contextmanager
+    def assertMaxQueries(self, budget, using='default'):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(
+                f'{number}. {query["sql"]}'
+                for number, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f'{executed} queries executed, budget is {budget}:\n{queries}')
+
+    def assertViewQueryBudget(self, url, budget, using='default', **kwargs):
+        """GET url with the test client and fail if it runs more than budget queries"""
+        with self.assertMaxQueries(budget, using=using):
+            response = self.client.get(url, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        return response
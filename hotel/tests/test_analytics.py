@@ -0,0 +1,119 @@
+from decimal import Decimal
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from hotel.models import RoomCategory, Room, Client, Reservation
+from hotel.analytics import (
+    StayNights, reservation_summary, category_summary, occupancy_rate
+)
+
+class AnalyticsTest(TestCase):
+    def setUp(self):
+        self.standard = RoomCategory.objects.create(name='Standard', description='Standard room', base_price=100)
+        self.suite = RoomCategory.objects.create(name='Suite', description='Suite', base_price=250)
+        RoomCategory.objects.create(name='Empty', description='No rooms yet', base_price=50)
+        self.room = Room.objects.create(room_number='101', category=self.standard)
+        self.other_room = Room.objects.create(room_number='102', category=self.standard)
+        self.suite_room = Room.objects.create(room_number='201', category=self.suite)
+        self.guest = Client.objects.create(
+            first_name='Test',
+            last_name='Guest',
+            email='guest@example.com',
+            phone='+375 (29) 123-45-67'
+        )
+        start = date(2025, 1, 1)
+        # (room, nights, price) - prices 100, 200, 200, 750
+        for offset, (room, nights, price) in enumerate([
+            (self.room, 1, 100),
+            (self.room, 2, 200),
+            (self.other_room, 2, 200),
+            (self.suite_room, 3, 750),
+        ]):
+            check_in = start + timedelta(days=offset * 10)
+            Reservation.objects.create(
+                client=self.guest,
+                room=room,
+                check_in_date=check_in,
+                check_out_date=check_in + timedelta(days=nights),
+                status='confirmed',
+                total_price=price
+            )
+
+    def test_stay_nights(self):
+        nights = sorted(Reservation.objects.annotate(nights=StayNights()).values_list('nights', flat=True))
+        self.assertEqual(nights, [1, 2, 2, 3])
+
+    def test_reservation_summary(self):
+        summary = reservation_summary()
+        self.assertEqual(summary['total_revenue'], Decimal('1250'))
+        self.assertEqual(summary['avg_sale'], Decimal('312.5'))
+        self.assertEqual(summary['median_sale'], Decimal('200'))
+        self.assertEqual(summary['mode_sale'], Decimal('200'))
+        self.assertEqual(summary['avg_stay'], 2)
+        self.assertEqual(summary['median_stay'], 2)
+
+    def test_reservation_summary_matches_rollup(self):
+        Reservation.objects.create(
+            client=self.guest,
+            room=self.suite_room,
+            check_in_date=date(2025, 3, 1),
+            check_out_date=date(2025, 3, 4),
+            status='cancelled',
+            total_price=900
+        )
+        summary = reservation_summary()
+        self.assertEqual(summary['total_revenue'], Decimal('1250'))
+        self.assertEqual(summary['total_revenue'], sum(category.revenue for category in category_summary()))
+
+    def test_reservation_summary_empty(self):
+        summary = reservation_summary(Reservation.objects.none())
+        self.assertEqual(summary['total_revenue'], 0)
+        self.assertEqual(summary['median_sale'], 0)
+        self.assertEqual(summary['mode_sale'], 0)
+
+    def test_summary_query_count_is_constant(self):
+        with self.assertNumQueries(4):
+            reservation_summary()
+
+    def test_category_summary(self):
+        categories = {category.name: category for category in category_summary()}
+        self.assertEqual(categories['Standard'].room_count, 2)
+        self.assertEqual(categories['Standard'].reservation_count, 3)
+        self.assertEqual(categories['Standard'].revenue, Decimal('500'))
+        self.assertEqual(categories['Empty'].room_count, 0)
+
+    def test_occupancy_rate(self):
+        self.assertEqual(occupancy_rate(), 0)
+
+        today = date.today()
+        for room, status in [(self.room, 'confirmed'), (self.other_room, 'cancelled')]:
+            Reservation.objects.create(
+                client=self.guest,
+                room=room,
+                check_in_date=today - timedelta(days=1),
+                check_out_date=today + timedelta(days=1),
+                status=status,
+                total_price=200
+            )
+        self.assertAlmostEqual(occupancy_rate(), 100 / 3)
+        # Check-out day is free again
+        self.assertEqual(occupancy_rate(today + timedelta(days=1)), 0)
+
+        self.suite_room.status = 'occupied'
+        self.suite_room.save()
+        self.assertAlmostEqual(occupancy_rate(), 200 / 3)
+
+    def test_statistics_view(self):
+        User.objects.create_user(username='staff', password='password123', is_staff=True)
+        self.client.login(username='staff', password='password123')
+
+        response = self.client.get(reverse('hotel:statistics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [category.name for category in response.context['rooms_by_category']],
+            ['Standard', 'Suite']
+        )
+        self.assertEqual(response.context['popular_categories'][0].name, 'Standard')
+        self.assertEqual(response.context['profitable_categories'][0].name, 'Suite')
+        self.assertEqual(response.context['median_sale'], Decimal('200'))
@@ -0,0 +1,105 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.test import AsyncClient, SimpleTestCase, TestCase
+from django.urls import reverse
+from hotel import views
+from hotel.loadtest import LoadResult, run_load
+from hotel.models import Article, Room, RoomCategory, Service
+
+
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.article = Article.objects.create(
+            title='Spa reopens', slug='spa-reopens', content='Body', summary='Summary', is_published=True
+        )
+        Service.objects.create(name='Sauna', description='Hot')
+        category = RoomCategory.objects.create(name='Deluxe', description='Room', base_price=200)
+        Room.objects.create(room_number='101', category=category)
+
+    def test_views_are_async(self):
+        for view in (views.home, views.news, views.article_detail, views.services):
+            self.assertTrue(iscoroutinefunction(view), view.__name__)
+        self.assertTrue(views.RoomListView.view_is_async)
+
+    async def test_pages_render_under_asgi(self):
+        client = AsyncClient()
+        for url, text in [
+            (reverse('hotel:home'), 'Spa reopens'),
+            (reverse('hotel:news'), 'Spa reopens'),
+            (reverse('hotel:article_detail', args=['spa-reopens']), 'Body'),
+            (reverse('hotel:services'), 'Sauna'),
+            (reverse('hotel:room_list'), '101'),
+        ]:
+            response = await client.get(url)
+            self.assertContains(response, text, msg_prefix=url)
+
+    async def test_unpublished_article_is_not_found(self):
+        await Article.objects.filter(pk=self.article.pk).aupdate(is_published=False)
+        response = await AsyncClient().get(reverse('hotel:article_detail', args=['spa-reopens']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_async_view_is_served_from_page_cache(self):
+        url = reverse('hotel:news')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, 'Spa reopens')
+
+    def test_room_filters(self):
+        other = RoomCategory.objects.create(name='Suite', description='Room', base_price=400)
+        Room.objects.create(room_number='201', category=other)
+        response = self.client.get(reverse('hotel:room_list'), {'category': other.pk, 'available_only': ''})
+        self.assertEqual([room.room_number for room in response.context['rooms']], ['201'])
+        self.assertEqual((response.context['min_room_price'], response.context['max_room_price']), (200, 400))
+        self.assertFalse(response.context['is_staff'])
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        status = 500 if self.path == '/broken' else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RunLoadTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StatusHandler)
+        cls.server.daemon_threads = True
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_counts_requests(self):
+        result = run_load(f'{self.base_url}/', concurrency=3, duration=0.3)
+        self.assertGreater(result.requests, 3)
+        self.assertEqual(result.errors, 0)
+        self.assertGreater(result.rps, 0)
+        self.assertLessEqual(result.percentile(50), result.percentile(99))
+
+    def test_error_responses_are_not_latencies(self):
+        result = run_load(f'{self.base_url}/broken', concurrency=2, duration=0.2)
+        self.assertEqual(result.requests, 0)
+        self.assertGreater(result.errors, 0)
+        self.assertIsNone(result.percentile(95))
+
+    def test_percentile(self):
+        result = LoadResult(url='/', duration=1, latencies=[0.4, 0.1, 0.3, 0.2])
+        self.assertEqual(result.percentile(50), 0.2)
+        self.assertEqual(result.percentile(99), 0.4)
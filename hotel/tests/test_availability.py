@@ -0,0 +1,94 @@
+from django.test import TestCase, Client as TestClient
+from django.urls import reverse
+from django.contrib.auth.models import User
+from datetime import date, timedelta
+from hotel.models import RoomCategory, Room, Client, Reservation
+from hotel.availability import available_rooms, is_room_available
+
+class AvailabilityTest(TestCase):
+    def setUp(self):
+        self.category = RoomCategory.objects.create(
+            name='Standard',
+            description='Standard room',
+            base_price=100.00
+        )
+        self.room = Room.objects.create(room_number='101', category=self.category)
+        self.other_room = Room.objects.create(room_number='102', category=self.category)
+        self.guest = Client.objects.create(
+            first_name='Test',
+            last_name='Guest',
+            email='guest@example.com',
+            phone='+375 (29) 123-45-67'
+        )
+        self.today = date.today()
+        self.reservation = Reservation.objects.create(
+            client=self.guest,
+            room=self.room,
+            check_in_date=self.today + timedelta(days=10),
+            check_out_date=self.today + timedelta(days=13),
+            status='confirmed',
+            total_price=300
+        )
+
+    def days(self, n):
+        return self.today + timedelta(days=n)
+
+    def test_overlapping_stay_is_unavailable(self):
+        rooms = available_rooms(self.days(11), self.days(12))
+        self.assertNotIn(self.room, rooms)
+        self.assertIn(self.other_room, rooms)
+
+    def test_partial_overlap_is_unavailable(self):
+        self.assertFalse(is_room_available(self.room, self.days(8), self.days(11)))
+        self.assertFalse(is_room_available(self.room, self.days(12), self.days(15)))
+
+    def test_back_to_back_stays_are_available(self):
+        # Check-out day of one stay is the check-in day of the next
+        self.assertTrue(is_room_available(self.room, self.days(7), self.days(10)))
+        self.assertTrue(is_room_available(self.room, self.days(13), self.days(15)))
+
+    def test_other_dates_are_available(self):
+        self.assertIn(self.room, available_rooms(self.days(1), self.days(3)))
+
+    def test_cancelled_reservation_releases_room(self):
+        self.reservation.status = 'cancelled'
+        self.reservation.save()
+        self.assertTrue(is_room_available(self.room, self.days(11), self.days(12)))
+
+    def test_exclude_current_reservation(self):
+        self.assertTrue(is_room_available(
+            self.room, self.days(11), self.days(12), exclude=self.reservation
+        ))
+
+    def test_maintenance_room_is_unavailable(self):
+        self.other_room.status = 'maintenance'
+        self.other_room.save()
+        self.assertNotIn(self.other_room, available_rooms(self.days(1), self.days(3)))
+
+    def test_room_list_filters_by_dates(self):
+        response = TestClient().get(reverse('hotel:room_list'), {
+            'check_in': self.days(11).isoformat(),
+            'check_out': self.days(12).isoformat(),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['rooms']), [self.other_room])
+
+    def test_book_room_rejects_overlapping_dates(self):
+        booker = User.objects.create_user(username='booker', password='password123')
+        Client.objects.create(
+            user=booker,
+            first_name='Book',
+            last_name='Er',
+            email='booker@example.com',
+            phone='+375 (29) 765-43-21'
+        )
+        client = TestClient()
+        client.login(username='booker', password='password123')
+
+        response = client.post(reverse('hotel:book_room', args=[self.room.pk]), {
+            'check_in_date': self.days(12).isoformat(),
+            'check_out_date': self.days(14).isoformat(),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "already booked")
+        self.assertEqual(Reservation.objects.filter(room=self.room).count(), 1)
@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from django.db import IntegrityError, connections
+from django.test import TestCase, TransactionTestCase
+from hotel.models import RoomCategory, Room, Client, Reservation
+from hotel.booking import reserve_room, DATES_TAKEN, ROOM_UNAVAILABLE, ROOM_NOT_FOUND
+
+def create_guests(count):
+    return Client.objects.bulk_create([
+        Client(
+            first_name='Guest',
+            last_name=str(i),
+            email=f'guest{i}@example.com',
+            phone='+375 (29) 123-45-67'
+        )
+        for i in range(count)
+    ])
+
+class ReserveRoomTest(TestCase):
+    def setUp(self):
+        self.category = RoomCategory.objects.create(
+            name='Standard',
+            description='Standard room',
+            base_price=100.00
+        )
+        self.room = Room.objects.create(room_number='101', category=self.category)
+        self.guest, self.other_guest = create_guests(2)
+        self.check_in = date.today() + timedelta(days=1)
+        self.check_out = date.today() + timedelta(days=4)
+
+    def test_successful_booking(self):
+        result = reserve_room(self.guest, self.room.id, self.check_in, self.check_out)
+        self.assertTrue(result.ok)
+        self.assertIsNone(result.conflict)
+        self.assertEqual(result.reservation.total_price, 300)
+        # Only the dates are taken; the room stays listed for other stays
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.status, 'available')
+
+    def test_overlapping_booking_is_a_conflict(self):
+        reserve_room(self.guest, self.room.id, self.check_in, self.check_out)
+        result = reserve_room(
+            self.other_guest, self.room.id,
+            self.check_in + timedelta(days=1), self.check_out + timedelta(days=1)
+        )
+        self.assertFalse(result.ok)
+        self.assertEqual(result.conflict, DATES_TAKEN)
+        self.assertIn("already booked", result.message)
+
+    def test_room_under_maintenance(self):
+        self.room.status = 'maintenance'
+        self.room.save()
+        result = reserve_room(self.guest, self.room.id, self.check_in, self.check_out)
+        self.assertEqual(result.conflict, ROOM_UNAVAILABLE)
+
+    def test_missing_room(self):
+        result = reserve_room(self.guest, 999, self.check_in, self.check_out)
+        self.assertEqual(result.conflict, ROOM_NOT_FOUND)
+
+    def test_database_rejects_overlap(self):
+        # Bypasses the service to check the constraint from migration 0011
+        reserve_room(self.guest, self.room.id, self.check_in, self.check_out)
+        with self.assertRaises(IntegrityError):
+            Reservation.objects.create(
+                client=self.other_guest,
+                room=self.room,
+                check_in_date=self.check_in,
+                check_out_date=self.check_out,
+                status='confirmed',
+                total_price=300
+            )
+
+    def test_database_allows_overlap_with_cancelled(self):
+        result = reserve_room(self.guest, self.room.id, self.check_in, self.check_out)
+        result.reservation.status = 'cancelled'
+        result.reservation.save()
+        self.assertTrue(reserve_room(self.other_guest, self.room.id, self.check_in, self.check_out).ok)
+
+class ConcurrentBookingStressTest(TransactionTestCase):
+    """Fire many parallel bookings at a handful of rooms and count the winners"""
+    # Include any read replicas (test mirrors of default) the router may pick
+    databases = '__all__'
+    BOOKINGS = 300
+    WORKERS = 16
+    ROOMS = 5
+
+    def setUp(self):
+        category = RoomCategory.objects.create(
+            name='Standard',
+            description='Standard room',
+            base_price=100.00
+        )
+        self.rooms = Room.objects.bulk_create([
+            Room(room_number=str(100 + i), category=category) for i in range(self.ROOMS)
+        ])
+        self.guests = create_guests(self.BOOKINGS)
+
+    def attempt(self, i):
+        # Every attempt targets one of a few rooms with overlapping stays
+        room = self.rooms[i % self.ROOMS]
+        check_in = date.today() + timedelta(days=1 + i % 3)
+        try:
+            return reserve_room(self.guests[i], room.id, check_in, check_in + timedelta(days=3))
+        finally:
+            connections.close_all()
+
+    def test_no_double_bookings(self):
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            results = list(pool.map(self.attempt, range(self.BOOKINGS)))
+
+        booked = sum(1 for result in results if result.ok)
+
+        # Every stay overlaps every other stay in the same room, so exactly
+        # one booking per room can win
+        self.assertEqual(booked, self.ROOMS)
+        self.assertEqual(Reservation.objects.count(), self.ROOMS)
+        for room in self.rooms:
+            self.assertEqual(Reservation.objects.filter(room=room).count(), 1)
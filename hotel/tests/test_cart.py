@@ -0,0 +1,124 @@
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from hotel.context_processors import cart_summary
+from hotel.models import Cart, CartItem, Service
+from hotel.tests.querycount import QueryBudgetMixin
+
+
+class CartTotalsTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='guest', password='guestpassword')
+        self.cart = Cart.objects.create(user=self.user)
+        self.spa = Service.objects.create(name='Spa', description='Relax', price=Decimal('40.00'))
+        self.dinner = Service.objects.create(name='Dinner', description='Eat', price=Decimal('25.50'))
+        self.free = Service.objects.create(name='Wi-Fi', description='Internet', price=None)
+
+    def add(self, service, quantity):
+        return CartItem.objects.create(cart=self.cart, service=service, quantity=quantity)
+
+    def cached(self):
+        self.cart.refresh_from_db()
+        return self.cart.cached_total, self.cart.cached_count
+
+    def test_totals_in_one_query(self):
+        self.add(self.spa, 2)
+        self.add(self.dinner, 1)
+        self.add(self.free, 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.cart.totals(), (Decimal('105.50'), 6))
+
+    def test_empty_cart(self):
+        self.assertEqual(self.cart.totals(), (0, 0))
+        self.assertEqual(self.cached(), (0, 0))
+
+    def test_cached_totals_follow_item_writes(self):
+        spa = self.add(self.spa, 2)
+        dinner = self.add(self.dinner, 1)
+        self.assertEqual(self.cached(), (Decimal('105.50'), 3))
+
+        spa.quantity = 1
+        spa.save()
+        self.assertEqual(self.cached(), (Decimal('65.50'), 2))
+
+        dinner.delete()
+        self.assertEqual(self.cached(), (Decimal('40.00'), 1))
+
+        self.cart.items.all().delete()
+        self.assertEqual(self.cached(), (0, 0))
+
+    def test_cached_totals_follow_price_change(self):
+        self.add(self.spa, 2)
+        self.spa.price = Decimal('50.00')
+        self.spa.save()
+        self.assertEqual(self.cached(), (Decimal('100.00'), 2))
+
+    def test_refresh_totals_repairs_drift(self):
+        self.add(self.spa, 1)
+        Cart.objects.update(cached_total=0, cached_count=0)
+        self.cart.refresh_totals()
+        self.assertEqual((self.cart.cached_total, self.cart.cached_count), (Decimal('40.00'), 1))
+
+    def test_cart_view_query_count_does_not_grow_with_items(self):
+        self.client.login(username='guest', password='guestpassword')
+        url = reverse('hotel:cart_view')
+        self.add(self.spa, 1)
+        self.client.get(url)
+        with self.assertMaxQueries(8) as few:
+            self.client.get(url)
+
+        for i in range(10):
+            self.add(Service.objects.create(name=f'Extra {i}', description='Extra', price=1), 1)
+        with self.assertMaxQueries(8) as many:
+            response = self.client.get(url)
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+        self.assertEqual(response.context['total_price'], Decimal('50.00'))
+        self.assertEqual(response.context['items_count'], 11)
+
+
+class CartSummaryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='guest', password='guestpassword')
+        self.client.login(username='guest', password='guestpassword')
+        self.spa = Service.objects.create(name='Spa', description='Relax', price=Decimal('40.00'))
+
+    def cart_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        return response, [q['sql'] for q in context.captured_queries if 'hotel_cart' in q['sql']]
+
+    def test_badge_is_served_from_cache(self):
+        self.client.get(reverse('hotel:add_to_cart', args=[self.spa.pk]))
+        self.client.get(reverse('hotel:add_to_cart', args=[self.spa.pk]))
+
+        response, queries = self.cart_queries(reverse('hotel:glossary'))
+        self.assertContains(response, 'Корзина (2)')
+        self.assertEqual(len(queries), 1)
+
+        response, queries = self.cart_queries(reverse('hotel:glossary'))
+        self.assertContains(response, 'Корзина (2)')
+        self.assertEqual(queries, [])
+
+    def test_cart_views_invalidate_badge(self):
+        self.client.get(reverse('hotel:add_to_cart', args=[self.spa.pk]))
+        self.client.get(reverse('hotel:glossary'))
+        item = CartItem.objects.get()
+
+        self.client.post(reverse('hotel:update_cart', args=[item.pk]), {'quantity': 5})
+        self.assertContains(self.client.get(reverse('hotel:glossary')), 'Корзина (5)')
+
+        self.client.get(reverse('hotel:remove_from_cart', args=[item.pk]))
+        self.assertNotContains(self.client.get(reverse('hotel:glossary')), 'Корзина (')
+
+    def test_context_processor_is_lazy(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        with self.assertNumQueries(0):
+            context = cart_summary(request)
+        with self.assertNumQueries(1):
+            self.assertEqual(context['cart_items_count'], 0)
@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from hotel.models import ChartImage
+from hotel.charts import bar_chart_spec, chart_data_hash, find_chart, prune_charts, render_bar_chart, store_chart
+
+class ChartCacheTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def chart_files(self):
+        charts_dir = os.path.join(self.media_root, 'charts')
+        return os.listdir(charts_dir) if os.path.isdir(charts_dir) else []
+
+    def chart(self, labels, values):
+        """Look the chart up as the render job and view do, storing it when missing"""
+        spec, data_hash = bar_chart_spec('Bookings', labels, values)
+        return find_chart(data_hash) or store_chart('Bookings', data_hash, render_bar_chart(**spec))
+
+    def test_render_bar_chart_returns_png(self):
+        png = render_bar_chart('Title', ['A', 'B'], [1, 2])
+        self.assertTrue(png.startswith(b'\x89PNG'))
+
+    def test_hash_depends_on_data(self):
+        self.assertEqual(chart_data_hash(labels=['A'], values=[1]), chart_data_hash(labels=['A'], values=[1]))
+        self.assertNotEqual(chart_data_hash(labels=['A'], values=[1]), chart_data_hash(labels=['A'], values=[2]))
+
+    def test_identical_data_reuses_image(self):
+        first = self.chart(['A', 'B'], [1, 2])
+        second = self.chart(['A', 'B'], [1, 2])
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(ChartImage.objects.count(), 1)
+        self.assertEqual(len(self.chart_files()), 1)
+
+    def test_changed_data_renders_new_image(self):
+        first = self.chart(['A', 'B'], [1, 2])
+        second = self.chart(['A', 'B'], [1, 3])
+        self.assertNotEqual(first.pk, second.pk)
+        self.assertEqual(len(self.chart_files()), 2)
+
+    def test_missing_file_is_rendered_again(self):
+        chart = self.chart(['A'], [1])
+        chart.image.storage.delete(chart.image.name)
+
+        chart = self.chart(['A'], [1])
+        self.assertTrue(chart.image.storage.exists(chart.image.name))
+        self.assertEqual(ChartImage.objects.count(), 1)
+
+    def test_prune_removes_stale_rows_and_files(self):
+        stale = self.chart(['A'], [1])
+        fresh = self.chart(['A'], [2])
+        ChartImage.objects.filter(pk=stale.pk).update(last_used_at=timezone.now() - timedelta(days=40))
+
+        self.assertEqual(prune_charts(retention_days=30), 1)
+        self.assertEqual(list(ChartImage.objects.values_list('pk', flat=True)), [fresh.pk])
+        self.assertEqual(self.chart_files(), [os.path.basename(fresh.image.name)])
+
+    def test_prune_command(self):
+        chart = self.chart(['A'], [1])
+        ChartImage.objects.filter(pk=chart.pk).update(last_used_at=timezone.now() - timedelta(days=40))
+
+        out = StringIO()
+        call_command('prune_charts', days=30, stdout=out)
+        self.assertIn('Deleted 1 chart(s)', out.getvalue())
+
+    @override_settings(RENDER_JOB_BACKEND='hotel.jobs.ImmediateBackend')
+    def test_distribution_view_reuses_chart(self):
+        User.objects.create_user(username='staff', password='password123', is_staff=True)
+        self.client.login(username='staff', password='password123')
+
+        # The first visit queues the render, which runs once the request commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('hotel:room_booking_distribution_chart'))
+
+        for _ in range(2):
+            response = self.client.get(reverse('hotel:room_booking_distribution_chart'))
+            self.assertEqual(response.status_code, 200)
+            self.assertIsNotNone(response.context['chart_image'])
+        self.assertEqual(ChartImage.objects.count(), 1)
@@ -0,0 +1,54 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+from django.test import RequestFactory, TestCase
+from hotel.context_processors import date_timezone_info, highlighted_calendar, resolve_timezone
+
+
+class DateTimezoneInfoTest(TestCase):
+    def setUp(self):
+        highlighted_calendar.cache_clear()
+
+    def context(self, cookie=None, now=datetime(2025, 3, 10, 23, 30, tzinfo=dt_timezone.utc)):
+        request = RequestFactory().get('/')
+        if cookie:
+            request.COOKIES['user_timezone'] = cookie
+        with mock.patch('hotel.context_processors.timezone.now', return_value=now):
+            return date_timezone_info(request)
+
+    def test_user_timezone_is_applied(self):
+        context = self.context('Europe/Minsk')
+        self.assertEqual(context['user_timezone'], 'Europe/Minsk')
+        self.assertEqual(context['user_current_date'].day, 11)
+        self.assertEqual(context['utc_current_date'].day, 10)
+
+    def test_unknown_timezone_falls_back_to_utc(self):
+        for cookie in ['Mars/Olympus', '../../etc/passwd']:
+            context = self.context(cookie)
+            self.assertEqual(context['user_timezone'], 'UTC')
+            self.assertEqual(context['user_current_date'].day, 10)
+
+    def test_calendar_is_lazy(self):
+        self.context('Europe/Minsk')
+        self.assertEqual(highlighted_calendar.cache_info().currsize, 0)
+
+    def test_calendar_highlights_only_today(self):
+        calendar_text = str(self.context('Europe/Minsk')['text_calendar'])
+        self.assertIn('[11]', calendar_text)
+        self.assertEqual(calendar_text.count('['), 1)
+        self.assertTrue(calendar_text.startswith('     March 2025'))
+
+    def test_calendar_is_memoized(self):
+        for _ in range(3):
+            str(self.context('Europe/Minsk')['text_calendar'])
+        info = highlighted_calendar.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+    def test_single_digit_day_does_not_match_inside_other_days(self):
+        self.assertIn('[ 1]  2', highlighted_calendar(2025, 12, 1))
+        self.assertNotIn('[ 1]', highlighted_calendar(2025, 12, 11))
+
+    def test_timezones_are_resolved_once(self):
+        resolve_timezone.cache_clear()
+        for _ in range(3):
+            self.context('Asia/Tokyo')
+        self.assertEqual(resolve_timezone.cache_info().misses, 1)
@@ -0,0 +1,42 @@
+import json
+import unittest
+from io import StringIO
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from hotel.models import CartItem, Reservation
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite' and settings.SQLITE_PRAGMAS, 'tuned SQLite profile')
+class SQLiteProfileTest(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(self.pragma('cache_size'), settings.SQLITE_PRAGMAS['cache_size'])
+
+    def test_connections_persist_with_health_checks(self):
+        self.assertGreater(connection.settings_dict['CONN_MAX_AGE'], 0)
+        self.assertTrue(connection.settings_dict['CONN_HEALTH_CHECKS'])
+
+
+class BenchmarkWritesTest(TransactionTestCase):
+    # Include any read replicas (test mirrors of default) the router may pick
+    databases = '__all__'
+
+    def test_worker_writes_every_request(self):
+        out = StringIO()
+        call_command('benchmark_writes', '--worker', '--threads', '2', '--operations', '6', stdout=out)
+        results = json.loads(out.getvalue())
+
+        for workload in ('booking', 'cart'):
+            self.assertEqual(results[workload]['requests'], 6)
+            self.assertEqual(results[workload]['errors'], 0)
+        self.assertEqual(Reservation.objects.count(), 6)
+        self.assertEqual(sum(CartItem.objects.values_list('quantity', flat=True)), 6)
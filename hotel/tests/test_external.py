@@ -0,0 +1,206 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from hotel.external import (
+    CircuitBreaker, ExternalWidget, fetch_daily_quote, fetch_exchange_rates,
+    daily_quote_widget, exchange_rates_widget
+)
+
+QUOTE_PAYLOAD = {'quote': {'body': 'Stay curious.', 'author': 'Stub Author'}}
+RATES_PAYLOAD = {
+    'result': 'success',
+    'conversion_rates': {'EUR': 0.9, 'GBP': 0.8, 'BYN': 3.2, 'RUB': 90.0},
+}
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        server.hits += 1
+        route = server.routes.get(self.path, (404, {}, 0))
+        if isinstance(route, list):
+            # Responses in turn, the last one repeating
+            route = route.pop(0) if len(route) > 1 else route[0]
+        status, payload, delay = route
+        if delay:
+            time.sleep(delay)
+        body = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    do_POST = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+class StubServerMixin:
+    """Runs a local HTTP server standing in for the third-party APIs"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        cls.server.daemon_threads = True
+        cls.server.routes = {}
+        cls.server.hits = 0
+        cls.server.connections = 0
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.server.routes = {
+            '/qotd': (200, QUOTE_PAYLOAD, 0),
+            '/rates/KEY/USD': (200, RATES_PAYLOAD, 0),
+        }
+        self.server.hits = 0
+        self.server.connections = 0
+        self.settings_override = override_settings(
+            FAVQS_QOTD_URL=f'{self.base_url}/qotd',
+            EXCHANGE_RATE_API_URL=f'{self.base_url}/rates/{{api_key}}/{{base_currency}}',
+            EXCHANGE_RATE_API_KEY='KEY',
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+class FetchTest(StubServerMixin, TestCase):
+    def test_fetch_daily_quote(self):
+        self.assertEqual(fetch_daily_quote(timeout=1), {
+            'quote': 'Stay curious.',
+            'author': 'Stub Author',
+        })
+
+    def test_fetch_exchange_rates(self):
+        rates = fetch_exchange_rates(timeout=1)
+        self.assertEqual(rates['EUR'], 0.9)
+        self.assertEqual(rates['RUB'], 90.0)
+        self.assertIn('timestamp', rates)
+
+    def test_fetches_share_a_keep_alive_connection(self):
+        for _ in range(3):
+            fetch_daily_quote(timeout=1)
+            fetch_exchange_rates(timeout=1)
+        self.assertEqual(self.server.hits, 6)
+        self.assertLessEqual(self.server.connections, 1)
+
+    def test_fetch_exchange_rates_api_error(self):
+        self.server.routes['/rates/KEY/USD'] = (200, {'result': 'error'}, 0)
+        with self.assertRaises(ValueError):
+            fetch_exchange_rates(timeout=1)
+
+class ExternalWidgetTest(StubServerMixin, TestCase):
+    def make_widget(self, **kwargs):
+        options = {'ttl': 60, 'stale_ttl': 600, 'timeout': 0.5}
+        options.update(kwargs)
+        return ExternalWidget('test_quote', fetch_daily_quote, **options)
+
+    def test_cold_cache_returns_none_and_refreshes(self):
+        widget = self.make_widget()
+        self.assertIsNone(widget.get())
+        widget.pending.result(timeout=5)
+        self.assertEqual(widget.get()['author'], 'Stub Author')
+        self.assertEqual(self.server.hits, 1)
+
+    def test_fresh_entry_skips_network(self):
+        widget = self.make_widget()
+        widget.refresh()
+        for _ in range(5):
+            widget.get()
+        self.assertEqual(self.server.hits, 1)
+
+    def test_stale_entry_is_served_while_revalidating(self):
+        widget = self.make_widget(ttl=0)
+        widget.refresh()
+        self.server.routes['/qotd'] = (200, {'quote': {'body': 'New', 'author': 'Other'}}, 0)
+
+        self.assertEqual(widget.get()['quote'], 'Stay curious.')
+        widget.pending.result(timeout=5)
+        self.assertEqual(widget.get()['quote'], 'New')
+
+    async def test_aget_serves_stale_value_while_revalidating(self):
+        widget = self.make_widget(ttl=0)
+        self.assertIsNone(await widget.aget())
+        widget.pending.result(timeout=5)
+        self.server.routes['/qotd'] = (200, {'quote': {'body': 'New', 'author': 'Other'}}, 0)
+
+        self.assertEqual((await widget.aget())['quote'], 'Stay curious.')
+        widget.pending.result(timeout=5)
+        self.assertEqual((await widget.aget())['quote'], 'New')
+
+    def test_timeout_counts_as_failure(self):
+        self.server.routes['/qotd'] = (200, QUOTE_PAYLOAD, 1)
+        widget = self.make_widget(timeout=0.1)
+        self.assertIsNone(widget.refresh())
+        self.assertEqual(widget.breaker.failures, 1)
+
+    def test_failed_refresh_keeps_stale_value(self):
+        widget = self.make_widget(ttl=0)
+        widget.refresh()
+        self.server.routes['/qotd'] = (500, {}, 0)
+        widget.refresh()
+        self.assertEqual(widget.get()['quote'], 'Stay curious.')
+
+    def test_circuit_opens_after_repeated_failures(self):
+        self.server.routes['/qotd'] = (500, {}, 0)
+        widget = self.make_widget(breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        widget.refresh()
+        widget.refresh()
+        self.assertTrue(widget.breaker.is_open)
+
+        widget.refresh()
+        self.assertEqual(self.server.hits, 2)
+
+    def test_circuit_half_opens_after_reset_timeout(self):
+        self.server.routes['/qotd'] = (500, {}, 0)
+        widget = self.make_widget(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0))
+        widget.refresh()
+        self.assertTrue(widget.breaker.is_open)
+
+        self.server.routes['/qotd'] = (200, QUOTE_PAYLOAD, 0)
+        self.assertIsNotNone(widget.refresh())
+        self.assertFalse(widget.breaker.is_open)
+
+class HomeWidgetsTest(StubServerMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        daily_quote_widget.breaker.reset()
+        exchange_rates_widget.breaker.reset()
+
+    def test_home_does_not_wait_for_slow_upstreams(self):
+        self.server.routes['/qotd'] = (200, QUOTE_PAYLOAD, 2)
+        self.server.routes['/rates/KEY/USD'] = (200, RATES_PAYLOAD, 2)
+
+        started = time.perf_counter()
+        response = self.client.get(reverse('hotel:home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(time.perf_counter() - started, 1)
+
+    def test_home_renders_cached_widgets(self):
+        daily_quote_widget.refresh()
+        exchange_rates_widget.refresh()
+
+        response = self.client.get(reverse('hotel:home'))
+        self.assertContains(response, 'Stay curious.')
+        self.assertEqual(response.context['exchange_rates']['EUR'], 0.9)
@@ -62,6 +62,26 @@ class RoomFilterFormTest(TestCase):
         form = RoomFilterForm(data={})
         self.assertTrue(form.is_valid())
 
+    def test_filter_form_dates_valid(self):
+        today = date.today()
+        form = RoomFilterForm(data={
+            'check_in': today + timedelta(days=1),
+            'check_out': today + timedelta(days=3),
+        })
+        self.assertTrue(form.is_valid())
+
+    def test_filter_form_requires_both_dates(self):
+        form = RoomFilterForm(data={'check_in': date.today()})
+        self.assertFalse(form.is_valid())
+
+    def test_filter_form_check_out_before_check_in(self):
+        today = date.today()
+        form = RoomFilterForm(data={
+            'check_in': today + timedelta(days=3),
+            'check_out': today + timedelta(days=1),
+        })
+        self.assertFalse(form.is_valid())
+
 class UserRegisterFormTest(TestCase):
     def setUp(self):
         # Create a user that we'll use to test unique email constraint
@@ -146,4 +166,4 @@ class PhoneValidationTest(TestCase):
         
         for phone in test_cases:
             with self.assertRaises(ValidationError):
-                validate_and_format_phone(phone)
\ No newline at end of file
+                validate_and_format_phone(phone)
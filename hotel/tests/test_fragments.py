@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from io import StringIO
+from hotel.fragments import fragment_stats
+from hotel.models import Article, Banner, Partner, Service
+
+UNREACHABLE = 'http://127.0.0.1:9/'
+BLOCK_TABLES = ('hotel_article', 'hotel_banner', 'hotel_service', 'hotel_partner')
+
+
+@override_settings(FAVQS_QOTD_URL=UNREACHABLE, EXCHANGE_RATE_API_URL=UNREACHABLE)
+class HomeFragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.article = Article.objects.create(
+            title='Pool reopens', slug='pool', content='Text', summary='Heated again', is_published=True
+        )
+        self.banner = Banner.objects.create(title='Winter sale', image='banners/winter.png')
+        self.service = Service.objects.create(name='Spa', description='Relax')
+        self.partner = Partner.objects.create(name='City Tours', logo='partners/tours.png', website_url='https://example.com')
+        self.url = reverse('hotel:home')
+
+    def get(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        # Which blocks had to go to the database
+        tables = {
+            table for query in context.captured_queries for table in BLOCK_TABLES
+            if f'"{table}"' in query['sql']
+        }
+        return response, tables
+
+    def test_cache_hit_skips_the_database(self):
+        _, tables = self.get()
+        self.assertEqual(tables, set(BLOCK_TABLES))
+
+        response, tables = self.get()
+        self.assertEqual(tables, set())
+        for text in ('Pool reopens', 'Winter sale', 'Spa', 'City Tours'):
+            self.assertContains(response, text)
+
+    def test_saving_a_model_refreshes_only_its_block(self):
+        self.get()
+        self.banner.title = 'Spring sale'
+        self.banner.save()
+
+        response, tables = self.get()
+        self.assertEqual(tables, {'hotel_banner'})
+        self.assertContains(response, 'Spring sale')
+        self.assertNotContains(response, 'Winter sale')
+
+    def test_deleting_a_model_refreshes_its_block(self):
+        self.get()
+        self.article.delete()
+        self.assertContains(self.get()[0], 'Нет свежих новостей.')
+
+    def test_hit_ratio_per_fragment(self):
+        self.get()
+        self.get()
+        self.get()
+        Service.objects.create(name='Sauna', description='Hot')
+        self.get()
+
+        stats = fragment_stats()
+        self.assertEqual(stats['home_banners'], {'hits': 3, 'misses': 1, 'hit_ratio': 0.75})
+        self.assertEqual(stats['home_services'], {'hits': 2, 'misses': 2, 'hit_ratio': 0.5})
+
+    def test_stats_command(self):
+        self.get()
+        self.get()
+        out = StringIO()
+        call_command('fragment_cache_stats', '--reset', stdout=out)
+        self.assertIn('home_partners: 50.0% (1 hits, 1 misses)', out.getvalue())
+        self.assertIsNone(fragment_stats()['home_partners']['hit_ratio'])
@@ -0,0 +1,117 @@
+import os
+from io import BytesIO, StringIO
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+from hotel.images import load_manifest, render_image_variants
+from hotel.jobs import run_job
+from hotel.models import Banner, Partner, RenderJob, Staff
+from hotel.tests.test_jobs import TempMediaMixin
+
+
+def image_file(width, height, mode='RGB', format='JPEG'):
+    buffer = BytesIO()
+    Image.new(mode, (width, height), 'red').save(buffer, format=format)
+    return ContentFile(buffer.getvalue())
+
+
+def render(template, **context):
+    return Template('{% load responsive_images %}' + template).render(Context(context))
+
+
+@override_settings(RENDER_JOB_BACKEND='hotel.jobs.DatabaseBackend', IMAGE_VARIANT_WIDTHS=(320, 640, 1280))
+class ImageVariantTest(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def banner(self, width=1000, height=500, **kwargs):
+        banner = Banner(title='Sale')
+        banner.image.save('sale.jpg', image_file(width, height, **kwargs), save=True)
+        return banner
+
+    def test_variants_stored_next_to_original(self):
+        banner = self.banner()
+        manifest = render_image_variants(banner.image.name, [320, 640, 1280])
+
+        # Never upscaled past the 1000px original
+        self.assertEqual([v['width'] for v in manifest['variants']], [320, 640])
+        self.assertEqual(manifest['fallback'], 'jpeg')
+        for variant in manifest['variants']:
+            self.assertEqual(os.path.dirname(variant['webp']), 'banners')
+            with default_storage.open(variant['webp']) as f:
+                image = Image.open(f)
+                self.assertEqual((image.format, image.width), ('WEBP', variant['width']))
+            with default_storage.open(variant['fallback']) as f:
+                image = Image.open(f)
+                self.assertEqual((image.format, image.size), ('JPEG', (variant['width'], variant['width'] // 2)))
+
+    def test_transparent_images_fall_back_to_png(self):
+        partner = Partner(name='Tours', website_url='https://example.com')
+        partner.logo.save('tours.png', image_file(800, 400, mode='RGBA', format='PNG'), save=True)
+        manifest = render_image_variants(partner.logo.name, [320])
+        self.assertEqual(manifest['fallback'], 'png')
+        self.assertTrue(manifest['variants'][0]['fallback'].endswith('.320w.png'))
+
+    def test_upload_queues_a_job_once(self):
+        banner = self.banner()
+        job = RenderJob.objects.get(kind='image_variants')
+        self.assertEqual(job.params, {'name': banner.image.name, 'widths': [320, 640, 1280]})
+
+        banner.title = 'Bigger sale'
+        banner.save()
+        self.assertEqual(RenderJob.objects.filter(kind='image_variants').count(), 1)
+
+        run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertIsNotNone(load_manifest(banner.image.name))
+
+    def test_missing_original_fails_the_job(self):
+        banner = Banner.objects.create(title='Gone', image='banners/missing.jpg')
+        job = RenderJob.objects.get(kind='image_variants')
+        run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertIsNone(load_manifest(banner.image.name))
+
+    def test_tag_serves_original_until_variants_exist(self):
+        banner = self.banner()
+        html = render('{% responsive_image banner.image alt="Sale" class="hero" %}', banner=banner)
+        self.assertHTMLEqual(html, f'<img src="{banner.image.url}" alt="Sale" loading="lazy" class="hero">')
+
+        run_job(RenderJob.objects.get(kind='image_variants').pk)
+        html = render('{% responsive_image banner.image alt="Sale" sizes="50vw" %}', banner=banner)
+        base = banner.image.url.rsplit('.', 1)[0]
+        self.assertInHTML(
+            f'<source type="image/webp" srcset="{base}.320w.webp 320w, {base}.640w.webp 640w" sizes="50vw">',
+            html
+        )
+        self.assertIn(f'srcset="{base}.320w.jpeg 320w, {base}.640w.jpeg 640w, {banner.image.url} 1000w"', html)
+        self.assertIn('width="1000"', html)
+        self.assertIn('height="500"', html)
+
+    def test_tag_does_not_queue_jobs(self):
+        # Pages rendering images stay read-only: no job rows, no primary pinning
+        banner = self.banner()
+        RenderJob.objects.all().delete()
+        with self.assertNumQueries(0):
+            render('{% responsive_image banner.image %}', banner=banner)
+        self.assertFalse(RenderJob.objects.exists())
+
+    def test_tag_ignores_empty_fields(self):
+        self.assertEqual(render('{% responsive_image staff.photo %}', staff=Staff(name='Ann')), '')
+
+    def test_backfill_command(self):
+        banner = self.banner()
+        Banner.objects.create(title='Gone', image='banners/missing.jpg')
+        out, err = StringIO(), StringIO()
+        call_command('generate_image_variants', stdout=out, stderr=err)
+
+        self.assertIn('Generated variants for 1 image(s), 1 failed', out.getvalue())
+        self.assertIn('banners/missing.jpg', err.getvalue())
+        self.assertIsNotNone(load_manifest(banner.image.name))
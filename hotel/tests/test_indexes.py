@@ -0,0 +1,102 @@
+import re
+import unittest
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from hotel.models import (
+    Article, Banner, Client, PromoCode, Reservation, Review, Room, RoomCategory, Service, Vacancy
+)
+
+UNREACHABLE = 'http://127.0.0.1:9/'
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'plans are checked with SQLite EXPLAIN QUERY PLAN')
+@override_settings(FAVQS_QOTD_URL=UNREACHABLE, EXCHANGE_RATE_API_URL=UNREACHABLE)
+class QueryPlanTest(TestCase):
+    """Each listing view's queries must be answered from the index declared for them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        user = User.objects.create_user(username='guest', password='guestpassword')
+        guest = Client.objects.create(
+            user=user,
+            first_name='Test',
+            last_name='Guest',
+            email='guest@example.com',
+            phone='1'
+        )
+        category = RoomCategory.objects.create(name='Standard', description='Standard room', base_price=100)
+        room = Room.objects.create(room_number='101', category=category)
+        Reservation.objects.create(
+            client=guest,
+            room=room,
+            check_in_date=today,
+            check_out_date=today + timedelta(days=1),
+            total_price=100
+        )
+        Article.objects.create(title='News', slug='news', content='Text', summary='Text', is_published=True)
+        Banner.objects.create(title='Banner', image='banners/banner.png')
+        Vacancy.objects.create(title='Chef', description='Cook', requirements='Cooking')
+        Review.objects.create(client=guest, rating=5, text='Great', is_published=True)
+        PromoCode.objects.create(code='SUMMER', description='Sale', valid_from=today, valid_to=today)
+        Service.objects.create(name='Spa', description='Relax')
+        User.objects.create_user(username='staff', password='staffpassword', is_staff=True)
+
+    def query_plans(self, url, table):
+        """EXPLAIN QUERY PLAN output for every query against table made while rendering url"""
+        # Page and fragment caches would otherwise hide the queries behind a warm entry
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        pattern = re.compile(rf'\bFROM "{table}"')
+        plans = []
+        with connection.cursor() as cursor:
+            for query in context.captured_queries:
+                if pattern.search(query['sql']):
+                    cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                    plans.append(' | '.join(row[-1] for row in cursor.fetchall()))
+        self.assertTrue(plans, f'{url} ran no queries against {table}')
+        return plans
+
+    def assertUsesIndex(self, url, table, index):
+        for plan in self.query_plans(url, table):
+            self.assertIn(index, plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_news(self):
+        self.assertUsesIndex(reverse('hotel:news'), 'hotel_article', 'article_published_idx')
+
+    def test_home(self):
+        url = reverse('hotel:home')
+        self.assertUsesIndex(url, 'hotel_article', 'article_published_idx')
+        self.assertUsesIndex(url, 'hotel_banner', 'banner_active_idx')
+        self.assertUsesIndex(url, 'hotel_service', 'service_available_idx')
+
+    def test_vacancies(self):
+        self.assertUsesIndex(reverse('hotel:vacancies'), 'hotel_vacancy', 'vacancy_active_idx')
+
+    def test_reviews(self):
+        self.assertUsesIndex(reverse('hotel:reviews'), 'hotel_review', 'review_published_idx')
+
+    def test_promo_codes(self):
+        plans = self.query_plans(reverse('hotel:promo_codes'), 'hotel_promocode')
+        self.assertEqual(len(plans), 2)
+        self.assertIn('promocode_active_idx', plans[0])
+        self.assertIn('promocode_expired_idx', plans[1])
+        for plan in plans:
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_services(self):
+        self.assertUsesIndex(reverse('hotel:services'), 'hotel_service', 'service_available_idx')
+
+    def test_staff_dashboard_recent_reservations(self):
+        self.client.login(username='staff', password='staffpassword')
+        plans = self.query_plans(reverse('hotel:staff_dashboard'), 'hotel_reservation')
+        self.assertTrue(any('reservation_created_idx' in plan for plan in plans), plans)
@@ -0,0 +1,117 @@
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from hotel.charts import bar_chart_spec
+from hotel.jobs import submit_job, run_job
+from hotel.models import RenderJob, ChartImage
+
+class TempMediaMixin:
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def submit(self, values=(1, 2)):
+        spec, data_hash = bar_chart_spec('Bookings', ['A', 'B'], values)
+        return submit_job('bar_chart', data_hash, spec)
+
+@override_settings(RENDER_JOB_BACKEND='hotel.jobs.DatabaseBackend')
+class RenderJobTest(TempMediaMixin, TestCase):
+    def test_submit_reuses_job_in_flight(self):
+        first = self.submit()
+        self.assertEqual(self.submit().pk, first.pk)
+        self.assertNotEqual(self.submit(values=(3, 4)).pk, first.pk)
+
+    def test_run_job_stores_chart(self):
+        job = self.submit()
+        run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.chart.data_hash, job.data_hash)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failed_job_records_error(self):
+        job = RenderJob.objects.create(kind='bar_chart', data_hash='x', params={'title': 'Broken'})
+        run_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertTrue(job.error)
+
+    def test_job_is_only_run_once(self):
+        job = self.submit()
+        run_job(job.pk)
+        run_job(job.pk)
+        self.assertEqual(ChartImage.objects.count(), 1)
+
+    def test_status_endpoint(self):
+        User.objects.create_user(username='staff', password='password123', is_staff=True)
+        self.client.login(username='staff', password='password123')
+        job = self.submit()
+        url = reverse('hotel:render_job_status', args=[job.pk])
+
+        self.assertEqual(self.client.get(url).json(), {'status': 'queued'})
+
+        run_job(job.pk)
+        data = self.client.get(url).json()
+        self.assertEqual(data['status'], 'done')
+        self.assertTrue(data['image_url'].endswith('.png'))
+
+    def test_status_endpoint_requires_staff(self):
+        job = self.submit()
+        response = self.client.get(reverse('hotel:render_job_status', args=[job.pk]))
+        self.assertEqual(response.status_code, 302)
+
+    def test_view_returns_before_chart_is_rendered(self):
+        User.objects.create_user(username='staff', password='password123', is_staff=True)
+        self.client.login(username='staff', password='password123')
+
+        response = self.client.get(reverse('hotel:room_booking_distribution_chart'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['chart_image'])
+        self.assertContains(response, reverse('hotel:render_job_status', args=[response.context['job'].pk]))
+
+    def test_worker_command_drains_queue(self):
+        self.submit(values=(1, 2))
+        self.submit(values=(3, 4))
+
+        out = StringIO()
+        call_command('run_render_jobs', once=True, workers=2, stdout=out)
+        self.assertIn('Processed 2 job(s)', out.getvalue())
+        self.assertEqual(RenderJob.objects.filter(status='done').count(), 2)
+
+    def test_worker_command_waits_when_nothing_is_claimed(self):
+        self.submit()
+        # Another worker wins every claim, so the queue never looks empty
+        with mock.patch('hotel.management.commands.run_render_jobs.claim_job', return_value=None), \
+                mock.patch('hotel.management.commands.run_render_jobs.time.sleep', side_effect=[None, KeyboardInterrupt]) as sleep:
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('run_render_jobs', workers=1, poll_interval=2.5, stdout=StringIO())
+        self.assertEqual(sleep.call_args_list, [mock.call(2.5), mock.call(2.5)])
+
+@override_settings(RENDER_JOB_BACKEND='hotel.jobs.ProcessPoolBackend', RENDER_JOB_WORKERS=1)
+class ProcessPoolBackendTest(TempMediaMixin, TransactionTestCase):
+    databases = '__all__'
+
+    def test_job_renders_in_worker_process(self):
+        job = self.submit()
+
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            job.refresh_from_db()
+            if job.status in ('done', 'failed'):
+                break
+            time.sleep(0.2)
+
+        self.assertEqual(job.status, 'done', job.error)
+        self.assertTrue(job.chart.image.storage.exists(job.chart.image.name))
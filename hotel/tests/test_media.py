@@ -0,0 +1,201 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from hotel.media import RangeNotSatisfiable, parse_range
+from hotel.models import ChunkedUpload, CompanyInfo
+from hotel.tests.test_jobs import TempMediaMixin
+from hotel.uploads import partial_path
+
+VIDEO = bytes(range(256)) * 40  # 10240 bytes
+
+
+class ParseRangeTest(TestCase):
+    def test_ranges(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=900-5000', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-5000', 1000), (0, 999))
+
+    def test_ignored_ranges(self):
+        for header in ('bytes=5-1', 'bytes=-', 'bytes=0-1,5-9', 'items=0-1'):
+            self.assertIsNone(parse_range(header, 1000), header)
+
+    def test_unsatisfiable(self):
+        for header in ('bytes=1000-', 'bytes=-0'):
+            with self.assertRaises(RangeNotSatisfiable):
+                parse_range(header, 1000)
+
+
+class MediaServingTest(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(os.path.join(self.media_root, 'company', 'videos'))
+        with open(os.path.join(self.media_root, 'company', 'videos', 'tour.mp4'), 'wb') as f:
+            f.write(VIDEO)
+        self.url = '/media/company/videos/tour.mp4'
+
+    def test_whole_file(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(int(response['Content-Length']), len(VIDEO))
+        self.assertEqual(b''.join(response.streaming_content), VIDEO)
+
+    def test_range(self):
+        response = self.client.get(self.url, headers={'Range': 'bytes=1000-1999'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 1000-1999/{len(VIDEO)}')
+        self.assertEqual(response['Content-Length'], '1000')
+        self.assertEqual(b''.join(response.streaming_content), VIDEO[1000:2000])
+
+    def test_suffix_range(self):
+        response = self.client.get(self.url, headers={'Range': 'bytes=-10'})
+        self.assertEqual(b''.join(response.streaming_content), VIDEO[-10:])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, headers={'Range': f'bytes={len(VIDEO)}-'})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(VIDEO)}')
+
+    def test_if_range_with_stale_validator_sends_whole_file(self):
+        etag = self.client.get(self.url)['ETag']
+        fresh = self.client.get(self.url, headers={'Range': 'bytes=0-9', 'If-Range': etag})
+        self.assertEqual(fresh.status_code, 206)
+        stale = self.client.get(self.url, headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+        self.assertEqual(stale.status_code, 200)
+
+    def test_conditional_get(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': etag}).status_code, 304)
+
+    def test_missing_and_outside_media_root(self):
+        self.assertEqual(self.client.get('/media/company/videos/missing.mp4').status_code, 404)
+        self.assertEqual(self.client.get('/media/company/').status_code, 404)
+        self.assertEqual(self.client.get('/media/../manage.py').status_code, 404)
+
+    def test_only_public_prefixes_are_served(self):
+        with open(os.path.join(self.media_root, 'private.txt'), 'wb') as f:
+            f.write(b'secret')
+        self.assertEqual(self.client.get('/media/private.txt').status_code, 404)
+
+    def test_charts_are_staff_only(self):
+        os.makedirs(os.path.join(self.media_root, 'charts'))
+        with open(os.path.join(self.media_root, 'charts', 'revenue.png'), 'wb') as f:
+            f.write(b'png')
+        for url in ('/media/charts/revenue.png', '/media/company/../charts/revenue.png'):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+        User.objects.create_user('staff', password='staffpassword', is_staff=True)
+        self.client.login(username='staff', password='staffpassword')
+        response = self.client.get('/media/charts/revenue.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+
+class ChunkedUploadTest(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        upload_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, upload_dir, ignore_errors=True)
+        settings_override = override_settings(CHUNKED_UPLOAD_DIR=upload_dir, CHUNKED_UPLOAD_MAX_CHUNK=4096)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.company = CompanyInfo.objects.create(name='LuxStay', description='Hotel')
+        self.staff = User.objects.create_user(username='staff', password='staffpassword', is_staff=True)
+        self.client.login(username='staff', password='staffpassword')
+
+    def start(self, filename='tour.mp4', size=len(VIDEO)):
+        return self.client.post(
+            reverse('hotel:video_upload_start', args=[self.company.pk]),
+            {'filename': filename, 'size': size},
+            content_type='application/json'
+        )
+
+    def put(self, url, start, end, total=len(VIDEO), body=None):
+        return self.client.put(
+            url,
+            VIDEO[start:end + 1] if body is None else body,
+            content_type='application/octet-stream',
+            headers={'Content-Range': f'bytes {start}-{end}/{total}'}
+        )
+
+    def test_upload_in_chunks(self):
+        response = self.start()
+        self.assertEqual(response.status_code, 201)
+        url = response.json()['url']
+
+        for start in range(0, len(VIDEO), 4096):
+            response = self.put(url, start, min(start + 4095, len(VIDEO) - 1))
+            self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertEqual(data['status'], 'complete')
+        self.company.refresh_from_db()
+        self.assertEqual(data['video_url'], self.company.video_file.url)
+        with self.company.video_file.open('rb') as f:
+            self.assertEqual(f.read(), VIDEO)
+        self.assertFalse(os.path.exists(partial_path(ChunkedUpload.objects.get())))
+
+    def test_resume_after_interruption(self):
+        url = self.start().json()['url']
+        self.put(url, 0, 4095)
+        # The connection drops halfway through the second chunk
+        self.assertEqual(self.put(url, 4096, 8191, body=VIDEO[4096:6000]).status_code, 400)
+
+        state = self.client.get(url).json()
+        self.assertEqual(state['offset'], 4096)
+        self.put(url, 4096, 8191)
+        response = self.put(url, 8192, len(VIDEO) - 1)
+        self.assertEqual(response.json()['status'], 'complete')
+        self.company.refresh_from_db()
+        with self.company.video_file.open('rb') as f:
+            self.assertEqual(f.read(), VIDEO)
+
+    def test_chunk_at_wrong_offset(self):
+        url = self.start().json()['url']
+        self.put(url, 0, 4095)
+        response = self.put(url, 0, 4095)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 4096)
+
+    def test_rejected_chunks(self):
+        url = self.start().json()['url']
+        self.assertEqual(self.put(url, 0, 8191).status_code, 413)
+        self.assertEqual(self.put(url, 0, 99, total=5).status_code, 400)
+        self.assertEqual(self.client.put(url, b'x', content_type='application/octet-stream').status_code, 400)
+
+    def test_rejected_uploads(self):
+        self.assertEqual(self.start(filename='notes.txt').status_code, 400)
+        self.assertEqual(self.start(size=0).status_code, 400)
+        response = self.client.post(
+            reverse('hotel:video_upload_start', args=[self.company.pk]), 'nope', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_staff_may_upload(self):
+        self.client.logout()
+        User.objects.create_user(username='guest', password='guestpassword')
+        self.client.login(username='guest', password='guestpassword')
+        self.assertEqual(self.start().status_code, 302)
+        self.assertFalse(ChunkedUpload.objects.exists())
+
+    def test_expire_abandoned_uploads(self):
+        url = self.start().json()['url']
+        self.put(url, 0, 4095)
+        upload = ChunkedUpload.objects.get()
+        ChunkedUpload.objects.filter(pk=upload.pk).update(updated_at=timezone.now() - timedelta(days=2))
+
+        out = StringIO()
+        call_command('expire_uploads', stdout=out)
+        self.assertIn('Deleted 1 upload(s)', out.getvalue())
+        self.assertFalse(os.path.exists(partial_path(upload)))
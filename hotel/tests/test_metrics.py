@@ -0,0 +1,126 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from hotel.metrics import Histogram, MetricsRegistry, RequestStats, begin_request, end_request, labels, registry
+from hotel.models import Article
+from hotel.outbound import HTTPClient
+from .test_external import StubServerMixin
+
+
+class QueryTimingTest(TransactionTestCase):
+    def test_reconnects_do_not_count_queries_twice(self):
+        # connection_created fires again each time the same connection object reconnects
+        for _ in range(3):
+            connection.close()
+            connection.ensure_connection()
+        stats, token = begin_request()
+        try:
+            Article.objects.using('default').count()
+        finally:
+            end_request(token)
+        self.assertEqual(stats.db_queries, 1)
+
+
+class MetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        Article.objects.create(title='Spa reopens', slug='spa-reopens', content='Body', summary='Summary', is_published=True)
+
+    def histogram(self, name, view):
+        return registry.histograms[name][view]
+
+    def test_records_per_url_name(self):
+        self.client.get(reverse('hotel:room_list'))
+        self.client.get(reverse('hotel:room_list'))
+
+        self.assertEqual(self.histogram('hotel_request_duration_seconds', 'hotel:room_list').count, 2)
+        self.assertGreater(self.histogram('hotel_request_db_queries', 'hotel:room_list').sum, 0)
+        self.assertGreater(self.histogram('hotel_request_db_seconds', 'hotel:room_list').sum, 0)
+        self.assertGreater(self.histogram('hotel_request_template_seconds', 'hotel:room_list').sum, 0)
+        self.assertEqual(registry.counters['hotel_requests_total'][('hotel:room_list', '2xx')], 2)
+
+    def test_cache_hits_and_misses(self):
+        url = reverse('hotel:news')
+        self.client.get(url)
+        self.assertGreater(registry.counters['hotel_cache_misses_total'][('hotel:news',)], 0)
+        self.client.get(url)
+        self.assertGreater(registry.counters['hotel_cache_hits_total'][('hotel:news',)], 0)
+
+    async def test_async_views_are_measured(self):
+        await AsyncClient().get(reverse('hotel:article_detail', args=['spa-reopens']))
+        self.assertGreater(self.histogram('hotel_request_db_queries', 'hotel:article_detail').sum, 0)
+        self.assertGreater(self.histogram('hotel_request_template_seconds', 'hotel:article_detail').sum, 0)
+
+    def test_unresolved_requests(self):
+        self.client.get('/no-such-page/')
+        self.assertEqual(registry.counters['hotel_requests_total'][('unresolved', '4xx')], 1)
+
+    def test_slow_requests_are_logged(self):
+        with override_settings(METRICS_SLOW_REQUEST_THRESHOLDS={'hotel:news': 0}):
+            with self.assertLogs('hotel.metrics', 'WARNING') as logs:
+                self.client.get(reverse('hotel:news'))
+        self.assertIn('/news/ (hotel:news)', logs.output[0])
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        self.client.get(reverse('hotel:news'))
+        self.assertEqual(registry.histograms['hotel_request_duration_seconds'], {})
+
+
+class MetricsEndpointTest(TestCase):
+    def setUp(self):
+        registry.reset()
+
+    def test_staff_only(self):
+        response = self.client.get(reverse('hotel:metrics'))
+        self.assertEqual(response.status_code, 302)
+
+        self.client.force_login(User.objects.create_user('guest', password='pw'))
+        self.assertEqual(self.client.get(reverse('hotel:metrics')).status_code, 302)
+
+    def test_prometheus_text_format(self):
+        self.client.force_login(User.objects.create_user('staff', password='pw', is_staff=True))
+        self.client.get(reverse('hotel:privacy_policy'))
+        response = self.client.get(reverse('hotel:metrics'))
+
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        text = response.content.decode()
+        self.assertIn('# TYPE hotel_request_duration_seconds histogram', text)
+        self.assertIn('hotel_request_duration_seconds_bucket{view="hotel:privacy_policy",le="+Inf"} 1', text)
+        self.assertIn('hotel_request_duration_seconds_count{view="hotel:privacy_policy"} 1', text)
+        self.assertIn('hotel_requests_total{view="hotel:privacy_policy",status="2xx"} 1', text)
+        self.assertIn('# TYPE hotel_upstream_requests_total counter', text)
+
+
+class MetricsRegistryTest(SimpleTestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram((0.1, 1))
+        for value in (0.05, 0.5, 0.7, 3):
+            histogram.observe(value)
+        self.assertEqual([total for _, total in histogram.cumulative()], [1, 3, 4])
+        self.assertEqual(histogram.sum, 4.25)
+
+    def test_labels_are_escaped(self):
+        self.assertEqual(labels(view='a"b\\c\n'), '{view="a\\"b\\\\c\\n"}')
+
+    def test_upstream_counters(self):
+        metrics = MetricsRegistry()
+        text = metrics.exposition(upstreams={'favqs.com': {
+            'requests': 3, 'errors': 1, 'retries': 2, 'rejected': 0, 'latency_total': 0.25,
+        }})
+        self.assertIn('hotel_upstream_requests_total{host="favqs.com"} 3', text)
+        self.assertIn('hotel_upstream_seconds_total{host="favqs.com"} 0.25', text)
+
+
+class OutboundTimeTest(StubServerMixin, SimpleTestCase):
+    def test_outbound_time_is_added_to_request(self):
+        stats, token = begin_request()
+        try:
+            HTTPClient().get(f'{self.base_url}/qotd')
+        finally:
+            end_request(token)
+        self.assertIsInstance(stats, RequestStats)
+        self.assertGreater(stats.http_time, 0)
@@ -0,0 +1,82 @@
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from hotel.models import Cart, CartItem, Order, OrderItem, Service
+from hotel.orders import EMPTY_CART, place_order
+
+
+class PlaceOrderTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='guest', password='guestpassword', email='guest@example.com')
+        self.cart = Cart.objects.create(user=self.user)
+        self.spa = Service.objects.create(name='Spa', description='Relax', price=Decimal('40.00'))
+        self.dinner = Service.objects.create(name='Dinner', description='Eat', price=Decimal('25.50'))
+        CartItem.objects.create(cart=self.cart, service=self.spa, quantity=2)
+        CartItem.objects.create(cart=self.cart, service=self.dinner, quantity=1)
+
+    def test_order_is_created_and_cart_cleared(self):
+        result = place_order(self.cart, 'guest@example.com', user=self.user)
+
+        self.assertTrue(result.ok)
+        self.assertEqual(result.order.total_amount, Decimal('105.50'))
+        items = {item.service_id: (item.quantity, item.price) for item in result.order.items.all()}
+        self.assertEqual(items, {
+            self.spa.pk: (2, Decimal('40.00')),
+            self.dinner.pk: (1, Decimal('25.50')),
+        })
+        self.assertFalse(self.cart.items.exists())
+        self.cart.refresh_from_db()
+        self.assertEqual((self.cart.cached_total, self.cart.cached_count), (0, 0))
+
+    def test_items_are_bulk_inserted(self):
+        with mock.patch.object(OrderItem.objects, 'create') as create:
+            place_order(self.cart, 'guest@example.com')
+        create.assert_not_called()
+        self.assertEqual(OrderItem.objects.count(), 2)
+
+    def test_empty_cart(self):
+        CartItem.objects.all().delete()
+        result = place_order(self.cart, 'guest@example.com')
+        self.assertFalse(result.ok)
+        self.assertEqual(result.conflict, EMPTY_CART)
+        self.assertFalse(Order.objects.exists())
+
+    def test_idempotency_key_returns_existing_order(self):
+        first = place_order(self.cart, 'guest@example.com', idempotency_key='abc')
+        second = place_order(self.cart, 'guest@example.com', idempotency_key='abc')
+
+        self.assertFalse(first.replayed)
+        self.assertTrue(second.replayed)
+        self.assertEqual(first.order, second.order)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failure_rolls_back_everything(self):
+        with mock.patch.object(OrderItem.objects, 'bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                place_order(self.cart, 'guest@example.com')
+
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(self.cart.items.count(), 2)
+
+
+class PaymentViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='guest', password='guestpassword', email='guest@example.com')
+        self.client.login(username='guest', password='guestpassword')
+        cart = Cart.objects.create(user=self.user)
+        service = Service.objects.create(name='Spa', description='Relax', price=Decimal('40.00'))
+        CartItem.objects.create(cart=cart, service=service, quantity=1)
+
+    def test_double_submit_creates_one_order(self):
+        url = reverse('hotel:payment')
+        key = self.client.get(url).context['idempotency_key']
+
+        responses = [self.client.post(url, {'idempotency_key': key}) for _ in range(2)]
+
+        order = Order.objects.get()
+        for response in responses:
+            self.assertRedirects(response, reverse('hotel:order_success', args=[order.id]))
+        self.assertEqual(order.idempotency_key, key)
+        self.assertEqual(order.email, 'guest@example.com')
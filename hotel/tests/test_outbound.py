@@ -0,0 +1,83 @@
+import threading
+import time
+import requests
+from django.test import SimpleTestCase, override_settings
+from hotel.outbound import HTTPClient, HostBusy, backoff_delay
+from .test_external import QUOTE_PAYLOAD, StubServerMixin
+
+
+@override_settings(OUTBOUND_HTTP_RETRIES=2, OUTBOUND_HTTP_BACKOFF=0, OUTBOUND_HTTP_HOSTS={})
+class HTTPClientTest(StubServerMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = HTTPClient()
+        self.url = f'{self.base_url}/qotd'
+
+    def test_connection_is_reused(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(self.url).json(), QUOTE_PAYLOAD)
+        self.assertEqual(self.server.hits, 3)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_retries_unavailable_upstream(self):
+        self.server.routes['/qotd'] = [(503, {}, 0), (503, {}, 0), (200, QUOTE_PAYLOAD, 0)]
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.hits, 3)
+        stats = self.client.stats()['127.0.0.1']
+        self.assertEqual((stats['requests'], stats['retries'], stats['errors']), (1, 2, 0))
+
+    def test_gives_up_after_retries(self):
+        self.server.routes['/qotd'] = (503, {}, 0)
+        self.assertEqual(self.client.get(self.url).status_code, 503)
+        self.assertEqual(self.server.hits, 3)
+        self.assertEqual(self.client.stats()['127.0.0.1']['errors'], 1)
+
+    def test_internal_errors_are_not_retried(self):
+        self.server.routes['/qotd'] = (500, {}, 0)
+        self.client.get(self.url)
+        self.assertEqual(self.server.hits, 1)
+
+    def test_writes_are_not_retried(self):
+        self.server.routes['/qotd'] = (503, {}, 0)
+        self.assertEqual(self.client.request('POST', self.url).status_code, 503)
+        self.assertEqual(self.server.hits, 1)
+
+    def test_per_host_timeout(self):
+        self.server.routes['/qotd'] = (200, QUOTE_PAYLOAD, 0.5)
+        with override_settings(OUTBOUND_HTTP_HOSTS={'127.0.0.1': {'timeout': 0.1, 'retries': 0}}):
+            started = time.perf_counter()
+            with self.assertRaises(requests.Timeout):
+                self.client.get(self.url)
+        self.assertLess(time.perf_counter() - started, 0.4)
+        self.assertEqual(self.client.stats()['127.0.0.1']['errors'], 1)
+
+    def test_concurrency_limit(self):
+        self.server.routes['/qotd'] = (200, QUOTE_PAYLOAD, 0.5)
+        with override_settings(OUTBOUND_HTTP_HOSTS={'127.0.0.1': {'max_concurrency': 1, 'timeout': 2}}):
+            slow = threading.Thread(target=self.client.get, args=(self.url,))
+            slow.start()
+            time.sleep(0.1)
+            # Fails fast instead of waiting for a slot
+            started = time.perf_counter()
+            with self.assertRaises(HostBusy):
+                self.client.get(self.url)
+            self.assertLess(time.perf_counter() - started, 0.1)
+            slow.join()
+        stats = self.client.stats()['127.0.0.1']
+        self.assertEqual((stats['requests'], stats['rejected']), (2, 1))
+
+    def test_latency_is_recorded(self):
+        self.client.get(self.url)
+        stats = self.client.stats()['127.0.0.1']
+        self.assertGreater(stats['latency_max'], 0)
+        self.assertEqual(stats['latency_avg'], stats['latency_total'])
+
+        self.client.reset_stats()
+        self.assertEqual(self.client.stats(), {})
+
+    def test_backoff_jitter_stays_within_bounds(self):
+        for attempt in range(4):
+            delay = backoff_delay(attempt, 0.2)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, 0.2 * 2 ** attempt)
@@ -0,0 +1,73 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from hotel.models import FAQ, Vacancy
+
+
+class PageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.faq = FAQ.objects.create(question='Is parking free?', answer='Yes, for guests.')
+        self.url = reverse('hotel:glossary')
+
+    def get(self, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, headers=headers)
+        return response, len(context.captured_queries)
+
+    def test_second_request_is_served_from_cache(self):
+        first, first_queries = self.get()
+        second, second_queries = self.get()
+
+        self.assertGreater(first_queries, 0)
+        self.assertEqual(second_queries, 0)
+        self.assertEqual(first.content, second.content)
+        self.assertContains(second, 'Is parking free?')
+
+    def test_saving_a_dependency_invalidates(self):
+        self.get()
+        self.faq.question = 'Is parking included?'
+        self.faq.save()
+
+        response, queries = self.get()
+        self.assertGreater(queries, 0)
+        self.assertContains(response, 'Is parking included?')
+
+    def test_deleting_a_dependency_invalidates(self):
+        self.get()
+        self.faq.delete()
+        self.assertNotContains(self.get()[0], 'Is parking free?')
+
+    def test_unrelated_model_does_not_invalidate(self):
+        self.get()
+        Vacancy.objects.create(title='Chef', description='Cook', requirements='Cooking')
+        self.assertEqual(self.get()[1], 0)
+
+    def test_conditional_get(self):
+        response, _ = self.get()
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        not_modified, _ = self.get(if_none_match=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        not_modified, _ = self.get(if_modified_since=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_varies_on_timezone_cookie(self):
+        self.get()
+        self.client.cookies['user_timezone'] = 'Asia/Tokyo'
+        response, queries = self.get()
+        self.assertGreater(queries, 0)
+        self.assertContains(response, 'Asia/Tokyo')
+
+    def test_authenticated_users_are_not_cached(self):
+        User.objects.create_user(username='guest', password='guestpassword')
+        self.client.login(username='guest', password='guestpassword')
+        self.get()
+        response, queries = self.get()
+        self.assertGreater(queries, 0)
+        self.assertFalse(response.has_header('ETag'))
@@ -0,0 +1,117 @@
+from datetime import date
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from hotel.models import RoomCategory, Room, Client, Reservation
+from hotel.pagination import keyset_page
+from hotel.tests.querycount import QueryBudgetMixin
+
+ORDERING = ('last_name', 'first_name', 'id')
+
+
+class KeysetPageTest(TestCase):
+    def setUp(self):
+        # Duplicate names make sure the id tiebreaker is honoured
+        for i in range(7):
+            Client.objects.create(
+                first_name='Anna' if i % 2 else 'Boris',
+                last_name=f'Surname{i // 3}',
+                email=f'client{i}@example.com',
+                phone='+375 (29) 123-45-67'
+            )
+        self.expected = list(Client.objects.order_by(*ORDERING))
+
+    def walk_forward(self, size):
+        seen, cursor = [], None
+        while True:
+            page = keyset_page(Client.objects.all(), ORDERING, after=cursor, size=size)
+            seen.extend(page.items)
+            if not page.has_next:
+                return seen, page
+            cursor = page.next_cursor
+
+    def test_forward_walk_visits_every_row_once(self):
+        seen, last_page = self.walk_forward(size=3)
+        self.assertEqual(seen, self.expected)
+        self.assertTrue(last_page.has_previous)
+
+    def test_backward_walk_returns_previous_pages(self):
+        first = keyset_page(Client.objects.all(), ORDERING, size=3)
+        second = keyset_page(Client.objects.all(), ORDERING, after=first.next_cursor, size=3)
+        back = keyset_page(Client.objects.all(), ORDERING, before=second.previous_cursor, size=3)
+
+        self.assertEqual(back.items, first.items)
+        self.assertFalse(back.has_previous)
+        self.assertEqual(back.next_cursor, first.next_cursor)
+
+    def test_first_page(self):
+        page = keyset_page(Client.objects.all(), ORDERING, size=3)
+        self.assertEqual(page.items, self.expected[:3])
+        self.assertFalse(page.has_previous)
+        self.assertTrue(page.has_next)
+
+    def test_tampered_cursor_starts_over(self):
+        page = keyset_page(Client.objects.all(), ORDERING, after='not-a-cursor', size=3)
+        self.assertEqual(page.items, self.expected[:3])
+
+
+class StaffDashboardTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        User.objects.create_user(username='staff', password='staffpassword', is_staff=True)
+        self.client.login(username='staff', password='staffpassword')
+
+        category = RoomCategory.objects.create(name='Standard', description='Standard room', base_price=100)
+        room = Room.objects.create(room_number='101', category=category)
+        self.guests = [
+            Client.objects.create(
+                first_name='Guest',
+                last_name=name,
+                email=f'{name.lower()}@example.com',
+                phone='+375 (29) 123-45-67'
+            )
+            for name in ['Smith', 'Smirnov', 'Ivanov', 'Petrov']
+        ]
+        for i, nights in enumerate([1, 2, 3]):
+            Reservation.objects.create(
+                client=self.guests[0],
+                room=room,
+                check_in_date=date(2025, 1, 1 + 5 * i),
+                check_out_date=date(2025, 1, 1 + 5 * i + nights),
+                total_price=100 * nights
+            )
+
+    def test_reservation_counts_are_annotated(self):
+        response = self.assertViewQueryBudget(reverse('hotel:staff_dashboard'), 7)
+        counts = {client.last_name: client.reservation_count for client in response.context['clients']}
+        self.assertEqual(counts, {'Smith': 3, 'Smirnov': 0, 'Ivanov': 0, 'Petrov': 0})
+
+    def test_query_count_does_not_grow_with_clients(self):
+        url = reverse('hotel:staff_dashboard')
+        # Warm the per-user caches (cart badge) so both measured requests see the same state
+        self.client.get(url)
+        with self.assertMaxQueries(7) as few:
+            self.client.get(url)
+        for i in range(20):
+            Client.objects.create(first_name='More', last_name=f'Guest{i}', email=f'more{i}@example.com', phone='1')
+        with self.assertMaxQueries(7) as many:
+            self.client.get(url)
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+
+    def test_search_matches_last_name_prefix(self):
+        response = self.client.get(reverse('hotel:staff_dashboard'), {'q': 'smi'})
+        names = [client.last_name for client in response.context['clients']]
+        self.assertEqual(names, ['Smirnov', 'Smith'])
+
+    def test_search_ignores_case(self):
+        Client.objects.create(first_name='Old', last_name='McDonald', email='Old.McDonald@Example.com', phone='1')
+        Client.objects.create(first_name='Anna', last_name='de Vries', email='anna@example.com', phone='1')
+        Client.objects.create(first_name='Иван', last_name='Иванченко', email='ivan@example.com', phone='1')
+        url = reverse('hotel:staff_dashboard')
+        for query, expected in [('mcd', 'McDonald'), ('De V', 'de Vries'), ('old.mcdonald@', 'McDonald'), ('иванч', 'Иванченко')]:
+            with self.subTest(query=query):
+                response = self.client.get(url, {'q': query})
+                self.assertEqual([client.last_name for client in response.context['clients']], [expected])
+
+    def test_search_matches_email_prefix(self):
+        response = self.client.get(reverse('hotel:staff_dashboard'), {'q': 'Ivanov@'})
+        self.assertEqual([client.last_name for client in response.context['clients']], ['Ivanov'])
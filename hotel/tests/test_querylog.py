@@ -0,0 +1,133 @@
+from datetime import date, timedelta
+from unittest import skipUnless
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.template import Context, Template
+from django.template.base import Origin
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve, reverse
+from hotel import querylog
+from hotel.middleware import QueryInspectionMiddleware
+from hotel.models import Client, Reservation, Room, RoomCategory
+from hotel.querylog import Finding, NPlusOneQuery, QueryReport, fingerprint, report
+
+LOOP_TEMPLATE = """{% for reservation in reservations %}
+{{ reservation.room.category.name }}
+{% endfor %}"""
+
+
+class FingerprintTest(SimpleTestCase):
+    def test_literals_and_placeholders_collapse(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM hotel_room WHERE id = 12 AND status = 'available'"),
+            fingerprint('SELECT * FROM hotel_room WHERE id = %s AND status = %s'),
+        )
+
+    def test_in_lists_of_any_length_match(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM hotel_room WHERE id IN (%s, %s, %s)'),
+            'SELECT * FROM hotel_room WHERE id IN (?+)',
+        )
+        self.assertEqual(fingerprint('SELECT  *\n FROM t WHERE id IN (1,2)'), 'SELECT * FROM t WHERE id IN (?+)')
+
+    def test_different_statements_differ(self):
+        self.assertNotEqual(fingerprint('SELECT * FROM hotel_room'), fingerprint('SELECT * FROM hotel_service'))
+
+
+class QueryReportTest(SimpleTestCase):
+    def test_keeps_largest_count_per_origin(self):
+        collected = QueryReport()
+        collected.add(Finding('SELECT ?', 'SELECT 1', 5, view='hotel:news', template='hotel/news.html:4'))
+        collected.add(Finding('SELECT ?', 'SELECT 1', 9, view='hotel:news', template='hotel/news.html:4'))
+        self.assertEqual([finding.count for finding in collected.findings.values()], [9])
+
+    def test_allow_list_by_view_or_template(self):
+        collected = QueryReport()
+        collected.add(Finding('SELECT ?', 'SELECT 1', 5, view='hotel:news', template='hotel/news.html:4'))
+        collected.add(Finding('SELECT ?', 'SELECT 1', 5, view='hotel:faq', template='hotel/glossary.html:9'))
+        with override_settings(QUERY_INSPECTION_ALLOW=['hotel:news', 'hotel/glossary.html']):
+            self.assertEqual(collected.unexpected(), [])
+        with override_settings(QUERY_INSPECTION_ALLOW=[]):
+            self.assertEqual(len(collected.unexpected()), 2)
+
+
+@skipUnless(settings.QUERY_INSPECTION, "query inspection is off")
+@override_settings(QUERY_INSPECTION_MODE='warn', QUERY_REPEAT_THRESHOLD=5)
+class QueryInspectionTest(TestCase):
+    def setUp(self):
+        # Findings provoked on purpose here must not fail the run
+        self.reported = dict(report.findings)
+        self.addCleanup(self.restore_report)
+
+        self.user = User.objects.create_user('guest', password='guestpassword')
+        self.guest = Client.objects.create(
+            user=self.user, first_name='Guest', last_name='User',
+            email='guest@example.com', phone='+375291234567'
+        )
+        first_night = date.today() + timedelta(days=1)
+        for i in range(6):
+            category = RoomCategory.objects.create(name=f'Category {i}', description='Rooms', base_price=100)
+            room = Room.objects.create(room_number=f'Q{i}', category=category)
+            Reservation.objects.create(
+                client=self.guest, room=room, check_in_date=first_night,
+                check_out_date=first_night + timedelta(days=2), total_price=200
+            )
+
+    def restore_report(self):
+        report.findings.clear()
+        report.findings.update(self.reported)
+
+    def render_loop(self, reservations):
+        template = Template(LOOP_TEMPLATE, origin=Origin('loop.html', template_name='loop.html'))
+        return template.render(Context({'reservations': reservations}))
+
+    def test_reports_repeated_query_with_template_line(self):
+        queries, token = querylog.begin_request()
+        with self.assertLogs('hotel.querylog', 'WARNING') as logs:
+            self.render_loop(Reservation.objects.all())
+            findings = querylog.end_request(queries, token, 'hotel:loop')
+
+        self.assertEqual({finding.template for finding in findings}, {'loop.html:2'})
+        self.assertEqual({finding.count for finding in findings}, {6})
+        self.assertIn('6x in hotel:loop (template loop.html:2)', logs.output[0])
+        self.assertTrue(all(finding.key in report.findings for finding in findings))
+
+    def test_select_related_avoids_the_report(self):
+        queries, token = querylog.begin_request()
+        self.render_loop(Reservation.objects.select_related('room__category'))
+        self.assertEqual(querylog.end_request(queries, token, 'hotel:loop'), [])
+
+    def test_raise_mode(self):
+        queries, token = querylog.begin_request()
+        try:
+            with override_settings(QUERY_INSPECTION_MODE='raise'):
+                with self.assertRaises(NPlusOneQuery) as raised:
+                    self.render_loop(Reservation.objects.all())
+        finally:
+            querylog.end_request(queries, token, 'hotel:loop')
+        self.assertIn('loop.html:2', str(raised.exception))
+
+    def test_queries_outside_requests_are_not_counted(self):
+        self.render_loop(Reservation.objects.all())
+        self.assertEqual(report.findings, self.reported)
+
+    def test_requests_are_inspected_by_middleware(self):
+        middleware = QueryInspectionMiddleware(lambda request: HttpResponse(self.render_loop(Reservation.objects.all())))
+        request = RequestFactory().get(reverse('hotel:client_dashboard'))
+        request.resolver_match = resolve(request.path)
+        with self.assertLogs('hotel.querylog', 'WARNING'):
+            middleware(request)
+        self.assertIn('hotel:client_dashboard', {finding.view for finding in report.findings.values()})
+
+    def test_client_dashboard_has_no_repeated_queries(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('hotel:client_dashboard'))
+        self.assertFalse(any(finding.view == 'hotel:client_dashboard' for finding in report.findings.values()))
+
+    def test_slow_queries_are_logged(self):
+        with self.settings(QUERY_SLOW_SECONDS=0):
+            with self.assertLogs('hotel.querylog', 'WARNING') as logs:
+                Room.objects.count()
+        self.assertIn('Slow query', logs.output[0])
+        self.assertIn('hotel_room', logs.output[0])
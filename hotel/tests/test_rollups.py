@@ -0,0 +1,120 @@
+from io import StringIO
+from decimal import Decimal
+from datetime import date
+from django.core.management import call_command
+from django.test import TestCase
+from hotel.models import RoomCategory, Room, Client, Reservation, ReservationDailyStats
+from hotel.rollups import rebuild_daily_stats
+
+class DailyStatsRollupTest(TestCase):
+    def setUp(self):
+        self.standard = RoomCategory.objects.create(name='Standard', description='Standard room', base_price=100)
+        self.suite = RoomCategory.objects.create(name='Suite', description='Suite', base_price=250)
+        self.room = Room.objects.create(room_number='101', category=self.standard)
+        self.other_room = Room.objects.create(room_number='102', category=self.standard)
+        self.suite_room = Room.objects.create(room_number='201', category=self.suite)
+        self.guest = Client.objects.create(
+            first_name='Test',
+            last_name='Guest',
+            email='guest@example.com',
+            phone='+375 (29) 123-45-67'
+        )
+
+    def book(self, room, check_in, check_out, price, status='confirmed'):
+        return Reservation.objects.create(
+            client=self.guest,
+            room=room,
+            check_in_date=check_in,
+            check_out_date=check_out,
+            status=status,
+            total_price=price
+        )
+
+    def stats(self):
+        return {
+            (row.date, row.category_id): (row.bookings, row.revenue, row.nights, row.occupied_rooms)
+            for row in ReservationDailyStats.objects.all()
+            if row.bookings or row.occupied_rooms
+        }
+
+    def test_new_reservation_is_rolled_up(self):
+        self.book(self.room, date(2025, 1, 1), date(2025, 1, 4), 300)
+        self.book(self.other_room, date(2025, 1, 2), date(2025, 1, 3), 100)
+
+        self.assertEqual(self.stats(), {
+            (date(2025, 1, 1), self.standard.pk): (1, Decimal('300'), 3, 1),
+            (date(2025, 1, 2), self.standard.pk): (1, Decimal('100'), 1, 2),
+            (date(2025, 1, 3), self.standard.pk): (0, Decimal('0'), 0, 1),
+        })
+
+    def test_updated_reservation_moves_totals(self):
+        reservation = self.book(self.room, date(2025, 1, 1), date(2025, 1, 3), 200)
+        reservation.room = self.suite_room
+        reservation.check_in_date = date(2025, 2, 1)
+        reservation.check_out_date = date(2025, 2, 2)
+        reservation.total_price = 250
+        reservation.save()
+
+        self.assertEqual(self.stats(), {
+            (date(2025, 2, 1), self.suite.pk): (1, Decimal('250'), 1, 1),
+        })
+
+    def test_room_changing_category_moves_totals(self):
+        self.book(self.room, date(2025, 1, 1), date(2025, 1, 3), 200)
+        self.book(self.room, date(2025, 2, 1), date(2025, 2, 2), 100, status='cancelled')
+        self.room.category = self.suite
+        self.room.save()
+
+        self.assertEqual(self.stats(), {
+            (date(2025, 1, 1), self.suite.pk): (1, Decimal('200'), 2, 1),
+            (date(2025, 1, 2), self.suite.pk): (0, Decimal('0'), 0, 1),
+        })
+        incremental = self.stats()
+        rebuild_daily_stats()
+        self.assertEqual(self.stats(), incremental)
+
+    def test_cancelled_and_deleted_reservations_are_removed(self):
+        cancelled = self.book(self.room, date(2025, 1, 1), date(2025, 1, 3), 200)
+        deleted = self.book(self.other_room, date(2025, 1, 1), date(2025, 1, 3), 200)
+
+        cancelled.status = 'cancelled'
+        cancelled.save()
+        deleted.delete()
+
+        self.assertEqual(self.stats(), {})
+
+    def test_deleting_category_cascades_cleanly(self):
+        self.book(self.suite_room, date(2025, 1, 1), date(2025, 1, 3), 500)
+        self.suite.delete()
+        self.assertFalse(ReservationDailyStats.objects.exists())
+
+    def test_rebuild_matches_incremental(self):
+        self.book(self.room, date(2025, 1, 1), date(2025, 1, 4), 300)
+        self.book(self.suite_room, date(2025, 1, 3), date(2025, 1, 5), 500)
+        self.book(self.other_room, date(2025, 1, 2), date(2025, 1, 3), 100, status='cancelled')
+        incremental = self.stats()
+
+        ReservationDailyStats.objects.update(bookings=0, occupied_rooms=0)
+        rebuild_daily_stats()
+        self.assertEqual(self.stats(), incremental)
+
+    def test_rebuild_date_range(self):
+        self.book(self.room, date(2025, 1, 1), date(2025, 1, 4), 300)
+        ReservationDailyStats.objects.all().delete()
+
+        rebuild_daily_stats(start=date(2025, 1, 2), end=date(2025, 1, 3))
+        self.assertEqual(self.stats(), {
+            (date(2025, 1, 2), self.standard.pk): (0, Decimal('0'), 0, 1),
+            (date(2025, 1, 3), self.standard.pk): (0, Decimal('0'), 0, 1),
+        })
+
+    def test_rebuild_command(self):
+        self.book(self.room, date(2025, 1, 1), date(2025, 1, 2), 100)
+        ReservationDailyStats.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_daily_stats', stdout=out)
+        self.assertIn('Rebuilt 1 daily stats rows', out.getvalue())
+        self.assertEqual(self.stats(), {
+            (date(2025, 1, 1), self.standard.pk): (1, Decimal('100'), 1, 1),
+        })
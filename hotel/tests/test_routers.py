@@ -0,0 +1,116 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.sessions.models import Session
+from django.db import connection, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from hotel.models import Room, Service
+from hotel.routers import PrimaryReplicaRouter, begin_read_pin, end_read_pin, pin_after_write, use_primary
+
+REPLICA = 'test_replica'
+
+
+@override_settings(REPLICA_DATABASES=['replica1', 'replica2'])
+class PrimaryReplicaRouterTest(SimpleTestCase):
+    router = PrimaryReplicaRouter()
+
+    def test_reads_go_to_replicas(self):
+        used = {self.router.db_for_read(Room) for _ in range(50)}
+        self.assertEqual(used, {'replica1', 'replica2'})
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(self.router.db_for_write(Room), 'default')
+
+    def test_pinned_reads_go_to_primary(self):
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(Room), 'default')
+        self.assertNotEqual(self.router.db_for_read(Room), 'default')
+
+    def test_sessions_always_read_from_primary(self):
+        self.assertEqual(self.router.db_for_read(Session), 'default')
+
+    def test_only_primary_is_migrated(self):
+        self.assertTrue(self.router.allow_migrate('default', 'hotel'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'hotel'))
+
+    @override_settings(REPLICA_DATABASES=[])
+    def test_no_replicas(self):
+        self.assertEqual(self.router.db_for_read(Room), 'default')
+
+
+class PrimaryWriteWatcherTest(TransactionTestCase):
+    def test_installed_once_across_reconnects(self):
+        # connection_created fires again each time the same connection object reconnects
+        for _ in range(3):
+            connection.close()
+            connection.ensure_connection()
+        self.assertEqual(connection.execute_wrappers.count(pin_after_write), 1)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'the replica is a copy of the SQLite test database')
+@override_settings(REPLICA_DATABASES=[REPLICA])
+class ReadYourWritesTest(TransactionTestCase):
+    """Runs against a second SQLite file standing in for a lagging replica"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.replica_path = os.path.join(directory, 'replica.sqlite3')
+        connections[REPLICA] = DatabaseWrapper({**connection.settings_dict, 'NAME': self.replica_path}, REPLICA)
+        self.addCleanup(self.drop_replica)
+
+        self.spa = Service.objects.create(name='Spa', description='Relax')
+        self.replicate()
+
+    def drop_replica(self):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+
+    def replicate(self):
+        """Copy the primary into the replica file, like a replication catch-up"""
+        connections[REPLICA].close()
+        connection.ensure_connection()
+        with sqlite3.connect(self.replica_path) as replica:
+            connection.connection.backup(replica)
+
+    def test_reads_use_replica(self):
+        Service.objects.create(name='Sauna', description='Hot')
+        self.assertEqual(list(Service.objects.values_list('name', flat=True)), ['Spa'])
+        with use_primary():
+            self.assertEqual(Service.objects.count(), 2)
+
+        self.replicate()
+        self.assertEqual(Service.objects.count(), 2)
+
+    def cart_items(self):
+        response = self.client.get(reverse('hotel:cart_view'))
+        return [item.service.name for item in response.context['cart_items']]
+
+    def test_visitor_reads_own_writes(self):
+        self.client.get(reverse('hotel:add_to_cart', args=[self.spa.pk]))
+        # The replica hasn't seen the new cart yet, but this visitor just wrote
+        self.assertEqual(self.cart_items(), ['Spa'])
+
+    def test_pin_expires(self):
+        with override_settings(REPLICA_PIN_SECONDS=-1):
+            self.client.get(reverse('hotel:add_to_cart', args=[self.spa.pk]))
+        self.assertEqual(self.cart_items(), [])
+
+        self.replicate()
+        self.assertEqual(self.cart_items(), ['Spa'])
+
+    def test_write_in_worker_thread_pins_request(self):
+        pin, token = begin_read_pin(False)
+        try:
+            # As an async view would, writing from a thread other than the request's
+            create = sync_to_async(Service.objects.create, thread_sensitive=False)
+            async_to_sync(create)(name='Sauna', description='Hot')
+            self.assertTrue(pin.wrote)
+            self.assertEqual(Service.objects.count(), 2)
+        finally:
+            end_read_pin(token)
@@ -0,0 +1,117 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from hotel.models import Article, FAQ, Room, RoomCategory, SearchDocument, Service, Vacancy
+from hotel.search import matching_ids, rebuild_search_index, search
+
+
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        self.standard = RoomCategory.objects.create(name='Standard', description='Standard room', base_price=100)
+        self.deluxe = RoomCategory.objects.create(name='Deluxe', description='Deluxe room', base_price=200)
+        self.sea_room = Room.objects.create(room_number='101', category=self.standard, description='Sea view with balcony')
+        self.garden_room = Room.objects.create(room_number='202', category=self.deluxe, description='Quiet garden side')
+        self.article = Article.objects.create(
+            title='Balcony renovation finished',
+            slug='balcony-renovation',
+            content='All sea view rooms have new balconies.',
+            summary='Renovation news',
+            is_published=True
+        )
+        self.faq = FAQ.objects.create(question='Is breakfast included?', answer='Breakfast is served from 7 to 10.')
+        self.spa = Service.objects.create(name='Spa massage', description='Relaxing <hot> stone massage', price=50)
+        self.vacancy = Vacancy.objects.create(title='Massage therapist', description='Spa team', requirements='License')
+
+    def kinds(self, results):
+        return [(result.kind, result.object_id) for result in results]
+
+    def test_finds_every_kind(self):
+        self.assertEqual(self.kinds(search('breakfast')), [('faq', self.faq.pk)])
+        self.assertEqual(
+            set(self.kinds(search('massage'))),
+            {('service', self.spa.pk), ('vacancy', self.vacancy.pk)}
+        )
+
+    def test_prefix_matching(self):
+        self.assertEqual(self.kinds(search('breakf')), [('faq', self.faq.pk)])
+        self.assertIn(('room', self.sea_room.pk), self.kinds(search('balc')))
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.kinds(search('sea balcony', kinds=['room'])), [('room', self.sea_room.pk)])
+        self.assertEqual(search('sea garden'), [])
+
+    def test_title_matches_rank_first(self):
+        results = search('balcony')
+        self.assertEqual(results[0].kind, 'article')
+        self.assertGreater(results[0].rank, results[-1].rank)
+
+    def test_snippet_is_highlighted_and_escaped(self):
+        snippet = search('stone')[0].snippet
+        self.assertIn('<mark>stone</mark>', snippet)
+        self.assertIn('&lt;hot&gt;', snippet)
+
+    def test_operators_in_query_are_ignored(self):
+        self.assertEqual(search('"breakfast" OR *'), search('breakfast OR'))
+        self.assertEqual(search('!!!'), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.spa.description = 'Hot stone therapy'
+        self.spa.save()
+        self.assertEqual(search('relaxing'), [])
+        self.assertEqual(self.kinds(search('therapy')), [('service', self.spa.pk)])
+
+        self.spa.delete()
+        self.assertEqual(search('therapy'), [])
+
+    def test_unpublished_objects_are_not_indexed(self):
+        self.article.is_published = False
+        self.article.save()
+        self.assertEqual(search('renovation'), [])
+
+    def test_category_rename_reindexes_rooms(self):
+        self.deluxe.name = 'Presidential'
+        self.deluxe.save()
+        self.assertEqual(self.kinds(search('presidential')), [('room', self.garden_room.pk)])
+
+    def test_matching_ids_filters_rooms(self):
+        rooms = Room.objects.filter(pk__in=matching_ids('deluxe', 'room'))
+        self.assertEqual(list(rooms), [self.garden_room])
+        self.assertFalse(Room.objects.filter(pk__in=matching_ids('...', 'room')).exists())
+
+    def test_rebuild(self):
+        SearchDocument.objects.all().delete()
+        self.assertEqual(rebuild_search_index(), 6)
+        self.assertEqual(self.kinds(search('breakfast')), [('faq', self.faq.pk)])
+
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 6 search documents', out.getvalue())
+
+
+class SearchViewTest(TestCase):
+    def setUp(self):
+        category = RoomCategory.objects.create(name='Standard', description='Standard room', base_price=100)
+        self.room = Room.objects.create(room_number='101', category=category, description='Sea view')
+        Service.objects.create(name='Sea kayak tour', description='Paddle along the coast', price=30)
+
+    def test_search_page(self):
+        response = self.client.get(reverse('hotel:search'), {'q': 'sea'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['results']), 2)
+        self.assertContains(response, reverse('hotel:room_detail', args=[self.room.pk]))
+        self.assertContains(response, '<mark>Sea</mark>')
+
+    def test_kind_filter(self):
+        response = self.client.get(reverse('hotel:search'), {'q': 'sea', 'kind': 'service'})
+        self.assertEqual([result.kind for result in response.context['results']], ['service'])
+
+    def test_room_list_uses_index(self):
+        response = self.client.get(reverse('hotel:room_list'), {'search': 'sea', 'available_only': ''})
+        self.assertEqual(list(response.context['rooms']), [self.room])
+
+    def test_room_list_before_index_is_built(self):
+        SearchDocument.objects.filter(kind='room').delete()
+        with self.assertLogs('hotel.search', 'WARNING'):
+            response = self.client.get(reverse('hotel:room_list'), {'search': 'sea', 'available_only': ''})
+        self.assertEqual(list(response.context['rooms']), [self.room])
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase, Client as TestClient
 from django.urls import reverse
 from django.contrib.auth.models import User
@@ -6,6 +7,7 @@ from hotel.models import (
     Article, FAQ, Staff, Vacancy, Review, PromoCode, Service
 )
 from datetime import date, timedelta
+from hotel.tests.querycount import QueryBudgetMixin
 
 class HomeViewTest(TestCase):
     def setUp(self):
@@ -180,9 +182,9 @@ class BookRoomViewTest(TestCase):
         self.assertEqual(reservation.status, 'confirmed')
         self.assertEqual(reservation.special_requests, 'Need extra pillows')
         
-        # Verify room status was updated
+        # Booking holds the dates, not the room
         self.room.refresh_from_db()
-        self.assertEqual(self.room.status, 'reserved')
+        self.assertEqual(self.room.status, 'available')
 
 class AuthViewsTest(TestCase):
     def setUp(self):
@@ -220,4 +222,63 @@ class AuthViewsTest(TestCase):
     def test_logout_view(self):
         self.client.login(username='testuser', password='password123')
         response = self.client.get(reverse('hotel:logout'))
-        self.assertEqual(response.status_code, 302)  # Redirect after logout
\ No newline at end of file
+        self.assertEqual(response.status_code, 302)  # Redirect after logout
+
+class RoomListQueryTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.categories = [
+            RoomCategory.objects.create(name=f'Category {i}', description='Room', base_price=100 * (i + 1))
+            for i in range(3)
+        ]
+
+    def add_rooms(self, count):
+        start = Room.objects.count()
+        Room.objects.bulk_create([
+            Room(room_number=str(100 + start + i), category=self.categories[i % 3])
+            for i in range(count)
+        ])
+
+    def test_query_count_does_not_grow_with_rooms(self):
+        url = reverse('hotel:room_list')
+        self.add_rooms(2)
+        with self.assertMaxQueries(3):
+            self.client.get(url)
+        with self.assertMaxQueries(2) as few:
+            self.client.get(url)
+
+        self.add_rooms(20)
+        with self.assertMaxQueries(2) as many:
+            response = self.client.get(url)
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+        self.assertContains(response, 'Category 2')
+
+    def test_category_choices_are_cached(self):
+        url = reverse('hotel:room_list')
+        self.client.get(url)
+        response = self.assertViewQueryBudget(url, 2)
+        self.assertEqual(response.context['min_room_price'], 100)
+        self.assertEqual(response.context['max_room_price'], 300)
+
+    def test_filters_stay_within_budget(self):
+        self.add_rooms(10)
+        self.assertViewQueryBudget(reverse('hotel:room_list'), 4, data={
+            'category': self.categories[0].pk,
+            'check_in': '2025-01-01',
+            'check_out': '2025-01-03',
+            'sort_by': '-category__base_price',
+        })
+
+    def test_category_change_refreshes_choices(self):
+        url = reverse('hotel:room_list')
+        self.client.get(url)
+        RoomCategory.objects.create(name='Penthouse', description='Top floor', base_price=900)
+        self.assertContains(self.client.get(url), 'Penthouse')
+
+    def test_category_choices_expire(self):
+        # A change made in another process doesn't clear this process's cache
+        url = reverse('hotel:room_list')
+        with self.settings(ROOM_CATEGORIES_CACHE_TIMEOUT=0):
+            self.client.get(url)
+            RoomCategory.objects.bulk_create([RoomCategory(name='Penthouse', description='Top floor', base_price=900)])
+            self.assertContains(self.client.get(url), 'Penthouse')
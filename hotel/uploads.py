@@ -0,0 +1,157 @@
+import os
+import re
+from dataclasses import dataclass
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from .models import ChunkedUpload
+
+# Conflict reasons reported by start_upload and write_chunk
+BAD_FILE = 'bad_file'
+BAD_RANGE = 'bad_range'
+CHUNK_TOO_LARGE = 'chunk_too_large'
+OFFSET_MISMATCH = 'offset_mismatch'
+ALREADY_COMPLETE = 'already_complete'
+
+CONFLICT_MESSAGES = {
+    BAD_FILE: "Upload an MP4, WebM, MOV or OGV video no larger than the size limit.",
+    BAD_RANGE: "Content-Range must be 'bytes start-end/total' matching the upload and the body length.",
+    CHUNK_TOO_LARGE: "Chunk is larger than the allowed chunk size.",
+    OFFSET_MISMATCH: "Chunk does not start at the current offset; resume from the offset returned.",
+    ALREADY_COMPLETE: "This upload is already complete.",
+}
+
+VIDEO_EXTENSIONS = ('.mp4', '.m4v', '.webm', '.mov', '.ogv')
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+COPY_BLOCK_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class UploadResult:
+    """Outcome of an upload step; upload carries the current offset either way"""
+    upload: ChunkedUpload = None
+    conflict: str = None
+
+    @property
+    def ok(self):
+        return self.conflict is None
+
+    @property
+    def message(self):
+        return CONFLICT_MESSAGES.get(self.conflict, "")
+
+
+class PartialUploadFile(File):
+    """A finished partial upload; FileSystemStorage moves it into place instead of copying it"""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def partial_path(upload):
+    return os.path.join(settings.CHUNKED_UPLOAD_DIR, f'{upload.upload_id.hex}.part')
+
+
+def start_upload(user, company, filename, size):
+    """Register a video upload of `size` bytes for company; chunks follow with write_chunk"""
+    filename = os.path.basename(filename)
+    if not filename.lower().endswith(VIDEO_EXTENSIONS) or not 0 < size <= settings.VIDEO_UPLOAD_MAX_SIZE:
+        return UploadResult(conflict=BAD_FILE)
+
+    upload = ChunkedUpload.objects.create(user=user, company=company, filename=filename, size=size)
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(partial_path(upload), 'wb').close()
+    return UploadResult(upload=upload)
+
+
+def parse_content_range(header):
+    """(start, end, total) from "bytes start-end/total", or None"""
+    match = CONTENT_RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    start, end, total = map(int, match.groups())
+    return (start, end, total) if start <= end < total else None
+
+
+def _copy(stream, file, length):
+    """Copy up to length bytes from stream to file; returns how many arrived"""
+    copied = 0
+    while copied < length:
+        block = stream.read(min(COPY_BLOCK_SIZE, length - copied))
+        if not block:
+            break
+        file.write(block)
+        copied += len(block)
+    return copied
+
+
+def write_chunk(upload, content_range, stream):
+    """Write the bytes described by a Content-Range header at the upload's current offset.
+
+    The body is streamed to disk without holding a database lock; the offset
+    is then advanced with a compare-and-set, so of two clients sending the
+    same chunk only one counts and the other is told the new offset.
+    """
+    if upload.status == 'complete':
+        return UploadResult(upload=upload, conflict=ALREADY_COMPLETE)
+
+    parsed = parse_content_range(content_range)
+    if parsed is None or parsed[2] != upload.size:
+        return UploadResult(upload=upload, conflict=BAD_RANGE)
+    start, end, _ = parsed
+    length = end - start + 1
+    if length > settings.CHUNKED_UPLOAD_MAX_CHUNK:
+        return UploadResult(upload=upload, conflict=CHUNK_TOO_LARGE)
+    if start != upload.offset:
+        return UploadResult(upload=upload, conflict=OFFSET_MISMATCH)
+
+    with open(partial_path(upload), 'r+b') as file:
+        file.seek(start)
+        if _copy(stream, file, length) != length:
+            return UploadResult(upload=upload, conflict=BAD_RANGE)
+
+    advanced = ChunkedUpload.objects.filter(pk=upload.pk, status='uploading', offset=start).update(
+        offset=end + 1,
+        updated_at=timezone.now()
+    )
+    upload.refresh_from_db()
+    if not advanced:
+        return UploadResult(upload=upload, conflict=OFFSET_MISMATCH)
+
+    if upload.offset == upload.size:
+        _complete(upload)
+    return UploadResult(upload=upload)
+
+
+def _complete(upload):
+    with transaction.atomic():
+        # Whoever flips the status first attaches the file
+        if not ChunkedUpload.objects.filter(pk=upload.pk, status='uploading').update(status='complete'):
+            return
+        path = partial_path(upload)
+        with open(path, 'rb') as file:
+            upload.company.video_file.save(upload.filename, PartialUploadFile(file), save=True)
+    # Storages that copy rather than move leave the partial file behind
+    if os.path.exists(path):
+        os.remove(path)
+    upload.refresh_from_db()
+
+
+def expire_uploads(hours):
+    """Delete unfinished uploads untouched for `hours` along with their partial files"""
+    stale = ChunkedUpload.objects.filter(
+        status='uploading',
+        updated_at__lt=timezone.now() - timedelta(hours=hours)
+    )
+    deleted = 0
+    for upload in stale:
+        try:
+            os.remove(partial_path(upload))
+        except FileNotFoundError:
+            pass
+        upload.delete()
+        deleted += 1
+    return deleted
@@ -32,6 +32,9 @@ urlpatterns = [
     path('rooms/<int:room_id>/book/', views.book_room, name='book_room'),
     path('services/', views.services, name='services'),
     path('services/<int:pk>/', views.service_detail, name='service_detail'),
+    path('search/', views.site_search, name='search'),
+    path('company/<int:company_id>/video-uploads/', views.video_upload_start, name='video_upload_start'),
+    path('video-uploads/<uuid:upload_id>/', views.video_upload_chunk, name='video_upload_chunk'),
     
     # Cart and shopping functionality
     path('cart/', views.cart_view, name='cart_view'),
@@ -43,5 +46,7 @@ urlpatterns = [
     path('order-success/<int:order_id>/', views.order_success, name='order_success'),
 
     path('statistics/', views.statistics_view, name='statistics'),
+    path('metrics', views.metrics, name='metrics'),
     path('visualizations/room-booking-distribution/', views.room_booking_distribution_chart, name='room_booking_distribution_chart'),
+    path('visualizations/jobs/<int:job_id>/', views.render_job_status, name='render_job_status'),
 ]
\ No newline at end of file
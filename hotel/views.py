@@ -1,5 +1,12 @@
-from django.shortcuts import render, redirect, get_object_or_404
-from django.urls import reverse_lazy
+import asyncio
+import json
+import os
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.shortcuts import render, redirect, aget_object_or_404, get_object_or_404
+from django.http import Http404, HttpResponse, JsonResponse
+from django.urls import reverse, reverse_lazy
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.forms import inlineformset_factory
@@ -7,30 +14,51 @@ from django.contrib.auth import login, logout
 from django.contrib.auth.views import LoginView
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_http_methods, require_POST
 from django import forms
-from datetime import date, timedelta, datetime
-from django.db.models import Min, Max, Count, Sum
-from collections import Counter
-from statistics import median, mode
-from django.db.models.functions import TruncMonth
-import requests
+from datetime import date, timedelta
 from .models import (
-    Article, CompanyInfo, FAQ, Staff, Vacancy, Review, 
-    PromoCode, Room, RoomCategory, RoomImage, Reservation, Client, Service,
-    Banner, Partner, Cart, CartItem, Order, OrderItem
+    Article, CompanyInfo, CompanyHistory, FAQ, Staff, Vacancy, Review, 
+    PromoCode, Room, RoomImage, Reservation, Client, Service,
+    Banner, Partner, Cart, CartItem, Order, RenderJob, ChunkedUpload
 )
 from .forms import RoomForm, RoomImageForm, RoomFilterForm, ReviewForm
+from .catalog import acategory_price_range, aroom_categories
+from .availability import available_rooms, UNBOOKABLE_ROOM_STATUSES
+from .booking import reserve_room
+from .orders import new_idempotency_key, place_order
+from .external import aget_daily_quote, aget_exchange_rates
+from .analytics import category_summary, monthly_revenue, occupancy_rate, reservation_summary
+from .charts import bar_chart_spec, find_chart
+from .jobs import submit_job
+from .context_processors import invalidate_cart_summary
+from .media import ranged_file_response
+from .metrics import registry
+from .outbound import http_client
+from .page_cache import cached_page
+from .pagination import keyset_page
+from .search import SEARCH_SOURCES, ais_indexed, matching_ids, search
+from .uploads import ALREADY_COMPLETE, BAD_FILE, BAD_RANGE, CHUNK_TOO_LARGE, OFFSET_MISMATCH, start_upload, write_chunk
 from .auth_forms import UserRegisterForm, UserLoginForm, UserProfileForm
-import matplotlib.pyplot as plt
-from io import BytesIO
-from django.core.files.base import ContentFile
-from .models import ChartImage
-from django.db.models import Q
-
-def home(request):
-    latest_article = Article.objects.filter(is_published=True).order_by('-published_date').first()
-    daily_quote = get_daily_quote()
-    exchange_rates = get_exchange_rates()
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Lower
+from django.db.models.lookups import GreaterThanOrEqual, LessThan
+from django.utils.functional import SimpleLazyObject
+
+# Templates evaluate lazy querysets, so async views render in the thread
+# that owns the database connection
+arender = sync_to_async(render)
+
+async def home(request):
+    # Everything from the database is lazy: blocks served from the fragment
+    # cache (see hotel/fragments.py) never evaluate their queryset, and the
+    # rest is evaluated while the template renders
+    latest_article = SimpleLazyObject(
+        lambda: Article.objects.filter(is_published=True).order_by('-published_date').first()
+    )
+    daily_quote, exchange_rates = await asyncio.gather(aget_daily_quote(), aget_exchange_rates())
     banners = Banner.objects.filter(is_active=True).order_by('order')
     partners = Partner.objects.all()
     featured_services = Service.objects.filter(is_available=True)[:6]  # Show first 6 services
@@ -44,20 +72,24 @@ def home(request):
         'featured_services': featured_services,
     }
     
-    return render(request, 'hotel/home.html', context)
+    return await arender(request, 'hotel/home.html', context)
 
+@cached_page(CompanyInfo, CompanyHistory)
 def about(request):
     company_info = CompanyInfo.objects.first()
     return render(request, 'hotel/about.html', {'company_info': company_info})
 
-def news(request):
-    articles = Article.objects.filter(is_published=True).order_by('-published_date')
-    return render(request, 'hotel/news.html', {'articles': articles})
+@cached_page(Article)
+async def news(request):
+    articles = [article async for article in Article.objects.filter(is_published=True).order_by('-published_date')]
+    return await arender(request, 'hotel/news.html', {'articles': articles})
 
+@cached_page(FAQ)
 def glossary(request):
     faqs = FAQ.objects.all().order_by('order')
     return render(request, 'hotel/glossary.html', {'faqs': faqs})
 
+@cached_page(Staff)
 def contacts(request):
     staff = Staff.objects.all().order_by('order')
     return render(request, 'hotel/contacts.html', {'staff': staff})
@@ -65,6 +97,7 @@ def contacts(request):
 def privacy_policy(request):
     return render(request, 'hotel/privacy_policy.html')
 
+@cached_page(Vacancy)
 def vacancies(request):
     active_vacancies = Vacancy.objects.filter(is_active=True).order_by('-date_posted')
     return render(request, 'hotel/vacancies.html', {'vacancies': active_vacancies})
@@ -73,26 +106,54 @@ def reviews(request):
     published_reviews = Review.objects.filter(is_published=True).order_by('-date_posted')
     return render(request, 'hotel/reviews.html', {'reviews': published_reviews})
 
+@cached_page(PromoCode)
 def promo_codes(request):
     active_codes = PromoCode.objects.filter(is_active=True).order_by('valid_to')
     expired_codes = PromoCode.objects.filter(is_active=False).order_by('-valid_to')
     return render(request, 'hotel/promo_codes.html', {'active_codes': active_codes, 'expired_codes': expired_codes})
 
-def services(request):
+@cached_page(Service)
+async def services(request):
     """View for displaying available hotel services"""
-    available_services = Service.objects.filter(is_available=True)
-    return render(request, 'hotel/services.html', {
+    available_services = [service async for service in Service.objects.filter(is_available=True)]
+    return await arender(request, 'hotel/services.html', {
         'services': available_services
     })
 
+def site_search(request):
+    """Full-text search across rooms, news, FAQs, services and vacancies"""
+    query = request.GET.get('q', '').strip()
+    kind = request.GET.get('kind')
+    kinds = [kind] if kind in SEARCH_SOURCES else None
+    
+    return render(request, 'hotel/search.html', {
+        'query': query,
+        'kind': kind if kinds else '',
+        'kinds': [(key, source.label) for key, source in SEARCH_SOURCES.items()],
+        'results': search(query, kinds=kinds) if query else [],
+    })
+
 class RoomListView(ListView):
     model = Room
     template_name = 'hotel/room_list.html'
     context_object_name = 'rooms'
     
+    async def get(self, request, *args, **kwargs):
+        self.categories = await aroom_categories()
+        self.price_range = await acategory_price_range()
+        self.filter_form = RoomFilterForm(request.GET, categories=self.categories)
+        # Validating the category choice looks it up in the database
+        await sync_to_async(self.filter_form.is_valid)()
+        self.search_indexed = False
+        if self.filter_form.is_valid() and self.filter_form.cleaned_data.get('search'):
+            self.search_indexed = await ais_indexed('room')
+        # The queryset stays lazy and is evaluated while the template renders
+        self.object_list = self.get_queryset()
+        return self.render_to_response(self.get_context_data())
+    
     def get_queryset(self):
-        queryset = Room.objects.all()
-        form = RoomFilterForm(self.request.GET)
+        queryset = Room.objects.select_related('category')
+        form = self.filter_form
         
         if form.is_valid():
             if form.cleaned_data.get('category'):
@@ -107,11 +168,18 @@ class RoomListView(ListView):
             if form.cleaned_data.get('capacity'):
                 queryset = queryset.filter(capacity__gte=form.cleaned_data['capacity'])
             
-            if form.cleaned_data.get('available_only'):
+            check_in = form.cleaned_data.get('check_in')
+            check_out = form.cleaned_data.get('check_out')
+            if check_in and check_out:
+                queryset = available_rooms(check_in, check_out, queryset)
+            elif form.cleaned_data.get('available_only'):
                 queryset = queryset.filter(status='available')
             
             search_query = form.cleaned_data.get('search')
-            if search_query:
+            if search_query and self.search_indexed:
+                queryset = queryset.filter(pk__in=matching_ids(search_query, 'room'))
+            elif search_query:
+                # Index not built yet (e.g. straight after migrating); scan the rooms instead
                 queryset = queryset.filter(
                     Q(room_number__icontains=search_query) |
                     Q(description__icontains=search_query) |
@@ -128,11 +196,12 @@ class RoomListView(ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['categories'] = RoomCategory.objects.all()
-        context['is_staff'] = self.request.user.is_staff or self.request.user.is_superuser
-        context['filter_form'] = RoomFilterForm(self.request.GET)
-        context['min_room_price'] = RoomCategory.objects.aggregate(Min('base_price'))['base_price__min'] or 0
-        context['max_room_price'] = RoomCategory.objects.aggregate(Max('base_price'))['base_price__max'] or 1000
+        user = self.request.user
+        context['categories'] = self.categories
+        # request.user only loads when the template renders, in a worker thread
+        context['is_staff'] = SimpleLazyObject(lambda: user.is_staff or user.is_superuser)
+        context['filter_form'] = self.filter_form
+        context['min_room_price'], context['max_room_price'] = self.price_range
         return context
 
 class RoomDetailView(DetailView):
@@ -255,6 +324,39 @@ RoomImageFormSet = inlineformset_factory(
     can_delete=True
 )
 
+CLIENT_PAGE_ORDERING = ('last_name', 'first_name', 'id')
+CLIENT_PAGE_SIZE = 50
+
+def reservation_count_subquery():
+    """Per-client reservation count, evaluated only for the rows on the current page"""
+    reservations = Reservation.objects.filter(client=OuterRef('pk')).order_by().values('client')
+    counts = reservations.annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+def prefix_range(field, prefix):
+    """field (a name or an expression) starts with prefix, as a range comparison an index can serve.
+
+    LIKE 'x%' only uses an index under specific collations (and never with
+    the ESCAPE clause Django adds on SQLite), while >= / < always can.
+    """
+    field = F(field) if isinstance(field, str) else field
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(GreaterThanOrEqual(field, prefix), LessThan(field, upper))
+
+def client_prefix_match(query):
+    """Clients whose last name or email starts with query, ignoring case.
+
+    Served by the Lower() indexes on Client. SQLite only lowercases ASCII, so
+    the capitalised query is also matched against the stored last name to
+    keep Cyrillic names findable there.
+    """
+    lowered = query.lower()
+    return (
+        prefix_range(Lower('last_name'), lowered)
+        | prefix_range('last_name', query[:1].upper() + query[1:])
+        | prefix_range(Lower('email'), lowered)
+    )
+
 def is_staff_user(user):
     return user.is_authenticated and (user.is_staff or user.is_superuser)
 
@@ -262,12 +364,25 @@ def is_staff_user(user):
 @user_passes_test(is_staff_user)
 def staff_dashboard(request):
     """Dashboard for staff members to view all reservations and clients"""
-    recent_reservations = Reservation.objects.all().order_by('-created_at')[:10]
-    all_clients = Client.objects.all().order_by('last_name', 'first_name')
+    recent_reservations = Reservation.objects.select_related('client', 'room').order_by('-created_at')[:10]
+
+    clients = Client.objects.annotate(reservation_count=reservation_count_subquery())
+    search_query = request.GET.get('q', '').strip()
+    if search_query:
+        clients = clients.filter(client_prefix_match(search_query))
+    page = keyset_page(
+        clients,
+        CLIENT_PAGE_ORDERING,
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        size=CLIENT_PAGE_SIZE
+    )
     
     context = {
         'recent_reservations': recent_reservations,
-        'clients': all_clients,
+        'clients': page.items,
+        'page': page,
+        'search_query': search_query,
         'total_reservations': Reservation.objects.count(),
         'total_clients': Client.objects.count(),
     }
@@ -279,7 +394,7 @@ def client_dashboard(request):
     """Dashboard for clients to view their reservations"""
     try:
         client = request.user.client
-        reservations = client.reservations.all().order_by('-created_at')
+        reservations = client.reservations.select_related('room__category').order_by('-created_at')
         
         context = {
             'client': client,
@@ -324,7 +439,7 @@ def profile_view(request):
     else:
         form = UserProfileForm(instance=client)
     
-    reservations = client.reservations.all().order_by('-check_in_date')
+    reservations = client.reservations.select_related('room__category').order_by('-check_in_date')
     reviews = client.reviews.all().order_by('-date_posted')
     
     context = {
@@ -365,7 +480,7 @@ def book_room(request, room_id):
     """Allow a client to book a room"""
     room = get_object_or_404(Room, id=room_id)
     
-    if room.status != 'available':
+    if room.status in UNBOOKABLE_ROOM_STATUSES:
         messages.error(request, "This room is not available for booking.")
         return redirect('hotel:room_detail', pk=room_id)
     
@@ -374,34 +489,24 @@ def book_room(request, room_id):
         if form.is_valid():
             try:
                 client = request.user.client
-                check_in_date = form.cleaned_data['check_in_date']
-                check_out_date = form.cleaned_data['check_out_date']
-                special_requests = form.cleaned_data['special_requests']
-                has_children = form.cleaned_data['has_children']
-                
-                days = (check_out_date - check_in_date).days
-                total_price = room.category.base_price * days
-                
-                reservation = Reservation.objects.create(
-                    client=client,
-                    room=room,
-                    check_in_date=check_in_date,
-                    check_out_date=check_out_date,
-                    status='confirmed',
-                    total_price=total_price,
-                    special_requests=special_requests,
-                    has_children=has_children 
-                )
-                
-                
-                room.status = 'reserved'
-                room.save()
-                
+            except Client.DoesNotExist:
+                messages.error(request, "Your account is not set up as a client. Please contact support.")
+                return redirect('hotel:room_detail', pk=room_id)
+            
+            result = reserve_room(
+                client,
+                room.id,
+                form.cleaned_data['check_in_date'],
+                form.cleaned_data['check_out_date'],
+                special_requests=form.cleaned_data['special_requests'],
+                has_children=form.cleaned_data['has_children']
+            )
+            
+            if result.ok:
                 messages.success(request, f"Room {room.room_number} booked successfully!")
                 return redirect('hotel:client_dashboard')
-                
-            except Exception as e:
-                messages.error(request, f"Error booking room: {str(e)}")
+            
+            form.add_error(None, result.message)
     else:
         form = BookingForm(initial={
             'check_in_date': date.today(),
@@ -413,116 +518,19 @@ def book_room(request, room_id):
         'room': room
     })
 
-def get_daily_quote():
-    """Get a daily quote from FavQs API"""
-    url = "https://favqs.com/api/qotd"
-    
-    try:
-        response = requests.get(url)
-        data = response.json()
-        
-        if response.status_code == 200:
-            quote_data = {
-                'quote': data['quote']['body'],
-                'author': data['quote']['author']
-            }
-            return quote_data
-        else:
-            print(f"FavQs API error: {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"Error fetching daily quote: {e}")
-        return None
-
-def get_exchange_rates(base_currency="USD"):
-    """Get current exchange rates"""
-    api_key = "0da4b4143b44e87f2cf45a11"  
-    url = f"https://v6.exchangerate-api.com/v6/{api_key}/latest/{base_currency}"
-    
-    try:
-        response = requests.get(url)
-        data = response.json()
-        
-        
-        if response.status_code == 200 and data['result'] == 'success':
-            rates = {
-                'EUR': data['conversion_rates'].get('EUR'),
-                'GBP': data['conversion_rates'].get('GBP'),
-                'BYN': data['conversion_rates'].get('BYN'),
-                'RUB': data['conversion_rates'].get('RUB'),
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            }
-            return rates
-        else:
-            return None
-    except Exception as e:
-        print(f"Error fetching exchange rates: {e}")
-        return None
-
 @login_required
 @user_passes_test(is_staff_user)
 def statistics_view(request):
     """View for displaying hotel statistics and analytics"""
-    
-    rooms_by_category = Room.objects.values('category__name').annotate(
-        count=Count('id')
-    ).order_by('category__name')
-    
-    total_revenue = Reservation.objects.aggregate(total=Sum('total_price'))['total'] or 0
-    
-    reservation_amounts = list(Reservation.objects.values_list('total_price', flat=True))
-    if reservation_amounts:
-        avg_sale = sum(reservation_amounts) / len(reservation_amounts)
-        median_sale = median(reservation_amounts)
-        try:
-            mode_sale = mode(reservation_amounts)
-        except:
-            counter = Counter(reservation_amounts)
-            mode_sale = counter.most_common(1)[0][0]
-    else:
-        avg_sale = median_sale = mode_sale = 0
-    
-    popular_categories = RoomCategory.objects.annotate(
-        reservation_count=Count('rooms__reservations')
-    ).order_by('-reservation_count')
-    
-    profitable_categories = RoomCategory.objects.annotate(
-        revenue=Sum('rooms__reservations__total_price')
-    ).order_by('-revenue')
-    
-    monthly_revenue = Reservation.objects.annotate(
-        month=TruncMonth('check_in_date')
-    ).values('month').annotate(
-        revenue=Sum('total_price')
-    ).order_by('month')
-    
-    total_rooms = Room.objects.count()
-    occupied_rooms = Room.objects.filter(status__in=['occupied', 'reserved']).count()
-    occupancy_rate = (occupied_rooms / total_rooms * 100) if total_rooms > 0 else 0
-    
-    reservations = Reservation.objects.all()
-    if reservations:
-        stay_durations = []
-        for reservation in reservations:
-            duration = (reservation.check_out_date - reservation.check_in_date).days
-            stay_durations.append(duration)
-        avg_stay = sum(stay_durations) / len(stay_durations)
-        median_stay = median(stay_durations)
-    else:
-        avg_stay = median_stay = 0
+    categories = category_summary()
     
     context = {
-        'rooms_by_category': rooms_by_category,
-        'total_revenue': total_revenue,
-        'avg_sale': avg_sale,
-        'median_sale': median_sale,
-        'mode_sale': mode_sale,
-        'popular_categories': popular_categories,
-        'profitable_categories': profitable_categories,
-        'monthly_revenue': monthly_revenue,
-        'occupancy_rate': occupancy_rate,
-        'avg_stay': avg_stay,
-        'median_stay': median_stay,
+        'rooms_by_category': [category for category in categories if category.room_count],
+        'popular_categories': sorted(categories, key=lambda c: c.reservation_count, reverse=True),
+        'profitable_categories': sorted(categories, key=lambda c: c.revenue or 0, reverse=True),
+        'monthly_revenue': monthly_revenue(),
+        'occupancy_rate': occupancy_rate(),
+        **reservation_summary(),
     }
     
     return render(request, 'hotel/statistics.html', context)
@@ -530,34 +538,134 @@ def statistics_view(request):
 @login_required
 @user_passes_test(is_staff_user)
 def room_booking_distribution_chart(request):
-    """Generate a bar chart for room bookings by category and save to media directory."""
-    categories = RoomCategory.objects.annotate(
-        booking_count=Count('rooms__reservations')
-    ).order_by('-booking_count')
+    """Show a bar chart of room bookings by category.
+
+    A chart already rendered for the current data is shown straight away;
+    otherwise rendering is queued and the page polls render_job_status.
+    """
+    categories = sorted(category_summary(), key=lambda c: c.reservation_count, reverse=True)
+
+    spec, data_hash = bar_chart_spec(
+        'Room Booking Distribution',
+        [category.name for category in categories],
+        [category.reservation_count for category in categories],
+        xlabel='Room Category',
+        ylabel='Number of Bookings'
+    )
+    
+    job = None
+    chart_image = find_chart(data_hash)
+    if chart_image is None:
+        job = submit_job('bar_chart', data_hash, spec)
+        job.refresh_from_db()
+        if job.status == 'done':
+            chart_image = job.chart
+    
+    return render(request, 'hotel/visualizations/room_booking_distribution.html', {
+        'chart_image': chart_image,
+        'job': job,
+    })
 
-    category_names = [category.name for category in categories]
-    booking_counts = [category.booking_count for category in categories]
+@login_required
+@user_passes_test(is_staff_user)
+def render_job_status(request, job_id):
+    """Polling endpoint reporting a render job's progress and its chart once done"""
+    job = get_object_or_404(RenderJob.objects.select_related('chart'), pk=job_id)
+    
+    data = {'status': job.status}
+    if job.status == 'done' and job.chart:
+        data['image_url'] = job.chart.image.url
+        data['created_at'] = job.chart.created_at.isoformat()
+    elif job.status == 'failed':
+        data['error'] = job.error
+    
+    return JsonResponse(data)
+
+@login_required
+@user_passes_test(is_staff_user)
+def metrics(request):
+    """Request and upstream metrics of this process in the Prometheus text format"""
+    return HttpResponse(
+        registry.exposition(upstreams=http_client.stats()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
 
-    plt.figure(figsize=(10, 6))
-    plt.bar(category_names, booking_counts, color='skyblue')
-    plt.title('Room Bookings by Category')
-    plt.xlabel('Room Category')
-    plt.ylabel('Number of Bookings')
-    plt.xticks(rotation=45, ha='right')
+def media_file(request, path):
+    """Uploaded media with Range support, streamed by the WSGI server's file_wrapper.
 
-    buffer = BytesIO()
-    plt.savefig(buffer, format='png')
-    plt.close()      
+    Files under PUBLIC_MEDIA_PREFIXES are served to everyone and those under
+    STAFF_MEDIA_PREFIXES (generated charts) to staff only; anything else,
+    and staff files asked for by anyone else, is a 404.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    # Checked on the normalised path so banners/../charts/ can't slip through
+    name = os.path.relpath(full_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+    staff_only = name.startswith(tuple(settings.STAFF_MEDIA_PREFIXES))
+    if staff_only and not is_staff_user(request.user):
+        raise Http404
+    if not staff_only and not name.startswith(tuple(settings.PUBLIC_MEDIA_PREFIXES)):
+        raise Http404
+
+    response = ranged_file_response(request, full_path)
+    if staff_only:
+        patch_cache_control(response, private=True)
+    return response
+
+UPLOAD_CONFLICT_STATUS = {
+    BAD_FILE: 400,
+    BAD_RANGE: 400,
+    CHUNK_TOO_LARGE: 413,
+    OFFSET_MISMATCH: 409,
+    ALREADY_COMPLETE: 409,
+}
+
+def upload_state(upload):
+    data = {
+        'upload_id': upload.upload_id.hex,
+        'url': reverse('hotel:video_upload_chunk', args=[upload.upload_id]),
+        'size': upload.size,
+        'offset': upload.offset,
+        'status': upload.status,
+    }
+    if upload.status == 'complete':
+        data['video_url'] = upload.company.video_file.url
+    return data
 
-    filename = f'room_bookings_{datetime.now().strftime("%Y%m%d_%H%M%S")}.png'
-    
-    chart_image = ChartImage(title='Room Booking Distribution')
-    
-    chart_image.image.save(filename, ContentFile(buffer.getvalue()), save=True)
+@login_required
+@user_passes_test(is_staff_user)
+@require_POST
+def video_upload_start(request, company_id):
+    """Open a resumable upload of a company video; expects JSON {"filename", "size"}"""
+    company = get_object_or_404(CompanyInfo, pk=company_id)
+    try:
+        payload = json.loads(request.body)
+        filename, size = str(payload['filename']), int(payload['size'])
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': "Send JSON with a filename and a size in bytes."}, status=400)
     
-    return render(request, 'hotel/visualizations/room_booking_distribution.html', {
-        'chart_image': chart_image
-    })
+    result = start_upload(request.user, company, filename, size)
+    if not result.ok:
+        return JsonResponse({'error': result.message}, status=UPLOAD_CONFLICT_STATUS[result.conflict])
+    return JsonResponse(upload_state(result.upload), status=201)
+
+@login_required
+@user_passes_test(is_staff_user)
+@require_http_methods(['GET', 'HEAD', 'PUT'])
+def video_upload_chunk(request, upload_id):
+    """GET reports how far an upload got; PUT sends the next chunk with a Content-Range header"""
+    upload = get_object_or_404(ChunkedUpload.objects.select_related('company'), upload_id=upload_id, user=request.user)
+    if request.method != 'PUT':
+        return JsonResponse(upload_state(upload))
+    
+    result = write_chunk(upload, request.headers.get('Content-Range', ''), request)
+    data = upload_state(result.upload)
+    if not result.ok:
+        data['error'] = result.message
+        return JsonResponse(data, status=UPLOAD_CONFLICT_STATUS[result.conflict])
+    return JsonResponse(data)
 
 def add_review(request):
     """Allow registered users to submit reviews"""
@@ -617,6 +725,7 @@ def add_to_cart(request, service_id):
     if not created:
         cart_item.quantity += 1
         cart_item.save()
+    invalidate_cart_summary(request)
         
     messages.success(request, f"'{service.name}' добавлен в корзину.")
     return redirect('hotel:cart_view')
@@ -626,6 +735,7 @@ def remove_from_cart(request, item_id):
     cart_item = get_object_or_404(CartItem, id=item_id)
     service_name = cart_item.service.name
     cart_item.delete()
+    invalidate_cart_summary(request)
     messages.info(request, f"'{service_name}' удален из корзины.")
     return redirect('hotel:cart_view')
 
@@ -643,19 +753,21 @@ def update_cart(request, item_id):
             service_name = cart_item.service.name
             cart_item.delete()
             messages.info(request, f"'{service_name}' удален из корзины.")
+        invalidate_cart_summary(request)
     
     return redirect('hotel:cart_view')
 
 def cart_view(request):
     """Display the shopping cart"""
     cart = get_or_create_cart(request)
-    cart_items = cart.items.all()
+    cart_items = cart.items.select_related('service')
+    total_price, items_count = cart.totals()
     
     context = {
         'cart': cart,
         'cart_items': cart_items,
-        'total_price': cart.total_price,
-        'items_count': cart.items_count,
+        'total_price': total_price,
+        'items_count': items_count,
     }
     
     return render(request, 'hotel/cart.html', context)
@@ -670,6 +782,7 @@ def checkout_view(request):
     
     context = {
         'cart': cart,
+        'cart_items': cart.items.select_related('service'),
         'total_price': cart.total_price,
     }
     
@@ -679,42 +792,37 @@ def payment_view(request):
     """Payment processing"""
     cart = get_or_create_cart(request)
     
-    if not cart.items.exists():
-        messages.warning(request, "Ваша корзина пуста.")
-        return redirect('hotel:home')
-    
     if request.method == 'POST':
         # Process payment (this is a simplified version)
         email = request.POST.get('email')
         if not email and request.user.is_authenticated:
             email = request.user.email
-            
-        # Create order
-        order = Order.objects.create(
+        
+        result = place_order(
+            cart,
+            email,
             user=request.user if request.user.is_authenticated else None,
-            email=email,
-            total_amount=cart.total_price,
+            idempotency_key=request.POST.get('idempotency_key'),
             status='paid'  # In real app, this would be set after payment confirmation
         )
+        if not result.ok:
+            messages.warning(request, result.message)
+            return redirect('hotel:home')
+        invalidate_cart_summary(request)
         
-        # Create order items
-        for cart_item in cart.items.all():
-            OrderItem.objects.create(
-                order=order,
-                service=cart_item.service,
-                quantity=cart_item.quantity,
-                price=cart_item.service.price
-            )
-        
-        # Clear cart
-        cart.items.all().delete()
-        
-        messages.success(request, f"Заказ #{order.id} успешно оплачен! Спасибо за покупку.")
-        return redirect('hotel:order_success', order_id=order.id)
+        if not result.replayed:
+            messages.success(request, f"Заказ #{result.order.id} успешно оплачен! Спасибо за покупку.")
+        return redirect('hotel:order_success', order_id=result.order.id)
+    
+    total_price, items_count = cart.totals()
+    if not items_count:
+        messages.warning(request, "Ваша корзина пуста.")
+        return redirect('hotel:home')
     
     context = {
         'cart': cart,
-        'total_price': cart.total_price,
+        'total_price': total_price,
+        'idempotency_key': new_idempotency_key(),
     }
     
     return render(request, 'hotel/payment.html', context)
@@ -724,7 +832,7 @@ def order_success(request, order_id):
     order = get_object_or_404(Order, id=order_id)
     return render(request, 'hotel/order_success.html', {'order': order})
 
-def article_detail(request, slug):
+async def article_detail(request, slug):
     """View for displaying a single article"""
-    article = get_object_or_404(Article, slug=slug, is_published=True)
-    return render(request, 'hotel/article_detail.html', {'article': article})
\ No newline at end of file
+    article = await aget_object_or_404(Article, slug=slug, is_published=True)
+    return await arender(request, 'hotel/article_detail.html', {'article': article})
\ No newline at end of file
@@ -42,8 +42,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'hotel.middleware.MetricsMiddleware',
+    'hotel.middleware.QueryInspectionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'hotel.middleware.ReplicaPinningMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -55,7 +58,8 @@ ROOT_URLCONF = 'hotel_reservation.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # The stock engine, timed for hotel.metrics
+        'BACKEND': 'hotel.backends.DjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -64,6 +68,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'hotel.context_processors.date_timezone_info',
+                'hotel.context_processors.cart_summary',
             ],
         },
     },
@@ -75,13 +81,161 @@ WSGI_APPLICATION = 'hotel_reservation.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# DATABASE_ENGINE=postgresql switches to PostgreSQL configured from the
+# POSTGRES_* variables, pooled through psycopg's pool when
+# DATABASE_POOL_MAX_SIZE is set. Otherwise SQLite at SQLITE_PATH, tuned by
+# SQLITE_PRAGMAS below; SQLITE_TUNING=0 restores SQLite's defaults.
+SQLITE_TUNING = os.environ.get('SQLITE_TUNING', '1') != '0'
+if os.environ.get('DATABASE_ENGINE') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'hotel'),
+            'USER': os.environ.get('POSTGRES_USER', 'hotel'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        }
+    }
+    if os.environ.get('DATABASE_POOL_MAX_SIZE'):
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.environ['DATABASE_POOL_MAX_SIZE']),
+                'timeout': 10,
+            },
+        }
+        # The pool keeps connections open itself; Django refuses both at once
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            # Take the write lock at BEGIN: in WAL mode a transaction that
+            # read first can't wait for the lock, it fails with "database is locked"
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE'} if SQLITE_TUNING else {},
+            # A file-backed test database (instead of in-memory shared cache) so
+            # concurrent connections in the booking stress test get real locking
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
+        }
+    }
+
+# Keep connections open across requests (seconds), checking them before reuse
+DATABASES['default'].setdefault('CONN_MAX_AGE', int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)))
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Applied to every new SQLite connection by hotel.database.configure_sqlite
+SQLITE_PRAGMAS = {
+    # Readers and the writer no longer block each other
+    'journal_mode': 'WAL',
+    # Only fsync at checkpoints; a power cut may lose the last commits, never integrity
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Negative means KiB: a 64 MB page cache per connection
+    'cache_size': -64000,
+    # Milliseconds to wait for the write lock before failing
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+} if SQLITE_TUNING else {}
+
+# Read replicas, as a comma-separated DATABASE_REPLICAS environment variable:
+# file paths when the primary is SQLite (kept in sync by an external tool
+# such as Litestream), otherwise host[:port] of servers replicating the same
+# database. Reads are spread over them by hotel.routers.PrimaryReplicaRouter.
+REPLICA_DATABASES = []
+for number, replica in enumerate(filter(None, os.environ.get('DATABASE_REPLICAS', '').split(',')), start=1):
+    alias = f'replica{number}'
+    replica_settings = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+    if replica_settings['ENGINE'] == 'django.db.backends.sqlite3':
+        replica_settings['NAME'] = replica
+    else:
+        host, _, port = replica.partition(':')
+        replica_settings.update(HOST=host, PORT=port)
+    DATABASES[alias] = replica_settings
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['hotel.routers.PrimaryReplicaRouter']
+# Seconds a visitor keeps reading from the primary after writing, so they see
+# their own changes even while replicas lag behind
+REPLICA_PIN_SECONDS = 5
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        # LocMemCache counting hits and misses for hotel.metrics; use
+        # hotel.backends.RedisCache in place of Django's RedisCache
+        'BACKEND': 'hotel.backends.LocMemCache',
     }
 }
 
+# Request metrics (see hotel.metrics), served to staff at /metrics in the
+# Prometheus text format. Requests slower than their view's threshold, in
+# seconds, are logged as warnings by the hotel.metrics logger.
+METRICS_ENABLED = True
+METRICS_SLOW_REQUEST_SECONDS = 1.0
+METRICS_SLOW_REQUEST_THRESHOLDS = {
+    'hotel:home': 0.3,
+    'hotel:room_list': 0.5,
+    'hotel:room_detail': 0.3,
+    'hotel:cart_view': 0.3,
+    'hotel:payment': 1.5,
+    'hotel:statistics': 2.0,
+}
+
+# Query inspection (see hotel.querylog), on by default while DEBUG: queries
+# slower than QUERY_SLOW_SECONDS are logged, and a request running one query
+# shape QUERY_REPEAT_THRESHOLD times (an N+1) is logged with the template
+# line and code that issued it, or fails in QUERY_INSPECTION_MODE 'raise'.
+# Test runs write query_report.json and fail on any finding whose view or
+# template is not in QUERY_INSPECTION_ALLOW.
+QUERY_INSPECTION = os.environ.get('QUERY_INSPECTION', '1' if DEBUG else '0') == '1'
+QUERY_INSPECTION_MODE = os.environ.get('QUERY_INSPECTION_MODE', 'warn')
+QUERY_REPEAT_THRESHOLD = 5
+QUERY_SLOW_SECONDS = 0.1
+QUERY_INSPECTION_ALLOW = []
+
+# Upper bound on how stale the header cart badge can get if a cart changes
+# outside the cart views (e.g. in the admin)
+CART_SUMMARY_CACHE_TIMEOUT = 300
+
+# Room categories behind the room list filters (see hotel.catalog). Saving a
+# category clears them only in the saving process while the cache is LocMem,
+# so other web processes may show stale choices for up to this many seconds.
+ROOM_CATEGORIES_CACHE_TIMEOUT = 300
+
+# Seconds a public page rendered by hotel.page_cache.cached_page is kept. Pages
+# are invalidated as soon as a model they depend on is saved or deleted, which
+# only reaches every web process when the cache backend is shared (not LocMem).
+PAGE_CACHE_TIMEOUT = 600
+
+
+# External APIs used by the home page widgets (see hotel/external.py)
+
+FAVQS_QOTD_URL = 'https://favqs.com/api/qotd'
+EXCHANGE_RATE_API_URL = 'https://v6.exchangerate-api.com/v6/{api_key}/latest/{base_currency}'
+EXCHANGE_RATE_API_KEY = os.environ.get('EXCHANGE_RATE_API_KEY', '0da4b4143b44e87f2cf45a11')
+# Seconds to wait on a third-party API before giving up
+EXTERNAL_API_TIMEOUT = 3
+
+# Shared outbound HTTP client (see hotel/outbound.py). Keep-alive connections
+# per host, retries with jittered exponential backoff for idempotent requests,
+# and a cap on requests in flight per host. OUTBOUND_HTTP_HOSTS overrides
+# timeout, retries, backoff or max_concurrency for a single host.
+OUTBOUND_HTTP_POOL_SIZE = 10
+OUTBOUND_HTTP_RETRIES = 2
+OUTBOUND_HTTP_BACKOFF = 0.2
+OUTBOUND_HTTP_MAX_CONCURRENCY = 4
+OUTBOUND_HTTP_HOSTS = {
+    'favqs.com': {'timeout': 2},
+    'v6.exchangerate-api.com': {'timeout': 3, 'retries': 1},
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -123,6 +277,39 @@ STATICFILES_DIRS = [
 ]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Upload directories hotel.views.media_file serves to anyone (image variants
+# sit next to their originals), and those it serves to staff only. Other
+# paths under MEDIA_ROOT are never served by the app.
+PUBLIC_MEDIA_PREFIXES = ['room_images/', 'article_images/', 'company/', 'staff/', 'banners/', 'partners/']
+STAFF_MEDIA_PREFIXES = ['charts/']
+# Large company videos are uploaded in resumable chunks (see hotel/uploads.py).
+# Partial files live outside MEDIA_ROOT, on the same filesystem so that
+# finished uploads are moved into place rather than copied.
+CHUNKED_UPLOAD_DIR = BASE_DIR / 'uploads_in_progress'
+CHUNKED_UPLOAD_MAX_CHUNK = 8 * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRY_HOURS = 24
+VIDEO_UPLOAD_MAX_SIZE = 2 * 1024 * 1024 * 1024
+# Generated charts not viewed for this many days are removed by `manage.py prune_charts`
+CHART_RETENTION_DAYS = 30
+
+# Background chart rendering (see hotel/jobs.py). ProcessPoolBackend renders in
+# a pool owned by each web process; DatabaseBackend leaves jobs for
+# `manage.py run_render_jobs`; ImmediateBackend renders inline.
+RENDER_JOB_BACKEND = 'hotel.jobs.ProcessPoolBackend'
+RENDER_JOB_WORKERS = 2
+# Seconds `run_render_jobs` waits before polling again when it finds nothing to claim
+RENDER_JOB_POLL_INTERVAL = 1.0
+# Seconds after which an unfinished job is presumed lost and may be resubmitted
+RENDER_JOB_TIMEOUT = 300
+
+# Resized copies of uploaded images (see hotel/images.py), generated by the
+# render job backend and stored next to the originals
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_VARIANT_QUALITY = 80
+# Seconds a variant manifest is cached, and how long "no variants yet" is
+# remembered before storage is checked again
+IMAGE_VARIANT_CACHE_TIMEOUT = 24 * 60 * 60
+IMAGE_VARIANT_RETRY = 60
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field